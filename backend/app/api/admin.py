@@ -1,44 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.user import User
-from app.models.meeting import Meeting
-from app.models.transcript import Participant
-from app.models.summary import Summary
-from typing import List
+from app.services.admin import AdminService, decode_cursor
+from app.services.metrics import MetricsService
+from app.services.transcription_cache import transcription_cache
+from app.services.summary_cache import summary_cache
+from app.services.llm_router import llm_router
+from app.services.local_llm import local_llm
+from app.services.loop_monitor import loop_monitor
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/metrics")
-async def get_metrics(db: Session = Depends(get_db), user_id: str = None):
-    """Get system metrics"""
+async def get_metrics(
+    granularity: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = None
+):
+    """Get system metrics from the rollups; with `granularity` (hour or day), also per-bucket series for [since, until)"""
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     
     try:
         # Check if user is admin
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.scalar(select(User).where(User.id == user_id))
         if not user or not user.is_admin:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
         
-        # Get metrics
-        total_users = db.query(func.count(User.id)).scalar()
-        total_meetings = db.query(func.count(Meeting.id)).scalar()
-        completed_meetings = db.query(func.count(Meeting.id)).filter(Meeting.status == "completed").scalar()
-        total_participants = db.query(func.count(Participant.id)).scalar()
-        total_summaries = db.query(func.count(Summary.id)).scalar()
-        
-        return {
-            "total_users": total_users,
+        totals = await db.run_sync(MetricsService.totals)
+        total_meetings = int(totals.get("meetings", 0))
+        completed_meetings = int(totals.get("meetings_completed", 0))
+        metrics = {
+            "total_users": int(totals.get("users", 0)),
             "total_meetings": total_meetings,
             "completed_meetings": completed_meetings,
-            "total_participants": total_participants,
-            "total_summaries": total_summaries,
-            "active_meetings": total_meetings - completed_meetings
+            "total_participants": int(totals.get("participants", 0)),
+            "total_summaries": int(totals.get("summaries", 0)),
+            "active_meetings": total_meetings - completed_meetings,
+            "summaries_generated": int(totals.get("summaries_generated", 0)),
+            "minutes_transcribed": round(totals.get("minutes_transcribed", 0.0), 1)
         }
+        if granularity:
+            metrics["series"] = await db.run_sync(MetricsService.series, granularity, since, until)
+        return metrics
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -46,28 +61,40 @@ async def get_metrics(db: Session = Depends(get_db), user_id: str = None):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get metrics")
 
 @router.get("/users")
-async def get_users(limit: int = 100, offset: int = 0, db: Session = Depends(get_db), user_id: str = None):
-    """Get all users"""
+async def get_users(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = None
+):
+    """Get all users, newest first; pass `next_cursor` back as `cursor` for the next page"""
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     
     try:
         # Check if user is admin
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.scalar(select(User).where(User.id == user_id))
         if not user or not user.is_admin:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
         
-        users = db.query(User).offset(offset).limit(limit).all()
-        return [
-            {
-                "id": str(u.id),
-                "name": u.name,
-                "email": u.email,
-                "is_admin": u.is_admin,
-                "created_at": u.created_at
-            }
-            for u in users
-        ]
+        users, next_cursor = await db.run_sync(
+            AdminService.list_users, limit, after=decode_cursor(cursor) if cursor else None
+        )
+        return {
+            "items": [
+                {
+                    "id": str(u.id),
+                    "name": u.name,
+                    "email": u.email,
+                    "is_admin": u.is_admin,
+                    "created_at": u.created_at
+                }
+                for u in users
+            ],
+            "next_cursor": next_cursor
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -75,32 +102,98 @@ async def get_users(limit: int = 100, offset: int = 0, db: Session = Depends(get
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get users")
 
 @router.get("/meetings")
-async def get_all_meetings(limit: int = 100, offset: int = 0, db: Session = Depends(get_db), user_id: str = None):
-    """Get all meetings"""
+async def get_all_meetings(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    meeting_status: Optional[str] = Query(None, alias="status"),
+    host_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = None
+):
+    """Get all meetings, newest first, optionally by status and host; pass `next_cursor` back as `cursor` for the next page"""
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     
     try:
         # Check if user is admin
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.scalar(select(User).where(User.id == user_id))
         if not user or not user.is_admin:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
         
-        meetings = db.query(Meeting).offset(offset).limit(limit).all()
-        return [
-            {
-                "id": str(m.id),
-                "title": m.meeting_title,
-                "host_id": str(m.host_id),
-                "status": m.status,
-                "participants_count": len(m.participants),
-                "created_at": m.created_at,
-                "ended_at": m.ended_at
-            }
-            for m in meetings
-        ]
+        meetings, next_cursor = await db.run_sync(
+            AdminService.list_meetings,
+            limit,
+            after=decode_cursor(cursor) if cursor else None,
+            status=meeting_status,
+            host_id=host_id
+        )
+        return {
+            "items": [
+                {
+                    "id": str(m.id),
+                    "title": m.meeting_title,
+                    "host_id": str(m.host_id),
+                    "status": m.status,
+                    "participants_count": m.participants_count,
+                    "created_at": m.created_at,
+                    "ended_at": m.ended_at
+                }
+                for m in meetings
+            ],
+            "next_cursor": next_cursor
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Get meetings error: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get meetings")
+
+@router.get("/transcription-cache")
+async def get_transcription_cache_stats(db: AsyncSession = Depends(get_async_db), user_id: str = None):
+    """Get transcription cache hit/miss metrics for this process"""
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user or not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    
+    return transcription_cache.stats()
+
+@router.get("/summary-cache")
+async def get_summary_cache_stats(db: AsyncSession = Depends(get_async_db), user_id: str = None):
+    """Get summary cache hit/miss metrics for this process"""
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user or not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    
+    return summary_cache.stats()
+
+@router.get("/llm-providers")
+async def get_llm_provider_stats(db: AsyncSession = Depends(get_async_db), user_id: str = None):
+    """Get rolling latency, error rate and circuit state per LLM provider for this process"""
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user or not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    
+    return {**llm_router.stats(), "local_model": local_llm.stats()}
+
+@router.get("/loop-lag")
+async def get_loop_lag_stats(db: AsyncSession = Depends(get_async_db), user_id: str = None):
+    """Get event-loop lag and the handlers that blocked the loop in this process"""
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user or not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    
+    return loop_monitor.stats()
@@ -1,19 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from app.database import get_db
+from app.database import get_async_db
 from app.services.ai import AIService
-from app.services.meeting import MeetingService
-from app.schemas.ai import SummarizeRequest, SummarizeResponse
+from app.services.meeting import AsyncMeetingService
+from app.services.rolling_summary import RollingSummaryService
+from app.schemas.ai import SummarizeRequest, SummarizeResponse, RollingSummaryResponse
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
 @router.post("/summarize", response_model=SummarizeResponse)
 async def summarize_meeting(
     request: SummarizeRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: str = None
 ):
     """Generate AI summary for meeting"""
@@ -22,14 +28,16 @@ async def summarize_meeting(
     
     try:
         # Get meeting
-        meeting = MeetingService.get_meeting(db, request.meeting_id)
+        meeting = await AsyncMeetingService.get_meeting(db, request.meeting_id)
         if not meeting:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
         
-        # Get transcript if not provided
+        # Get transcript if not provided; stored segments are the map-reduce boundaries
+        segments = None
         if not request.transcript_text:
-            transcripts = MeetingService.get_meeting_transcripts(db, request.meeting_id)
-            request.transcript_text = " ".join([t.transcript_text for t in transcripts])
+            transcripts = await AsyncMeetingService.get_meeting_transcripts(db, request.meeting_id)
+            segments = [t.transcript_text for t in transcripts]
+            request.transcript_text = " ".join(segments)
         
         if not request.transcript_text:
             raise HTTPException(
@@ -37,24 +45,104 @@ async def summarize_meeting(
                 detail="No transcript available for summarization"
             )
         
-        # Generate summary
-        summary_data = AIService.generate_summary(request.transcript_text, request.max_length)
+        # Nothing changed since the stored summary: no LLM call, no write
+        cache_key = AIService.summary_cache_key(request.transcript_text, request.max_length)
+        existing = await AIService.get_summary_async(db, request.meeting_id)
+        if existing and existing.content_hash == cache_key:
+            return SummarizeResponse.from_orm(existing)
         
-        # Save summary
-        summary = AIService.save_summary(db, request.meeting_id, summary_data)
+        # Generate and save summary; concurrent identical requests share one generation.
+        # The request's own transaction is closed so it holds no connection meanwhile.
+        await db.commit()
+        summary = await AIService.summarize_meeting(
+            request.meeting_id, request.transcript_text, request.max_length, segments, cache_key
+        )
         
         return SummarizeResponse.from_orm(summary)
     except HTTPException:
         raise
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Summary is being generated by another request, retry shortly"
+        )
     except Exception as e:
         logger.error(f"Summarization error: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Summarization failed")
 
+@router.post("/summarize/stream")
+async def stream_summary(
+    request: SummarizeRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: str = None
+):
+    """
+    Generate AI summary for meeting as Server-Sent Events: `summary` events
+    carry text as the model writes it, `done` carries the saved summary.
+    """
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    try:
+        meeting = await AsyncMeetingService.get_meeting(db, request.meeting_id)
+        if not meeting:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
+        
+        segments = None
+        if not request.transcript_text:
+            transcripts = await AsyncMeetingService.get_meeting_transcripts(db, request.meeting_id)
+            segments = [t.transcript_text for t in transcripts]
+            request.transcript_text = " ".join(segments)
+        
+        if not request.transcript_text:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No transcript available for summarization"
+            )
+        
+        cache_key = AIService.summary_cache_key(request.transcript_text, request.max_length)
+        existing = await AIService.get_summary_async(db, request.meeting_id)
+        if existing and existing.content_hash != cache_key:
+            existing = None
+        stored = SummarizeResponse.from_orm(existing).dict() if existing else None
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Summarization error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Summarization failed")
+
+    async def event_stream():
+        # Nothing changed since the stored summary: no LLM call, no write
+        if stored:
+            yield _sse("summary", {"text": stored["summary_text"]})
+            yield _sse("done", stored)
+            return
+        try:
+            async for kind, value in AIService.stream_summary(
+                request.meeting_id, request.transcript_text, request.max_length, segments, cache_key
+            ):
+                if kind == "summary":
+                    yield _sse("summary", {"text": value})
+                else:
+                    yield _sse("done", SummarizeResponse.from_orm(value).dict())
+        except TimeoutError:
+            yield _sse("error", {"detail": "Summary is being generated by another request, retry shortly"})
+        except Exception as e:
+            logger.error(f"Streaming summarization error: {str(e)}")
+            yield _sse("error", {"detail": "Summarization failed"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/summary/{meeting_id}", response_model=SummarizeResponse)
-async def get_summary(meeting_id: UUID, db: Session = Depends(get_db)):
+async def get_summary(meeting_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get meeting summary"""
     try:
-        summary = AIService.get_summary(db, meeting_id)
+        summary = await AIService.get_summary_async(db, meeting_id)
         if not summary:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Summary not found")
         
@@ -64,3 +152,46 @@ async def get_summary(meeting_id: UUID, db: Session = Depends(get_db)):
     except Exception as e:
         logger.error(f"Get summary error: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get summary")
+
+@router.get("/summary/{meeting_id}/current", response_model=RollingSummaryResponse)
+async def get_current_summary(meeting_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get the live summary of a meeting as of its last refresh, without waiting.
+    If newer transcripts exist, a background refresh folds them in.
+    """
+    try:
+        meeting = await AsyncMeetingService.get_meeting(db, meeting_id)
+        if not meeting:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
+        
+        state, pending = await db.run_sync(RollingSummaryService.get_state_and_pending, meeting_id)
+        refreshing = RollingSummaryService.is_refreshing(meeting_id)
+        if not refreshing and pending:
+            refreshing = RollingSummaryService.schedule_refresh(meeting_id)
+        return RollingSummaryService.to_response(meeting_id, state, refreshing)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get current summary error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get summary")
+
+@router.post("/summary/{meeting_id}/current", response_model=RollingSummaryResponse)
+async def refresh_current_summary(meeting_id: UUID, db: AsyncSession = Depends(get_async_db), user_id: str = None):
+    """Fold transcripts added since the last refresh into the live summary"""
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    try:
+        meeting = await AsyncMeetingService.get_meeting(db, meeting_id)
+        if not meeting:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
+        # Don't hold a connection across the refresh, which uses its own session
+        await db.commit()
+        
+        state = await RollingSummaryService.refresh_shared(meeting_id)
+        return RollingSummaryService.to_response(meeting_id, state)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Refresh current summary error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to refresh summary")
@@ -1,87 +1,430 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
+from typing import List, Optional, Tuple
+from email.utils import formatdate
+import asyncio
+import json
 import os
-from app.database import get_db
+from app.database import get_async_db, SessionLocal
 from app.config import settings
-from app.services.ai import AIService
-from app.services.meeting import MeetingService
-from app.schemas.audio import AudioUploadResponse
-from app.models.summary import AudioFile
+from app.services.audio import AudioService
+from app.services.jobs import JobService
+from app.services.meeting import AsyncMeetingService, MeetingService
+from app.services.events import job_events
+from app.services.upload import (
+    receive_upload, write_part, hash_file, sniff_audio_format, safe_filename,
+    InvalidUploadError, UploadTooLargeError, UnsupportedAudioError
+)
+from app.services.resumable import ResumableUploadService
+from app.services.media import RangeFileResponse, RangeNotSatisfiableError, file_etag, is_not_modified, parse_range
+from app.schemas.audio import AudioUploadResponse, TranscriptionJobResponse, UploadSessionCreate, UploadSessionResponse
+from app.schemas.meeting import TranscriptResponse
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.post("/upload", response_model=dict)
+SSE_BATCH_LIMIT = 500
+SSE_POLL_SECONDS = 1.0  # used when the LISTEN connection is unavailable
+SSE_KEEPALIVE_SECONDS = 15.0
+
+def _upload_result(response: Response, audio_file, job, filename: str) -> dict:
+    if job.status == "completed":
+        # Served from the transcription cache; nothing left to process
+        response.status_code = status.HTTP_200_OK
+    return {
+        "status": job.status,
+        "job_id": str(job.id),
+        "audio_file_id": str(audio_file.id),
+        "file_path": audio_file.file_path,
+        "file_size": audio_file.file_size,
+        "filename": filename,
+        "segments_saved": job.segments_saved or 0,
+        "url": f"/api/audio/files/{audio_file.id}"
+    }
+
+def _request_user_id(request: Request) -> str:
+    """Caller identity from the JWT middleware (never from the query string)"""
+    user_id = getattr(request.state, "user_id", None)
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return user_id
+
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"]
+                }
+            },
+            "audio/*": {"schema": {"type": "string", "format": "binary"}}
+        }
+    }
+}
+
+@router.post("/upload", response_model=dict, status_code=status.HTTP_202_ACCEPTED, openapi_extra=UPLOAD_OPENAPI)
 async def upload_audio(
     meeting_id: UUID,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    user_id: str = None
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Upload audio file for meeting"""
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    """
+    Upload audio file for meeting and queue it for transcription.
+    The body is streamed straight to disk, either as multipart (field `file`)
+    or as raw audio bytes with a `filename` query parameter.
+    """
+    user_id = _request_user_id(request)
     
     try:
-        # Create uploads directory if it doesn't exist
-        os.makedirs(settings.upload_dir, exist_ok=True)
-        
-        # Validate file size
-        contents = await file.read()
-        if len(contents) > settings.max_file_size:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail="File too large"
-            )
-        # Ensure meeting exists
-        meeting = MeetingService.get_meeting(db, meeting_id)
+        # Ensure meeting exists and the caller belongs to it before accepting the body
+        meeting = await AsyncMeetingService.get_meeting(db, meeting_id)
         if not meeting:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
+        if not await AsyncMeetingService.user_can_access(db, meeting, UUID(user_id)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this meeting")
+        # Release the pooled connection while the body streams in
+        await db.commit()
         
-        # Save file
-        filename = f"{meeting_id}_{file.filename}"
+        # Stream to a temp file, enforcing the size limit as bytes arrive
+        upload = await receive_upload(request, settings.max_file_size, settings.upload_dir)
+        filename = f"{meeting_id}_{upload.filename}"
         file_path = os.path.join(settings.upload_dir, filename)
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        try:
+            await upload.finish(file_path)
+        except BaseException:
+            await upload.abort()
+            raise
 
         audio_url = f"/uploads/{filename}"
 
-        # Save audio file record
-        audio_file = AudioFile(
+        # Save audio file record and queue transcription; a worker fills in the transcript
+        # unless this exact audio was transcribed before
+        audio_file, job = await db.run_sync(
+            AudioService.register_upload,
             meeting_id=meeting_id,
-            file_path=audio_url,
-            file_size=len(contents),
-            format=file.content_type or "audio",
-            duration_seconds=transcription.get("duration")
+            file_path=os.path.abspath(file_path),
+            audio_url=audio_url,
+            file_size=upload.size,
+            content_type=upload.content_type,
+            content_sha256=upload.sha256
+        )
+        return _upload_result(response, audio_file, job, upload.filename)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+    except UnsupportedAudioError:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported audio format")
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Upload error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Upload failed")
+
+async def _get_owned_session(db: AsyncSession, upload_id: UUID, request: Request, lock: bool = False):
+    user_id = _request_user_id(request)
+    session = await db.run_sync(ResumableUploadService.get_session, upload_id, lock=lock)
+    if not session or str(session.user_id) != str(user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return session
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    session_data: UploadSessionCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start a resumable upload; parts can then be sent in any order and in parallel"""
+    user_id = _request_user_id(request)
+    if session_data.total_size > settings.max_file_size:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+    
+    try:
+        meeting = await AsyncMeetingService.get_meeting(db, session_data.meeting_id)
+        if not meeting:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Meeting not found")
+        if not await AsyncMeetingService.user_can_access(db, meeting, UUID(user_id)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this meeting")
+        
+        session = await db.run_sync(ResumableUploadService.create_session, UUID(user_id), session_data)
+        return ResumableUploadService.to_response(session)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Create upload session error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create upload")
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(upload_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get received byte ranges so an interrupted upload can resume"""
+    session = await _get_owned_session(db, upload_id, request)
+    return ResumableUploadService.to_response(session)
+
+@router.put("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def upload_part(
+    upload_id: UUID,
+    offset: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Write the raw request body at `offset`. Re-sending a part is harmless."""
+    session = await _get_owned_session(db, upload_id, request)
+    if session.status != "open":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload already completed")
+    if ResumableUploadService.is_expired(session):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload expired")
+    if offset < 0 or offset >= session.total_size:
+        raise HTTPException(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, detail="Offset out of range")
+    
+    max_bytes = min(settings.resumable_max_part_size, session.total_size - offset)
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Part too large")
+    # Release the pooled connection while the body streams in
+    await db.commit()
+    
+    try:
+        written = await write_part(request, ResumableUploadService.part_path(upload_id), offset, max_bytes)
+        if not written:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty part")
+        session = await db.run_sync(ResumableUploadService.record_part, upload_id, offset, offset + written)
+        if session is None:
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload expired")
+        return ResumableUploadService.to_response(session)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Part too large")
+    except FileNotFoundError:
+        # Purged while the part was on its way
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload expired")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Upload part error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to store part")
+
+@router.post("/uploads/{upload_id}/complete", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def complete_upload_session(
+    upload_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Finalize a fully received upload and queue it for transcription"""
+    session = await _get_owned_session(db, upload_id, request, lock=True)
+    if session.status != "open":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload already completed")
+    if ResumableUploadService.is_expired(session):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Upload expired")
+    if not ResumableUploadService.is_complete(session):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload incomplete: {session.received_bytes} of {session.total_size} bytes received"
         )
-        db.add(audio_file)
-        db.commit()
-        db.refresh(audio_file)
+    
+    try:
+        part_path = ResumableUploadService.part_path(upload_id)
+        content_sha256, head = await asyncio.to_thread(hash_file, part_path)
+        sniffed = sniff_audio_format(head)
+        declared = session.content_type or ""
+        if not sniffed and not declared.startswith(("audio/", "video/")):
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Unsupported audio format")
         
-        # Transcribe and store transcript rows so /api/ai/summarize can work
-        transcription = AIService.transcribe_audio(file_path)
-        segments = transcription.get("segments", [])
-        for segment in segments:
-            MeetingService.add_transcript(
-                db=db,
-                meeting_id=meeting_id,
-                speaker_name=segment.get("speaker") or "Speaker",
-                text=segment.get("text", ""),
-                timestamp=int(segment.get("start", 0))
+        filename = f"{session.meeting_id}_{safe_filename(session.filename)}"
+        file_path = os.path.join(settings.upload_dir, filename)
+        os.replace(part_path, file_path)
+        try:
+            # Marked completed in the same transaction that creates the audio file and job
+            audio_file, job = await db.run_sync(
+                AudioService.register_upload,
+                meeting_id=session.meeting_id,
+                file_path=os.path.abspath(file_path),
+                audio_url=f"/uploads/{filename}",
+                file_size=session.total_size,
+                content_type=sniffed or declared,
+                content_sha256=content_sha256,
+                commit=False
             )
+            session.status = "completed"
+            session.audio_file_id = audio_file.id
+            await db.commit()
+        except BaseException:
+            # Nothing was recorded: put the part back so completing can be retried
+            os.replace(file_path, part_path)
+            raise
         
-        return {
-            "status": "uploaded",
-            "file_path": audio_url,
-            "file_size": len(contents),
-            "filename": file.filename,
-            "transcript_text": transcription.get("text", ""),
-            "segments_saved": len(segments)
-        }
+        return _upload_result(response, audio_file, job, session.filename)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Upload error: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Upload failed")
+        logger.error(f"Complete upload error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to complete upload")
+
+@router.delete("/uploads/{upload_id}", response_model=dict)
+async def abort_upload_session(upload_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Abort an open upload and discard received parts"""
+    session = await _get_owned_session(db, upload_id, request)
+    if session.status != "open":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload already completed")
+    await db.run_sync(ResumableUploadService.delete_session, session)
+    return {"status": "aborted"}
+
+@router.api_route("/files/{audio_file_id}", methods=["GET", "HEAD"], response_class=Response)
+async def get_audio_file(audio_file_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Serve a meeting recording with byte-range, ETag and Last-Modified support.
+    Browsers' <audio> elements cannot set headers, so the token may also be
+    passed as a `token` query parameter.
+    """
+    user_id = getattr(request.state, "user_id", None)
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    
+    audio_file = await db.run_sync(AudioService.get_audio_file, audio_file_id)
+    if not audio_file:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio file not found")
+    meeting = await AsyncMeetingService.get_meeting(db, audio_file.meeting_id)
+    if not await AsyncMeetingService.user_can_access(db, meeting, UUID(user_id)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this meeting")
+    # Release the pooled connection before the file is sent
+    await db.commit()
+    
+    path = AudioService.storage_path(audio_file)
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Audio file not found")
+    
+    etag = file_etag(stat_result, audio_file.content_sha256)
+    headers = {"cache-control": settings.audio_cache_control}
+    if is_not_modified(request.headers, etag, stat_result.st_mtime):
+        headers.update({"etag": etag, "last-modified": formatdate(stat_result.st_mtime, usegmt=True)})
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    media_type = audio_file.format if "/" in (audio_file.format or "") else "application/octet-stream"
+    if settings.audio_accel_redirect_prefix:
+        # The reverse proxy handles ranges and sendfile; we only authorize
+        headers.update({
+            "x-accel-redirect": f"{settings.audio_accel_redirect_prefix.rstrip('/')}/{os.path.basename(path)}",
+            "etag": etag
+        })
+        return Response(headers=headers, media_type=media_type)
+    
+    try:
+        byte_range = parse_range(request.headers, stat_result.st_size, etag, stat_result.st_mtime)
+    except RangeNotSatisfiableError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"content-range": f"bytes */{stat_result.st_size}", "accept-ranges": "bytes"}
+        )
+    return RangeFileResponse(
+        path,
+        stat_result,
+        etag,
+        media_type=media_type,
+        byte_range=byte_range,
+        headers=headers,
+        send_body=request.method != "HEAD"
+    )
+
+@router.get("/jobs/{job_id}", response_model=TranscriptionJobResponse)
+async def get_transcription_job(job_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get transcription job status"""
+    user_id = _request_user_id(request)
+    try:
+        job = await db.run_sync(JobService.get_job, job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        meeting = await AsyncMeetingService.get_meeting(db, job.meeting_id)
+        if not await AsyncMeetingService.user_can_access(db, meeting, UUID(user_id)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this meeting")
+        
+        return TranscriptionJobResponse.from_orm(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get job error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get job")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _job_access(job_id: UUID, user_id: str) -> Optional[bool]:
+    """None if the job doesn't exist, else whether the user can access its meeting (runs in a worker thread)"""
+    db = SessionLocal()
+    try:
+        job = JobService.get_job(db, job_id)
+        if not job:
+            return None
+        return MeetingService.user_can_access(db, job.meeting, UUID(user_id))
+    finally:
+        db.close()
+
+def _read_job_events(job_id: UUID, cursor: Optional[Tuple]) -> Tuple[Optional[dict], List[dict], Optional[Tuple]]:
+    """Job state plus transcript rows stored since `cursor` (runs in a worker thread)"""
+    db = SessionLocal()
+    try:
+        job = JobService.get_job(db, job_id)
+        if not job:
+            return None, [], cursor
+        rows = MeetingService.get_transcripts_after(
+            db, job.meeting_id, after=cursor, since=job.created_at, limit=SSE_BATCH_LIMIT
+        )
+        if rows:
+            cursor = (rows[-1].created_at, rows[-1].id)
+        state = TranscriptionJobResponse.from_orm(job).dict()
+        segments = [TranscriptResponse.from_orm(row).dict() for row in rows]
+        return state, segments, cursor
+    finally:
+        db.close()
+
+@router.get("/jobs/{job_id}/events")
+async def stream_transcription_job(job_id: UUID, request: Request):
+    """Stream transcript segments and progress for a job as Server-Sent Events"""
+    user_id = _request_user_id(request)
+    access = await asyncio.to_thread(_job_access, job_id, user_id)
+    if access is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if not access:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this meeting")
+    
+    async def event_stream():
+        wakeup = job_events.subscribe(job_id)
+        cursor = None
+        last_progress = None
+        try:
+            while True:
+                wakeup.clear()
+                state, segments, cursor = await asyncio.to_thread(_read_job_events, job_id, cursor)
+                if state is None:
+                    yield _sse("error", {"detail": "Job not found"})
+                    return
+                for segment in segments:
+                    yield _sse("segment", segment)
+                if state["progress"] != last_progress:
+                    last_progress = state["progress"]
+                    yield _sse("progress", state)
+                if state["status"] in ("completed", "failed") and len(segments) < SSE_BATCH_LIMIT:
+                    yield _sse(state["status"], state)
+                    return
+                if len(segments) == SSE_BATCH_LIMIT:
+                    continue
+                timeout = SSE_KEEPALIVE_SECONDS if job_events.running else SSE_POLL_SECONDS
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            job_events.unsubscribe(job_id, wakeup)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.services.auth import AuthService
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.services.auth import AsyncAuthService, AuthService
 from app.schemas.auth import UserCreate, LoginRequest, TokenResponse, UserResponse
 import logging
 from typing import Optional
@@ -38,10 +38,10 @@ def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(secu
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or missing token")
 
 @router.post("/register", response_model=TokenResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register new user"""
     try:
-        user = AuthService.register_user(db, user_data)
+        user = await AsyncAuthService.register_user(db, user_data)
         token = AuthService.create_access_token({"sub": str(user.id), "email": user.email})
         return {
             "access_token": token,
@@ -55,10 +55,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Registration failed")
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login user"""
     try:
-        user = AuthService.authenticate_user(db, credentials.email, credentials.password)
+        user = await AsyncAuthService.authenticate_user(db, credentials.email, credentials.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,9 +78,9 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Login failed")
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(db: Session = Depends(get_db), user_id: str = Depends(get_current_user_id)):
+async def get_current_user(db: AsyncSession = Depends(get_async_db), user_id: str = Depends(get_current_user_id)):
     """Get current user profile"""
-    user = AuthService.get_user_by_id(db, user_id)
+    user = await AsyncAuthService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
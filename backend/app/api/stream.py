@@ -0,0 +1,128 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from uuid import UUID
+from typing import Dict, List, Optional
+from app.database import SessionLocal
+from app.services.auth import AuthService
+from app.services.meeting import MeetingService
+from app.services.streaming import FrameDecoder, StreamingTranscriber
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def _can_stream_to(meeting_id: UUID, user_id: str) -> bool:
+    """Meeting exists and the user is its host, a participant or an admin"""
+    db = SessionLocal()
+    try:
+        meeting = MeetingService.get_meeting(db, meeting_id)
+        return meeting is not None and MeetingService.user_can_access(db, meeting, UUID(user_id))
+    finally:
+        db.close()
+
+def _persist_segments(meeting_id: UUID, speaker_name: str, segments: List[Dict]) -> None:
+    """Store final segments in one transaction (runs in a worker thread)"""
+    db = SessionLocal()
+    try:
+        MeetingService.add_transcripts_bulk(db, meeting_id, segments, speaker_name=speaker_name)
+    finally:
+        db.close()
+
+@router.websocket("/ws/meetings/{meeting_id}/audio")
+async def stream_meeting_audio(
+    websocket: WebSocket,
+    meeting_id: UUID,
+    token: Optional[str] = None,
+    format: str = "pcm16",
+    speaker: str = "Speaker"
+):
+    """
+    Live transcription. Binary messages carry audio frames in `format`
+    (pcm16/f32 at 16kHz mono, or 48kHz opus packets); text messages carry
+    JSON control messages: {"type": "speaker", "name": ...} or {"type": "stop"}.
+    The server sends {"type": "partial"} hypotheses and {"type": "final"} segments;
+    only final segments are stored.
+    """
+    payload = AuthService.decode_token(token) if token else None
+    if not payload or not payload.get("sub"):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    try:
+        decoder = FrameDecoder(format)
+    except ValueError as e:
+        logger.warning(f"Rejecting audio stream: {str(e)}")
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+        return
+
+    if not await asyncio.to_thread(_can_stream_to, meeting_id, payload["sub"]):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await websocket.send_json({"type": "ready"})
+
+    transcriber = StreamingTranscriber()
+    audio_ready = asyncio.Event()
+    state = {"speaker": speaker}
+
+    async def receive_frames() -> None:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                transcriber.feed(decoder.decode(message["bytes"]))
+                if transcriber.ready:
+                    audio_ready.set()
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "speaker" and control.get("name"):
+                    state["speaker"] = control["name"]
+                elif control.get("type") == "stop":
+                    return
+
+    async def emit(finals: List[Dict], partial: Optional[Dict]) -> None:
+        if finals:
+            await asyncio.to_thread(_persist_segments, meeting_id, state["speaker"], finals)
+        try:
+            if finals:
+                await websocket.send_json({
+                    "type": "final",
+                    "speaker": state["speaker"],
+                    "segments": [
+                        {"text": s["text"].strip(), "start": s["start"], "end": s["end"], "confidence": s["confidence"]}
+                        for s in finals
+                    ]
+                })
+            if partial:
+                await websocket.send_json({"type": "partial", "speaker": state["speaker"], **partial})
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+
+    receiver = asyncio.create_task(receive_frames())
+    try:
+        while not receiver.done():
+            waiter = asyncio.create_task(audio_ready.wait())
+            await asyncio.wait({receiver, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if audio_ready.is_set():
+                audio_ready.clear()
+                # Decoding runs off the event loop; frames keep arriving meanwhile
+                finals, partial = await asyncio.to_thread(transcriber.decode)
+                await emit(finals, partial)
+
+        finals, _ = await asyncio.to_thread(transcriber.decode, True)
+        await emit(finals, None)
+        receiver.result()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Audio stream error for meeting {meeting_id}: {str(e)}", exc_info=True)
+    finally:
+        receiver.cancel()
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass
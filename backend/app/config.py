@@ -6,6 +6,9 @@ from functools import lru_cache
 class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql://fahmidhamim@localhost:5432/echobriefdb"
+    async_db_pool_size: int = 10  # asyncpg connections per API process
+    async_db_max_overflow: int = 10
+    lock_db_pool_size: int = 5  # connections holding advisory locks per process, apart from request pools
     
     # JWT
     jwt_secret: str = "your-secret-key-change-this-in-production"
@@ -15,14 +18,88 @@ class Settings(BaseSettings):
     # AI Services
     openai_api_key: Optional[str] = None
     groq_api_key: Optional[str] = None
+    openai_base_url: str = "https://api.openai.com/v1"
+    openai_model: str = "gpt-3.5-turbo"
+    groq_base_url: str = "https://api.groq.com/openai/v1"
+    groq_model: str = "llama-3.1-70b-versatile"
+    llm_timeout_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 5.0
+    llm_max_retries: int = 2
+    llm_retry_base_seconds: float = 0.5  # doubled per retry, with jitter
+    llm_max_concurrency: int = 8  # in-flight requests per provider
+    llm_max_connections: int = 16  # pooled keep-alive connections per provider
+    llm_circuit_window: int = 20  # recent requests per provider used for latency and error rates
+    llm_circuit_error_rate: float = 0.5  # error rate over the window that opens the circuit
+    llm_circuit_min_requests: int = 5
+    llm_circuit_cooldown_seconds: float = 30.0  # open circuits let one probe through after this
+    llm_hedge_enabled: bool = False  # fire a second provider when the first is slower than its p95
+    llm_hedge_min_delay_seconds: float = 1.0
+    llm_hedge_default_delay_seconds: float = 10.0  # hedge delay until a provider has latency samples
+    local_llm_model_path: Optional[str] = None  # CTranslate2 model dir with tokenizer.json; adds the "local" provider
+    local_llm_architecture: str = "decoder"  # "decoder" (instruct LLM) or "seq2seq" (e.g. flan-t5)
+    local_llm_prompt_format: str = "chatml"  # decoder prompts: "chatml" or "plain"
+    local_llm_compute_type: str = "int8"
+    local_llm_threads: int = 0  # intra-op threads per generation; 0 lets CTranslate2 pick
+    local_llm_workers: int = 1  # concurrent generations
+    local_llm_max_input_tokens: int = 4096
+    local_llm_preload: bool = False
+    summary_chunk_tokens: int = 3000  # transcript tokens per map prompt; longer meetings are map-reduced
+    summary_output_tokens: int = 1024
+    rolling_summary_max_words: int = 300
+    rolling_summary_batch_segments: int = 1000  # transcripts folded per step of a refresh
+    summary_lock_timeout_seconds: float = 180.0  # how long a request waits on another worker's generation
+    summary_cache_max_entries: int = 512
+    summary_cache_ttl_seconds: int = 86400
+    redis_url: Optional[str] = None  # shares the summary cache across processes when set
+    
+    # Transcription (faster-whisper)
+    whisper_model_size: str = "base"
+    whisper_device: str = "cpu"
+    whisper_compute_type: str = "int8"
+    whisper_cpu_threads: int = 0  # 0 lets CTranslate2 pick the core count
+    whisper_num_workers: int = 2  # concurrent transcribe() calls per model
+    whisper_preload: bool = True
+    
+    # Long-audio mode: split at silences and transcribe chunks in a process pool
+    long_audio_enabled: bool = True
+    long_audio_threshold_seconds: int = 900
+    long_audio_chunk_seconds: int = 240
+    long_audio_search_seconds: float = 20.0  # window around each target cut to look for silence
+    long_audio_overlap_seconds: float = 2.0  # only used when no silence is found
+    long_audio_workers: int = 0  # 0 = one process per CPU core
+    
+    # Live streaming transcription
+    streaming_model_size: str = "base"
+    streaming_step_seconds: float = 1.0  # new audio needed before re-decoding the window
+    streaming_stability_seconds: float = 1.5  # segments ending earlier than this are final
+    streaming_max_window_seconds: float = 15.0
+    
+    # Transcription jobs
+    transcription_job_max_attempts: int = 3
+    transcription_job_lease_seconds: int = 120  # expired leases are reclaimed after a worker crash
+    transcription_job_retry_seconds: int = 10  # base delay, doubled per attempt
+    transcription_poll_interval: float = 1.0
+    transcription_batch_size: int = 16  # segments stored per commit
+    transcription_flush_seconds: float = 2.0  # max time a decoded segment waits before it is stored
+    transcription_workers: int = 2  # threads per `python -m app.worker` process
+    embedded_transcription_workers: int = 1  # worker threads inside the API process; 0 in production
     
     # Server
     server_host: str = "0.0.0.0"
     server_port: int = 8000
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_seconds: float = 0.05  # how often event-loop scheduling delay is sampled
+    loop_monitor_stall_seconds: float = 0.1  # blocking longer than this is attributed to a handler
     
     # File Storage
     upload_dir: str = "./uploads"
     max_file_size: int = 104857600  # 100MB
+    audio_cache_control: str = "private, max-age=86400"
+    audio_accel_redirect_prefix: str = ""  # e.g. "/protected-uploads" to let nginx send files
+    resumable_upload_expiry_hours: int = 24
+    resumable_max_part_size: int = 16777216  # 16MB
+    transcription_cache_dir: str = "./cache/transcripts"
+    transcription_cache_max_bytes: int = 1073741824  # 1GB
     
     # Environment
     environment: str = "development"
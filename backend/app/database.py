@@ -1,6 +1,9 @@
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from sqlalchemy.pool import NullPool
+from typing import AsyncIterator
 from app.config import settings
 import logging
 
@@ -18,6 +21,26 @@ engine = create_engine(
     pool_recycle=3600,
 )
 
+# Advisory locks are held on their own connection for as long as the work
+# they guard (e.g. an LLM call), so they get a small pool of their own rather
+# than starving the sessions of sync routes and workers
+if settings.environment == "testing":
+    lock_pool_options = {"poolclass": NullPool}
+else:
+    lock_pool_options = {
+        "pool_size": settings.lock_db_pool_size,
+        "max_overflow": 0,
+        "pool_timeout": settings.summary_lock_timeout_seconds
+    }
+
+lock_engine = create_engine(
+    settings.database_url,
+    echo=settings.debug,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    **lock_pool_options
+)
+
 # Create session factory
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -33,6 +56,38 @@ def get_db() -> Session:
     finally:
         db.close()
 
+def async_database_url(url: str) -> str:
+    """The same database through asyncpg"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+# Async engine for request handlers, so queries don't block the event loop.
+# Worker threads and scripts keep the sync engine above.
+if settings.environment == "testing":
+    async_pool_options = {"poolclass": NullPool}
+else:
+    async_pool_options = {"pool_size": settings.async_db_pool_size, "max_overflow": settings.async_db_max_overflow}
+
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    echo=settings.debug,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    **async_pool_options
+)
+
+# Objects stay usable after commit; lazy loads are not available on async sessions
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Event listeners
 @event.listens_for(engine, "connect")
 def receive_connect(dbapi_conn, connection_record):
@@ -4,26 +4,66 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.openapi.utils import get_openapi
 from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
-from fastapi.staticfiles import StaticFiles
 
 # Load environment variables
 load_dotenv()
 
 # Import routers
-from app.api import auth, meetings, audio, ai, admin
+from app.api import auth, meetings, audio, ai, admin, stream
 from app.middleware.auth import JWTMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.whisper import model_registry
+from app.services.long_audio import long_audio_transcriber
+from app.services.events import job_events
+from app.services.llm import llm_gateway
+from app.services.local_llm import local_llm
+from app.services.loop_monitor import loop_monitor
+from app.services.summary_cache import summary_cache
+from app.worker import TranscriptionWorkerPool
+from app.config import settings
+from app.database import async_engine
 
 # Lifespan context manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 EchoBrief AI Server Starting...")
+    if settings.loop_monitor_enabled:
+        loop_monitor.start(app)
+    if settings.whisper_preload:
+        try:
+            # Load Whisper once per process instead of on every upload
+            await asyncio.to_thread(model_registry.preload)
+        except Exception as e:
+            print(f"⚠️  Whisper preload failed, models will load on first use: {e}")
+    if settings.local_llm_model_path and settings.local_llm_preload:
+        try:
+            await asyncio.to_thread(local_llm.load)
+        except Exception as e:
+            print(f"⚠️  Local LLM preload failed, it will load on first use: {e}")
+    try:
+        job_events.start()
+    except Exception as e:
+        print(f"⚠️  Job event listener unavailable, SSE will poll: {e}")
+    # In production run `python -m app.worker` and set EMBEDDED_TRANSCRIPTION_WORKERS=0
+    workers = None
+    if settings.embedded_transcription_workers > 0:
+        workers = TranscriptionWorkerPool(settings.embedded_transcription_workers)
+        workers.start()
     yield
     # Shutdown
     print("🛑 EchoBrief AI Server Shutting Down...")
+    loop_monitor.stop()
+    if workers:
+        workers.stop(timeout=0)
+    long_audio_transcriber.shutdown()
+    job_events.stop()
+    await llm_gateway.aclose()
+    await summary_cache.aclose()
+    await async_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -95,10 +135,10 @@ app.include_router(meetings.router, prefix="/api/meetings", tags=["Meetings"])
 app.include_router(audio.router, prefix="/api/audio", tags=["Audio"])
 app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(stream.router, tags=["Streaming"])
 
-# Serve uploaded audio files
+# Uploaded audio is served by /api/audio/files/{id}, which checks meeting access
 os.makedirs(os.getenv("UPLOAD_DIR", "./uploads"), exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=os.getenv("UPLOAD_DIR", "./uploads")), name="uploads")
 
 # Health check endpoint
 @app.get("/health")
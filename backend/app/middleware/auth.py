@@ -6,6 +6,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+MEDIA_PATH_PREFIX = "/api/audio/files/"
+
 class JWTMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         # Allow preflight requests
@@ -20,7 +22,12 @@ class JWTMiddleware(BaseHTTPMiddleware):
         
         # Extract token from Authorization header
         auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header.split(" ")[1]
+        elif request.url.path.startswith(MEDIA_PATH_PREFIX) and request.query_params.get("token"):
+            # Media elements cannot send headers
+            token = request.query_params["token"]
+        else:
             # Allow WebSocket connections without token for now
             if request.url.path.startswith("/ws"):
                 return await call_next(request)
@@ -29,7 +36,6 @@ class JWTMiddleware(BaseHTTPMiddleware):
                 content={"detail": "Missing or invalid authorization header"}
             )
         
-        token = auth_header.split(" ")[1]
         payload = AuthService.decode_token(token)
         
         if not payload:
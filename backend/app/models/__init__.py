@@ -2,7 +2,11 @@
 from app.models.user import User
 from app.models.meeting import Meeting
 from app.models.transcript import Participant, Transcript
-from app.models.summary import Summary, AudioFile, APIKey, AuditLog
+from app.models.summary import Summary, RollingSummary, AudioFile, APIKey, AuditLog
+from app.models.job import TranscriptionJob
+from app.models.upload import UploadSession
+from app.models.term import MeetingTerm, TermDocumentFrequency, TermIndexStats
+from app.models.metrics import MetricCounter, MetricBucket
 
 __all__ = [
     "User",
@@ -10,7 +14,15 @@ __all__ = [
     "Participant",
     "Transcript",
     "Summary",
+    "RollingSummary",
     "AudioFile",
     "APIKey",
-    "AuditLog"
+    "AuditLog",
+    "TranscriptionJob",
+    "UploadSession",
+    "MeetingTerm",
+    "TermDocumentFrequency",
+    "TermIndexStats",
+    "MetricCounter",
+    "MetricBucket"
 ]
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, Float, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+from app.database import Base
+
+class TranscriptionJob(Base):
+    __tablename__ = "transcription_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    meeting_id = Column(UUID(as_uuid=True), ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False, index=True)
+    audio_file_id = Column(UUID(as_uuid=True), ForeignKey("audio_files.id", ondelete="CASCADE"), nullable=False, index=True)
+    file_path = Column(String(500), nullable=False)  # path on disk, not the public URL
+    status = Column(String(50), default="queued", nullable=False)  # queued, running, completed, failed
+    progress = Column(Float, default=0.0)  # percent of audio duration decoded
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String(255))
+    locked_until = Column(DateTime)
+    audio_duration_seconds = Column(Float)
+    segments_saved = Column(Integer, default=0)
+    decoded_until_seconds = Column(Float, default=0.0)  # end of the last stored segment; retries resume here
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("idx_transcription_jobs_claim", "status", "run_after"),
+    )
+    
+    # Relationships
+    meeting = relationship("Meeting")
+    audio_file = relationship("AudioFile")
+    
+    def __repr__(self):
+        return f"<TranscriptionJob {self.id} {self.status}>"
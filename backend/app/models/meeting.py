@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, Boolean, Index, BigInteger
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -19,6 +19,21 @@ class Meeting(Base):
     ended_at = Column(DateTime)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Counts of related rows, kept in step by the services that write them
+    participants_count = Column(Integer, nullable=False, default=0, server_default="0")
+    transcript_count = Column(Integer, nullable=False, default=0, server_default="0")
+    audio_file_count = Column(Integer, nullable=False, default=0, server_default="0")
+    has_summary = Column(Boolean, nullable=False, default=False, server_default="false")
+    # Last transcript seq handed out; only advanced under the row lock, never reconciled
+    transcript_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
+    
+    __table_args__ = (
+        # Keyset pages for admin listings, unfiltered and by status or host
+        Index("idx_meetings_cursor", "created_at", "id"),
+        Index("idx_meetings_status_cursor", "status", "created_at", "id"),
+        Index("idx_meetings_host_cursor", "host_id", "created_at", "id"),
+    )
+    
     # Relationships
     host = relationship("User", back_populates="meetings", foreign_keys=[host_id])
     participants = relationship("Participant", back_populates="meeting", cascade="all, delete-orphan")
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, SmallInteger, Float
+from app.database import Base
+
+class MetricCounter(Base):
+    """Running total of a metric; spread over shards so concurrent writers don't queue on one row"""
+    __tablename__ = "metric_counters"
+
+    metric = Column(String(64), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    value = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<MetricCounter {self.metric}[{self.shard}]={self.value}>"
+
+class MetricBucket(Base):
+    """Amount a metric grew by within one hour or day (UTC)"""
+    __tablename__ = "metric_buckets"
+
+    metric = Column(String(64), primary_key=True)
+    granularity = Column(String(8), primary_key=True)  # hour, day
+    bucket_start = Column(DateTime, primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    value = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<MetricBucket {self.metric} {self.granularity} {self.bucket_start}={self.value}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, BigInteger
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -15,6 +15,8 @@ class Summary(Base):
     keywords = Column(ARRAY(Text))
     duration_seconds = Column(Integer)
     word_count = Column(Integer)
+    content_hash = Column(String(64))  # summary cache key of the transcript it was generated from
+    model = Column(String(255))  # "provider/model" of each LLM that answered; empty for extractive fallbacks
     generated_at = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
@@ -24,6 +26,24 @@ class Summary(Base):
     def __repr__(self):
         return f"<Summary {self.meeting_id}>"
 
+class RollingSummary(Base):
+    __tablename__ = "rolling_summaries"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    meeting_id = Column(UUID(as_uuid=True), ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+    summary_text = Column(Text, nullable=False, default="")
+    action_items = Column(ARRAY(Text))
+    keywords = Column(ARRAY(Text))
+    # seq (and created_at) of the last transcript folded into the summary
+    watermark_seq = Column(BigInteger)
+    watermark_created_at = Column(DateTime)
+    segments_folded = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<RollingSummary {self.meeting_id}>"
+
 class AudioFile(Base):
     __tablename__ = "audio_files"
     
@@ -33,6 +53,7 @@ class AudioFile(Base):
     file_size = Column(Integer)
     duration_seconds = Column(Integer)
     format = Column(String(50))
+    content_sha256 = Column(String(64), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, BigInteger, SmallInteger, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class MeetingTerm(Base):
+    """How often a term occurs in one meeting's transcript"""
+    __tablename__ = "meeting_terms"
+    
+    meeting_id = Column(UUID(as_uuid=True), ForeignKey("meetings.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String(64), primary_key=True)
+    tf = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<MeetingTerm {self.term} in {self.meeting_id}>"
+
+class TermDocumentFrequency(Base):
+    """Number of meetings whose transcript contains a term"""
+    __tablename__ = "term_document_frequency"
+    
+    term = Column(String(64), primary_key=True)
+    df = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<TermDocumentFrequency {self.term}={self.df}>"
+
+class TermIndexStats(Base):
+    """Single row holding the number of indexed meetings (the IDF corpus size)"""
+    __tablename__ = "term_index_stats"
+    
+    id = Column(SmallInteger, primary_key=True, default=1)
+    documents = Column(BigInteger, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, Float
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, Float, Index, BigInteger
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -33,9 +33,20 @@ class Transcript(Base):
     speaker_name = Column(String(255))
     transcript_text = Column(Text, nullable=False)
     timestamp_seconds = Column(Integer)
+    start_seconds = Column(Float)
+    end_seconds = Column(Float)
     confidence = Column(Float, default=0.0)
+    # Per-meeting position in commit order (see MeetingService.claim_seq)
+    seq = Column(BigInteger)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
+    __table_args__ = (
+        # Cursor reads: SSE streams
+        Index("idx_transcripts_meeting_cursor", "meeting_id", "created_at", "id"),
+        # Rolling-summary watermarks
+        Index("idx_transcripts_meeting_seq", "meeting_id", "seq"),
+    )
+    
     # Relationships
     meeting = relationship("Meeting", back_populates="transcripts")
     participant = relationship("Participant", back_populates="transcripts")
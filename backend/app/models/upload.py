@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, DateTime, BigInteger, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+from app.database import Base
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    meeting_id = Column(UUID(as_uuid=True), ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(100))
+    total_size = Column(BigInteger, nullable=False)
+    received_bytes = Column(BigInteger, default=0, nullable=False)
+    received_ranges = Column(Text, default="[]", nullable=False)  # JSON list of [start, end) byte ranges
+    status = Column(String(50), default="open", nullable=False)  # open, completed
+    audio_file_id = Column(UUID(as_uuid=True), ForeignKey("audio_files.id", ondelete="SET NULL"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    
+    # Relationships
+    meeting = relationship("Meeting")
+    
+    def __repr__(self):
+        return f"<UploadSession {self.id} {self.received_bytes}/{self.total_size}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -18,6 +18,11 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime)
     
+    __table_args__ = (
+        # Keyset pages for the admin user listing
+        Index("idx_users_cursor", "created_at", "id"),
+    )
+    
     # Relationships
     meetings = relationship("Meeting", back_populates="host", foreign_keys="Meeting.host_id")
     participants = relationship("Participant", back_populates="user")
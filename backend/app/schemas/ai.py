@@ -15,11 +15,25 @@ class SummarizeResponse(BaseModel):
     keywords: List[str]
     duration_seconds: Optional[int]
     word_count: Optional[int] = None
+    model: Optional[str] = None
     generated_at: datetime
     
     class Config:
         from_attributes = True
 
+class RollingSummaryResponse(BaseModel):
+    meeting_id: UUID
+    summary_text: str
+    action_items: List[str] = []
+    keywords: List[str] = []
+    segments_folded: int = 0
+    watermark_created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    refreshing: bool = False
+    
+    class Config:
+        from_attributes = True
+
 class AIMetricsResponse(BaseModel):
     total_meetings_summarized: int
     total_transcripts_processed: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -32,3 +32,40 @@ class TranscriptionResponse(BaseModel):
     segments: list
     duration_seconds: int
     word_count: int
+
+class TranscriptionJobResponse(BaseModel):
+    id: UUID
+    meeting_id: UUID
+    audio_file_id: UUID
+    status: str
+    progress: float
+    attempts: int
+    max_attempts: int
+    audio_duration_seconds: Optional[float]
+    segments_saved: Optional[int]
+    decoded_until_seconds: Optional[float]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+class UploadSessionCreate(BaseModel):
+    meeting_id: UUID
+    filename: str = Field(..., min_length=1, max_length=255)
+    total_size: int = Field(..., gt=0)
+    content_type: Optional[str] = None
+
+class UploadSessionResponse(BaseModel):
+    id: UUID
+    meeting_id: UUID
+    filename: str
+    total_size: int
+    received_bytes: int
+    received_ranges: List[List[int]]
+    offset: int  # contiguous bytes received from the start
+    status: str
+    audio_file_id: Optional[UUID]
+    expires_at: datetime
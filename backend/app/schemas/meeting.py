@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
@@ -14,6 +14,11 @@ class AudioFileResponse(BaseModel):
     format: Optional[str]
     created_at: datetime
 
+    @computed_field
+    @property
+    def url(self) -> str:
+        return f"/api/audio/files/{self.id}"
+
     class Config:
         from_attributes = True
 
@@ -45,6 +50,7 @@ class MeetingDetailResponse(MeetingResponse):
     participants_count: int = 0
     transcript_count: int = 0
     has_summary: bool = False
+    audio_file_count: int = 0
     audio_files: List[AudioFileResponse] = []
 
 class JoinMeetingRequest(BaseModel):
@@ -67,6 +73,8 @@ class TranscriptResponse(BaseModel):
     speaker_name: Optional[str]
     transcript_text: str
     timestamp_seconds: Optional[int]
+    start_seconds: Optional[float] = None
+    end_seconds: Optional[float] = None
     confidence: float
     created_at: datetime
     
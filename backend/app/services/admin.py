@@ -0,0 +1,74 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import tuple_
+from app.models.user import User
+from app.models.meeting import Meeting
+from typing import List, Optional, Tuple
+from uuid import UUID
+from datetime import datetime
+import base64
+import logging
+
+logger = logging.getLogger(__name__)
+
+Cursor = Tuple[datetime, UUID]
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Opaque page token for the (created_at, id) of the last row returned"""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Raises ValueError for tokens not made by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+class AdminService:
+    """
+    Admin listings, newest first, paged by keyset over (created_at, id) so a
+    page costs the same index range scan however deep it is. Each page is one
+    query; meeting participant counts come from the counter on the meeting row.
+    """
+
+    @staticmethod
+    def _page(query, created_at, row_id, after: Optional[Cursor], limit: int) -> Tuple[List, Optional[str]]:
+        if after is not None:
+            query = query.filter(tuple_(created_at, row_id) < tuple_(*after))
+        # One extra row tells whether there is a next page
+        rows = query.order_by(created_at.desc(), row_id.desc()).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    @staticmethod
+    def list_users(db: Session, limit: int = 100, after: Optional[Cursor] = None) -> Tuple[List, Optional[str]]:
+        """Users newest first; returns (rows, next cursor or None)"""
+        query = db.query(User.id, User.name, User.email, User.is_admin, User.created_at)
+        return AdminService._page(query, User.created_at, User.id, after, limit)
+
+    @staticmethod
+    def list_meetings(
+        db: Session,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        status: Optional[str] = None,
+        host_id: Optional[UUID] = None
+    ) -> Tuple[List, Optional[str]]:
+        """Meetings newest first, optionally by status and host; returns (rows, next cursor or None)"""
+        query = db.query(
+            Meeting.id,
+            Meeting.meeting_title,
+            Meeting.host_id,
+            Meeting.status,
+            Meeting.participants_count,
+            Meeting.created_at,
+            Meeting.ended_at
+        )
+        if status:
+            query = query.filter(Meeting.status == status)
+        if host_id:
+            query = query.filter(Meeting.host_id == host_id)
+        return AdminService._page(query, Meeting.created_at, Meeting.id, after, limit)
@@ -1,74 +1,145 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.summary import Summary
 from app.models.meeting import Meeting
 from app.models.transcript import Transcript
 from app.config import settings
-from typing import List, Optional, Dict
+from app.services.whisper import model_registry, segment_to_dict
+from app.services.long_audio import long_audio_transcriber, probe_duration
+from app.services.summarizer import hierarchical_summarizer, split_sentences
+from app.services.summary_cache import SummaryCache, summary_cache
+from app.services.extractive import extractive_summarizer
+from app.services.term_index import TermIndexService
+from app.services.meeting import mark_summarized
+from app.services.metrics import MetricsService
+from app.services.llm import configured_providers
+from app.services.llm_router import track_served
+from app.services.singleflight import SingleFlight, advisory_lock
+from app.database import AsyncSessionLocal
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Dict, Tuple
 from datetime import datetime
 from uuid import UUID
 import logging
-import json
+import time
 
 logger = logging.getLogger(__name__)
 
+summary_flights = SingleFlight()
+
 class AIService:
     @staticmethod
-    def transcribe_audio(audio_path: str) -> Dict:
+    def iter_transcription(
+        audio_path: str,
+        resume_from: float = 0.0,
+        progress_callback: Optional[Callable[[float, float], None]] = None
+    ) -> Tuple[float, Iterator[Dict]]:
         """
-        Transcribe audio using Faster-Whisper
-        Returns: {"text": str, "segments": list}
+        Transcribe audio using Faster-Whisper, yielding segments as they are decoded
+        Returns: (duration_seconds, iterator of {"start", "end", "text", "confidence"})
+        Segments starting before `resume_from` are skipped (used when a job is retried).
+        progress_callback(decoded_seconds, total_seconds) is called as decoding advances.
         """
-        try:
-            from faster_whisper import WhisperModel
-            
-            model = WhisperModel("base", device="cpu", compute_type="int8")
-            segments, info = model.transcribe(audio_path, language="en")
-            
-            full_text = ""
-            segments_list = []
-            
+        # Long recordings are split at silences and decoded in parallel
+        if settings.long_audio_enabled:
+            duration = probe_duration(audio_path)
+            if duration and duration >= settings.long_audio_threshold_seconds:
+                return long_audio_transcriber.iter_segments(audio_path, resume_from, progress_callback)
+
+        # Model load is timed separately so cold starts don't mask warm latency
+        cold = not model_registry.is_loaded()
+        load_start = time.perf_counter()
+        model = model_registry.get()
+        model_load_seconds = time.perf_counter() - load_start
+
+        transcribe_start = time.perf_counter()
+        segments, info = model.transcribe(
+            audio_path,
+            language="en",
+            clip_timestamps=[resume_from] if resume_from > 0 else "0"
+        )
+
+        def generate() -> Iterator[Dict]:
+            first_segment_seconds = None
             for segment in segments:
-                full_text += segment.text + " "
-                # faster-whisper segments may not expose `confidence`; fall back to avg_logprob
-                confidence = getattr(segment, "confidence", None)
-                if confidence is None:
-                    confidence = getattr(segment, "avg_logprob", None)
-                segments_list.append({
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text,
-                    "confidence": confidence
-                })
-            
+                if first_segment_seconds is None:
+                    first_segment_seconds = time.perf_counter() - transcribe_start
+                yield segment_to_dict(segment)
+                if progress_callback:
+                    progress_callback(segment.end, info.duration)
+            logger.info(
+                f"Transcribed {info.duration:.1f}s of audio in {time.perf_counter() - transcribe_start:.2f}s, "
+                f"first segment after {first_segment_seconds or 0:.2f}s "
+                f"({'cold' if cold else 'warm'}, model load {model_load_seconds:.2f}s)"
+            )
+
+        return info.duration, generate()
+
+    @staticmethod
+    def transcribe_audio(audio_path: str, progress_callback: Optional[Callable[[float, float], None]] = None) -> Dict:
+        """
+        Transcribe a whole file
+        Returns: {"text": str, "segments": list, "duration": float}
+        """
+        try:
+            duration, segments = AIService.iter_transcription(audio_path, progress_callback=progress_callback)
+            segments_list = list(segments)
             return {
-                "text": full_text.strip(),
+                "text": " ".join(segment["text"].strip() for segment in segments_list),
                 "segments": segments_list,
-                "duration": info.duration
+                "duration": duration
             }
         except Exception as e:
             logger.error(f"Transcription error: {str(e)}")
             raise
     
     @staticmethod
-    def generate_summary(transcript_text: str, max_length: int = 500) -> Dict:
+    def summary_cache_key(transcript_text: str, max_length: int) -> str:
         """
-        Generate summary using Groq or OpenAI
-        Returns: {"summary": str, "action_items": list, "keywords": list}
+        Key for a summary of this transcript by any of the configured providers.
+        Which one the router picks changes with their health, so it is not part
+        of the key; the summary records it in `model` instead.
         """
+        providers = sorted(f"{p.name}/{p.model}" for p in configured_providers())
+        return SummaryCache.key_for(transcript_text, max_length, ",".join(providers) or "basic")
+    
+    @staticmethod
+    async def generate_summary(
+        transcript_text: str,
+        max_length: int = 500,
+        segments: Optional[List[str]] = None,
+        cache_key: Optional[str] = None
+    ) -> Dict:
+        """
+        Generate summary using OpenAI, Groq or the local model through the LLM router.
+        Long transcripts are map-reduced along `segments` (sentences if not given).
+        Results are cached by transcript and parameters; fallback summaries are not.
+        Returns: {"summary": str, "action_items": list, "keywords": list, "content_hash": str, "model": str}
+        """
+        cache_key = cache_key or AIService.summary_cache_key(transcript_text, max_length)
+        cached = await summary_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Summary cache hit")
+            return cached
+
         summary_data: Dict = {}
         try:
-            # Try OpenAI first since Groq has compatibility issues
-            if settings.openai_api_key:
-                summary_data = AIService._summarize_with_openai(transcript_text, max_length)
-            elif settings.groq_api_key and AIService._groq_supported():
-                summary_data = AIService._summarize_with_groq(transcript_text, max_length)
-            else:
-                raise ValueError("No AI service configured")
+            if segments is None:
+                segments = split_sentences(transcript_text)
+            with track_served() as served:
+                summary_data = await hierarchical_summarizer.summarize(segments, max_length)
+            summary_data["content_hash"] = cache_key
+            summary_data["model"] = ",".join(sorted(served))
         except Exception as e:
             logger.error(f"AI service failed, using fallback: {str(e)}")
             # Fallback to basic summary
             summary_data = AIService._generate_basic_summary(transcript_text, max_length)
 
+        return await AIService._finish_summary(summary_data, transcript_text, cache_key)
+    
+    @staticmethod
+    async def _finish_summary(summary_data: Dict, transcript_text: str, cache_key: str) -> Dict:
         # Always attach basic metadata so response validation does not fail
         word_count = summary_data.get("word_count")
         if word_count is None and transcript_text:
@@ -76,100 +147,105 @@ class AIService:
         summary_data["word_count"] = word_count
         summary_data.setdefault("duration_seconds", None)
 
+        if summary_data.get("content_hash"):
+            await summary_cache.set(cache_key, summary_data)
         return summary_data
     
     @staticmethod
-    def _summarize_with_groq(transcript_text: str, max_length: int) -> Dict:
-        """Summarize using Groq API"""
-        try:
-            import os
-            from groq import Groq
-
-            logger.info("Initializing Groq client")
-            # Set API key via environment variable to avoid initialization issues
-            os.environ['GROQ_API_KEY'] = settings.groq_api_key
-            client = Groq()
-
-            prompt = f"""Analyze this meeting transcript and provide:
-1. A concise summary (max {max_length} words)
-2. Key action items (as a list)
-3. Important keywords (as a list)
-
-Transcript:
-{transcript_text}
-
-Provide response in JSON format with keys: summary, action_items, keywords"""
-
-            logger.info(f"Sending request to Groq API, prompt length: {len(prompt)}")
-            # mixtral-8x7b-32768 was decommissioned; use a current supported model
-            completion = client.chat.completions.create(
-                model="llama-3.1-70b-versatile",
-                max_tokens=1024,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-
-            response_text = completion.choices[0].message.content
-            logger.info(f"Groq response received, length: {len(response_text)}, content: {response_text[:200]}...")
+    async def stream_summary(
+        meeting_id: UUID,
+        transcript_text: str,
+        max_length: int,
+        segments: Optional[List[str]],
+        cache_key: str
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Generate a meeting summary, yielding ("summary", text) as the model writes
+        it and finally ("done", Summary) once it is saved. Cached, stored and
+        fallback summaries arrive as one piece. A failure after text was sent is
+        raised rather than replaced, since the client has already shown that text.
+        Generation holds the same per-meeting lock as summarize_meeting, so a
+        stream that waited on another request reuses its summary.
+        """
+        async with advisory_lock(f"summary:{meeting_id}", settings.summary_lock_timeout_seconds):
+            async with AsyncSessionLocal() as db:
+                existing = await AIService.get_summary_async(db, meeting_id)
+                if existing and existing.content_hash == cache_key:
+                    yield "summary", existing.summary_text
+                    yield "done", existing
+                    return
+                # Don't hold a connection across the LLM call
+                await db.commit()
 
-            result = json.loads(response_text)
+                summary_data = await summary_cache.get(cache_key)
+                if summary_data is not None:
+                    logger.info("Summary cache hit")
+                    yield "summary", summary_data["summary"]
+                else:
+                    sent = False
+                    try:
+                        if segments is None:
+                            segments = split_sentences(transcript_text)
+                        with track_served() as served:
+                            async for kind, value in hierarchical_summarizer.summarize_stream(segments, max_length):
+                                if kind == "summary":
+                                    sent = True
+                                    yield kind, value
+                                else:
+                                    summary_data = value
+                        summary_data["content_hash"] = cache_key
+                        summary_data["model"] = ",".join(sorted(served))
+                    except Exception as e:
+                        if sent:
+                            raise
+                        logger.error(f"AI service failed, using fallback: {str(e)}")
+                        summary_data = AIService._generate_basic_summary(transcript_text, max_length)
+                        yield "summary", summary_data["summary"]
+                    summary_data = await AIService._finish_summary(summary_data, transcript_text, cache_key)
 
-            return {
-                "summary": result.get("summary", ""),
-                "action_items": result.get("action_items", []),
-                "keywords": result.get("keywords", [])
-            }
-        except json.JSONDecodeError as e:
-            logger.error(f"Groq JSON decode error: {str(e)}, response: {response_text}")
-            # Return a default response if JSON parsing fails
-            return {
-                "summary": "Summary generation in progress",
-                "action_items": [],
-                "keywords": []
-            }
-        except Exception as e:
-            logger.error(f"Groq summarization error: {str(e)}", exc_info=True)
-            raise
+                summary_data = await db.run_sync(AIService._with_corpus_keywords, meeting_id, summary_data)
+                summary = await AIService.save_summary_async(db, meeting_id, summary_data)
+        yield "done", summary
     
     @staticmethod
-    def _summarize_with_openai(transcript_text: str, max_length: int) -> Dict:
-        """Summarize using OpenAI API"""
-        try:
-            from openai import OpenAI
-            
-            client = OpenAI(api_key=settings.openai_api_key)
-            
-            prompt = f"""Analyze this meeting transcript and provide:
-1. A concise summary (max {max_length} words)
-2. Key action items (as a list)
-3. Important keywords (as a list)
-
-Transcript:
-{transcript_text}
+    def _with_corpus_keywords(db: Session, meeting_id: UUID, summary_data: Dict) -> Dict:
+        """Fallback summaries rank keywords against the whole corpus, not just this meeting"""
+        if not summary_data.get("content_hash"):
+            keywords = TermIndexService.keywords(db, meeting_id)
+            if keywords:
+                summary_data["keywords"] = keywords
+        return summary_data
+    
+    @staticmethod
+    async def summarize_meeting(
+        meeting_id: UUID,
+        transcript_text: str,
+        max_length: int,
+        segments: Optional[List[str]],
+        cache_key: str
+    ) -> Summary:
+        """
+        Generate and save a meeting summary at most once at a time.
+        Callers in this process with the same meeting and parameters share one
+        generation; across processes a per-meeting advisory lock serializes
+        generation and the upsert, and a waiter that finds the summary already
+        produced returns it without calling the LLM.
+        """
+        async def generate_and_save() -> Summary:
+            async with advisory_lock(f"summary:{meeting_id}", settings.summary_lock_timeout_seconds):
+                async with AsyncSessionLocal() as db:
+                    existing = await AIService.get_summary_async(db, meeting_id)
+                    if existing and existing.content_hash == cache_key:
+                        return existing
+                    # Don't hold a connection across the LLM call
+                    await db.commit()
+                    summary_data = await AIService.generate_summary(
+                        transcript_text, max_length, segments=segments, cache_key=cache_key
+                    )
+                    summary_data = await db.run_sync(AIService._with_corpus_keywords, meeting_id, summary_data)
+                    return await AIService.save_summary_async(db, meeting_id, summary_data)
 
-Provide response in JSON format with keys: summary, action_items, keywords"""
-            
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1024
-            )
-            
-            response_text = response.choices[0].message.content
-            result = json.loads(response_text)
-            
-            return {
-                "summary": result.get("summary", ""),
-                "action_items": result.get("action_items", []),
-                "keywords": result.get("keywords", [])
-            }
-        except Exception as e:
-            logger.error(f"OpenAI summarization error: {str(e)}")
-            raise
+        return await summary_flights.do(f"{meeting_id}:{cache_key}", generate_and_save)
     
     @staticmethod
     def save_summary(db: Session, meeting_id: UUID, summary_data: Dict) -> Summary:
@@ -186,6 +262,8 @@ Provide response in JSON format with keys: summary, action_items, keywords"""
             summary.keywords = summary_data.get("keywords", [])
             summary.duration_seconds = summary_data.get("duration_seconds")
             summary.word_count = word_count
+            summary.content_hash = summary_data.get("content_hash")
+            summary.model = summary_data.get("model")
             summary.generated_at = datetime.utcnow()
         else:
             summary = Summary(
@@ -195,49 +273,52 @@ Provide response in JSON format with keys: summary, action_items, keywords"""
                 keywords=summary_data.get("keywords", []),
                 duration_seconds=summary_data.get("duration_seconds"),
                 word_count=word_count,
+                content_hash=summary_data.get("content_hash"),
+                model=summary_data.get("model"),
                 generated_at=datetime.utcnow()
             )
             db.add(summary)
+        first = db.execute(mark_summarized(meeting_id)).rowcount
+        MetricsService.record(db, {"summaries_generated": 1, "summaries": first})
         db.commit()
         db.refresh(summary)
         logger.info(f"Summary saved for meeting {meeting_id}")
         return summary
     
+    @staticmethod
+    async def save_summary_async(db: AsyncSession, meeting_id: UUID, summary_data: Dict) -> Summary:
+        """Save summary to database with one INSERT ... ON CONFLICT round trip"""
+        word_count = summary_data.get("word_count")
+        if word_count is None and summary_data.get("summary"):
+            word_count = len(summary_data["summary"].split())
+
+        values = {
+            "summary_text": summary_data.get("summary", ""),
+            "action_items": summary_data.get("action_items", []),
+            "keywords": summary_data.get("keywords", []),
+            "duration_seconds": summary_data.get("duration_seconds"),
+            "word_count": word_count,
+            "content_hash": summary_data.get("content_hash"),
+            "model": summary_data.get("model"),
+            "generated_at": datetime.utcnow()
+        }
+        stmt = pg_insert(Summary).values(meeting_id=meeting_id, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Summary.meeting_id],
+            set_={key: stmt.excluded[key] for key in values}
+        ).returning(Summary)
+        summary = await db.scalar(stmt, execution_options={"populate_existing": True})
+        first = (await db.execute(mark_summarized(meeting_id))).rowcount
+        await MetricsService.record_async(db, {"summaries_generated": 1, "summaries": first})
+        await db.commit()
+        logger.info(f"Summary saved for meeting {meeting_id}")
+        return summary
+    
     @staticmethod
     def _generate_basic_summary(transcript_text: str, max_length: int = 500) -> Dict:
-        """Generate a basic summary without AI"""
+        """Generate an extractive summary without AI (TF-IDF + TextRank)"""
         try:
-            import re
-            from collections import Counter
-            
-            # Extract basic summary
-            words = transcript_text.split()
-            if len(words) > max_length:
-                summary = " ".join(words[:max_length]) + "..."
-            else:
-                summary = transcript_text
-            
-            # Extract potential action items (sentences with action words)
-            action_words = ['will', 'should', 'need to', 'going to', 'plan to', 'decided to']
-            action_items = []
-            sentences = re.split(r'[.!?]+', transcript_text)
-            for sentence in sentences:
-                sentence = sentence.strip()
-                if any(word in sentence.lower() for word in action_words) and len(sentence) > 10:
-                    action_items.append(sentence)
-            
-            # Extract keywords (most common words)
-            common_words = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'must', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'])
-            word_count = Counter(word.lower().strip('.,!?') for word in words if word.lower() not in common_words and len(word) > 3)
-            keywords = [word for word, count in word_count.most_common(10)]
-            
-            return {
-                "summary": summary,
-                "action_items": action_items[:5],  # Limit to 5 action items
-                "keywords": keywords,
-                "word_count": len(words),
-                "duration_seconds": None
-            }
+            return extractive_summarizer.summarize(transcript_text, max_length)
         except Exception as e:
             logger.error(f"Basic summary error: {str(e)}")
             return {
@@ -248,29 +329,12 @@ Provide response in JSON format with keys: summary, action_items, keywords"""
                 "duration_seconds": None
             }
 
-    @staticmethod
-    def _groq_supported() -> bool:
-        """
-        Groq client currently breaks with httpx 0.28+ (proxies arg removed).
-        Skip Groq if an incompatible httpx version is installed.
-        """
-        try:
-            import httpx
-
-            parts = httpx.__version__.split(".")
-            major = int(parts[0]) if parts else 0
-            minor = int(parts[1]) if len(parts) > 1 else 0
-            if major > 0:
-                return False
-            if minor >= 28:
-                logger.warning("Skipping Groq: httpx %s is incompatible; use httpx<0.28", httpx.__version__)
-                return False
-            return True
-        except Exception as e:
-            logger.warning(f"Unable to determine Groq compatibility: {e}")
-            return False
-
     @staticmethod
     def get_summary(db: Session, meeting_id: UUID) -> Optional[Summary]:
         """Get summary for a meeting"""
         return db.query(Summary).filter(Summary.meeting_id == meeting_id).first()
+    
+    @staticmethod
+    async def get_summary_async(db: AsyncSession, meeting_id: UUID) -> Optional[Summary]:
+        """Get summary for a meeting"""
+        return await db.scalar(select(Summary).where(Summary.meeting_id == meeting_id))
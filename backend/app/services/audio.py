@@ -0,0 +1,217 @@
+from sqlalchemy.orm import Session
+from app.models.summary import AudioFile
+from app.models.job import TranscriptionJob
+from app.services.ai import AIService
+from app.services.jobs import JobService
+from app.services.meeting import MeetingService, bump_counters
+from app.services.transcription_cache import TranscriptionCache, transcription_cache
+from app.config import settings
+from app.database import SessionLocal
+from typing import Optional, Tuple
+from uuid import UUID
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL_SECONDS = 5.0
+
+class LeaseLostError(Exception):
+    """Raised when another worker has taken over a job we were processing"""
+
+class LeaseKeeper:
+    """
+    Extends a running job's lease from a background thread on a timer, so the
+    lease holds while nothing reports progress (model loads, long chunks
+    decoding in other processes). Uses its own session; the processing thread
+    calls check() to stop once the lease is lost.
+    """
+
+    def __init__(self, job_id: UUID, worker_id: str, interval: Optional[float] = None):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval or settings.transcription_job_lease_seconds / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{job_id}", daemon=True)
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def check(self) -> None:
+        if self.lost:
+            raise LeaseLostError(f"Lease on job {self.job_id} lost")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            db = SessionLocal()
+            try:
+                if not JobService.extend_lease(db, self.job_id, self.worker_id):
+                    self.lost = True
+                    return
+            except Exception as e:
+                # A transient failure is retried next tick, well inside the lease
+                logger.warning(f"Lease heartbeat for job {self.job_id} failed: {str(e)}")
+            finally:
+                db.close()
+
+class AudioService:
+    @staticmethod
+    def register_upload(
+        db: Session,
+        meeting_id: UUID,
+        file_path: str,
+        audio_url: str,
+        file_size: int,
+        content_type: str,
+        content_sha256: Optional[str] = None,
+        commit: bool = True
+    ) -> Tuple[AudioFile, TranscriptionJob]:
+        """
+        Record a stored audio file and queue it for transcription in one transaction,
+        optionally left open for the caller to commit.
+        If the same audio was transcribed before, the cached segments are stored
+        for this meeting right away and the job is recorded as completed.
+        """
+        cached = None
+        if content_sha256:
+            cached = transcription_cache.get(TranscriptionCache.key_for(content_sha256))
+
+        audio_file = AudioFile(
+            meeting_id=meeting_id,
+            file_path=audio_url,
+            file_size=file_size,
+            format=content_type or "audio",
+            content_sha256=content_sha256
+        )
+        db.add(audio_file)
+        db.flush()
+        db.execute(bump_counters(meeting_id, audio_file_count=1))
+
+        if cached:
+            duration, segments = cached
+            saved = MeetingService.add_transcripts_bulk(db, meeting_id, segments, commit=False)
+            if duration is not None:
+                audio_file.duration_seconds = int(duration)
+            job = JobService.record_completed(
+                db, meeting_id, audio_file.id, file_path, segments_saved=saved, duration=duration, commit=False
+            )
+            logger.info(f"Transcription cache hit for meeting {meeting_id} ({saved} segments)")
+        else:
+            job = JobService.enqueue(db, meeting_id, audio_file.id, file_path, commit=False)
+        if commit:
+            db.commit()
+            db.refresh(audio_file)
+            db.refresh(job)
+        else:
+            db.flush()
+        return audio_file, job
+
+    @staticmethod
+    def get_audio_file(db: Session, audio_file_id: UUID) -> Optional[AudioFile]:
+        """Get audio file by ID"""
+        return db.query(AudioFile).filter(AudioFile.id == audio_file_id).first()
+
+    @staticmethod
+    def storage_path(audio_file: AudioFile) -> str:
+        """Location on disk; file_path holds the legacy /uploads/<name> URL"""
+        return os.path.join(settings.upload_dir, os.path.basename(audio_file.file_path))
+
+    @staticmethod
+    def process_job(db: Session, job: TranscriptionJob, worker_id: str) -> None:
+        """
+        Transcribe a claimed job, storing segments in small batches as they are decoded.
+        Each batch commits with the job's progress, so listeners see text within
+        seconds and a retried job resumes after the last stored segment.
+        The lease is extended on a timer for the whole run.
+        """
+        with LeaseKeeper(job.id, worker_id) as lease:
+            AudioService._run_job(db, job, worker_id, lease)
+
+    @staticmethod
+    def _run_job(db: Session, job: TranscriptionJob, worker_id: str, lease: LeaseKeeper) -> None:
+        job_id = job.id
+        meeting_id = job.meeting_id
+        saved = job.segments_saved or 0
+        decoded_until = job.decoded_until_seconds or 0.0
+        last_heartbeat = time.monotonic()
+
+        def on_progress(decoded_seconds: float, total_seconds: float) -> None:
+            # Keeps the lease alive while long chunks decode without yielding segments
+            nonlocal last_heartbeat
+            lease.check()
+            if time.monotonic() - last_heartbeat < HEARTBEAT_INTERVAL_SECONDS:
+                return
+            last_heartbeat = time.monotonic()
+            percent = min(100.0, 100.0 * decoded_seconds / total_seconds) if total_seconds else 0.0
+            if not JobService.heartbeat(db, job_id, worker_id, percent):
+                raise LeaseLostError(f"Lease on job {job_id} lost")
+
+        audio_file = db.query(AudioFile).filter(AudioFile.id == job.audio_file_id).first()
+        cache_key = None
+        if audio_file and audio_file.content_sha256:
+            cache_key = TranscriptionCache.key_for(audio_file.content_sha256)
+
+        # register_upload already counted this upload's lookup; this one only
+        # catches entries another job wrote since (e.g. before a retry)
+        cached = transcription_cache.get(cache_key, count=False) if cache_key else None
+        cache_writer = None
+        if cached:
+            duration, segments = cached
+            segments = (segment for segment in segments if segment["start"] >= decoded_until)
+        else:
+            duration, segments = AIService.iter_transcription(
+                job.file_path,
+                resume_from=decoded_until,
+                progress_callback=on_progress
+            )
+            # Only a full decode from the start is a complete cache entry
+            if cache_key and decoded_until == 0:
+                cache_writer = transcription_cache.writer(cache_key)
+
+        batch = []
+        last_flush = time.monotonic()
+
+        def flush() -> None:
+            nonlocal saved, decoded_until, last_flush, last_heartbeat
+            lease.check()
+            MeetingService.add_transcripts_bulk(db, meeting_id, batch, commit=False)
+            end = batch[-1]["end"]
+            percent = min(100.0, 100.0 * end / duration) if duration else 0.0
+            if not JobService.checkpoint(db, job_id, worker_id, saved + len(batch), end, percent):
+                raise LeaseLostError(f"Lease on job {job_id} lost")
+            saved += len(batch)
+            decoded_until = end
+            batch.clear()
+            last_flush = last_heartbeat = time.monotonic()
+
+        try:
+            for segment in segments:
+                batch.append(segment)
+                if cache_writer:
+                    cache_writer.write(segment)
+                if len(batch) >= settings.transcription_batch_size or time.monotonic() - last_flush >= settings.transcription_flush_seconds:
+                    flush()
+            if batch:
+                flush()
+            if cache_writer:
+                cache_writer.commit(duration)
+        except BaseException:
+            if cache_writer:
+                cache_writer.abort()
+            raise
+
+        lease.check()
+        job = JobService.get_job(db, job_id)
+        audio_file = db.query(AudioFile).filter(AudioFile.id == job.audio_file_id).first()
+        if audio_file and duration is not None:
+            audio_file.duration_seconds = int(duration)
+
+        JobService.complete(db, job, segments_saved=saved, duration=duration)
@@ -1,11 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
+from app.services.metrics import MetricsService
 from app.schemas.auth import UserCreate, UserResponse
 from app.config import settings
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -69,6 +74,7 @@ class AuthService:
             password_hash=AuthService.hash_password(user_data.password)
         )
         db.add(new_user)
+        MetricsService.record(db, {"users": 1})
         db.commit()
         db.refresh(new_user)
         return new_user
@@ -99,3 +105,55 @@ class AuthService:
         db.commit()
         db.refresh(user)
         return user
+
+class AsyncAuthService:
+    """
+    AuthService for AsyncSession request handlers.
+    bcrypt is deliberately slow (~100ms+ per hash), so hashing and
+    verification run in a worker thread instead of on the event loop.
+    """
+
+    @staticmethod
+    async def register_user(db: AsyncSession, user_data: UserCreate) -> User:
+        """Register new user"""
+        existing_user = await db.scalar(select(User.id).where(User.email == user_data.email))
+        if existing_user:
+            raise ValueError("User with this email already exists")
+        
+        new_user = User(
+            name=user_data.name,
+            email=user_data.email,
+            password_hash=await asyncio.to_thread(AuthService.hash_password, user_data.password)
+        )
+        db.add(new_user)
+        await MetricsService.record_async(db, {"users": 1})
+        await db.commit()
+        await db.refresh(new_user)
+        return new_user
+    
+    @staticmethod
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+        """Authenticate user by email and password"""
+        user = await db.scalar(select(User).where(User.email == email))
+        if not user:
+            return None
+        if not await asyncio.to_thread(AuthService.verify_password, password, user.password_hash):
+            return None
+        return user
+    
+    @staticmethod
+    async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+        """Get user by ID"""
+        return await db.get(User, UUID(str(user_id)))
+    
+    @staticmethod
+    async def update_user_password(db: AsyncSession, user_id: str, new_password: str) -> User:
+        """Update user password"""
+        user = await db.get(User, UUID(str(user_id)))
+        if not user:
+            raise ValueError("User not found")
+        
+        user.password_hash = await asyncio.to_thread(AuthService.hash_password, new_password)
+        await db.commit()
+        await db.refresh(user)
+        return user
@@ -0,0 +1,83 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config import settings
+from collections import defaultdict
+from typing import Dict, Set
+from uuid import UUID
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS_CHANNEL = "transcription_job_events"
+
+class JobEventListener:
+    """
+    Wakes SSE streams when a worker commits progress for a job.
+    Workers run in other processes, so notifications travel through Postgres
+    LISTEN/NOTIFY on one dedicated connection per API process.
+    Subscribers fall back to polling if the listener is not running.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._loop = None
+        self._subscribers: Dict[str, Set[asyncio.Event]] = defaultdict(set)
+
+    @property
+    def running(self) -> bool:
+        return self._conn is not None
+
+    def start(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+
+        conn = psycopg2.connect(settings.database_url)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {JOB_EVENTS_CHANNEL}")
+        self._conn = conn
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(conn.fileno(), self._drain)
+        logger.info("Listening for transcription job events")
+
+    def stop(self) -> None:
+        if self._conn is None:
+            return
+        self._loop.remove_reader(self._conn.fileno())
+        self._conn.close()
+        self._conn = None
+
+    def _drain(self) -> None:
+        try:
+            self._conn.poll()
+        except Exception as e:
+            logger.error(f"Job event listener failed, falling back to polling: {str(e)}")
+            self.stop()
+            return
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            for event in self._subscribers.get(notify.payload, ()):
+                event.set()
+
+    def subscribe(self, job_id: UUID) -> asyncio.Event:
+        """Register before reading state so no notification is missed"""
+        event = asyncio.Event()
+        self._subscribers[str(job_id)].add(event)
+        return event
+
+    def unsubscribe(self, job_id: UUID, event: asyncio.Event) -> None:
+        key = str(job_id)
+        self._subscribers[key].discard(event)
+        if not self._subscribers[key]:
+            del self._subscribers[key]
+
+    @staticmethod
+    def notify(db: Session, job_id: UUID) -> None:
+        """Queue a notification; Postgres delivers it when the transaction commits"""
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": JOB_EVENTS_CHANNEL, "payload": str(job_id)}
+        )
+
+job_events = JobEventListener()
@@ -0,0 +1,189 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_sentence_re = re.compile(r"[^.!?\n]+(?:[.!?]+|$)")
+_token_re = re.compile(r"[a-z][a-z'\-]*[a-z]|[a-z]")
+_action_re = re.compile(
+    r"\b(?:will|should|need(?:s)? to|going to|plan(?:s)? to|decided to|let's|"
+    r"action item|follow(?:s)? up|take care of|assign(?:ed)? to|"
+    r"by (?:monday|tuesday|wednesday|thursday|friday|tomorrow|next week|end of (?:day|week|month)))\b",
+    re.IGNORECASE
+)
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being
+below between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down
+during each even ever every few for from further get gets getting go goes going gonna got had hadn't has
+hasn't have haven't having he he'd he'll he's her here here's hers herself him himself his how how's i
+i'd i'll i'm i've if in into is isn't it it's its itself just kind know let let's like little lot lots
+make maybe me mean might more most much must mustn't my myself need no nor not now of off okay ok on once
+one only or other ought our ours ourselves out over own pretty probably quite really right said same say
+says see she she'd she'll she's should shouldn't so some something sort still such sure than that that's
+the their theirs them themselves then there there's these they they'd they'll they're they've thing
+things think this those though through to too uh um under until up us very want wanna was wasn't way we
+we'd we'll we're we've well were weren't what what's when when's where where's whether which while who
+who's whom why why's will with won't would wouldn't yeah yes yet you you'd you'll you're you've your
+yours yourself yourselves
+""".split())
+
+MIN_SENTENCE_WORDS = 4
+MAX_TERM_LENGTH = 64
+TEXTRANK_CANDIDATES = 400
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 50
+
+def split_sentences(text: str) -> List[str]:
+    sentences = []
+    for match in _sentence_re.finditer(text):
+        sentence = match.group().strip()
+        if len(sentence.split()) >= MIN_SENTENCE_WORDS:
+            sentences.append(sentence)
+    return sentences
+
+def count_terms(texts: Iterable[str]) -> Counter:
+    """Term counts with the same tokenization and stopwords as the summarizer"""
+    counts: Counter = Counter()
+    for text in texts:
+        counts.update(
+            token for token in _token_re.findall(text.lower())
+            if 2 < len(token) <= MAX_TERM_LENGTH and token not in STOPWORDS
+        )
+    return counts
+
+def _tokenize(sentences: List[str]) -> Tuple[List[int], List[int], Dict[str, int], List[int]]:
+    """One pass over the text: (sentence index, term id) per kept token, vocabulary and word counts"""
+    vocab: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    word_counts: List[int] = []
+    for i, sentence in enumerate(sentences):
+        tokens = _token_re.findall(sentence.lower())
+        word_counts.append(len(tokens))
+        for token in tokens:
+            if len(token) > 2 and token not in STOPWORDS:
+                cols.append(vocab.setdefault(token, len(vocab)))
+                rows.append(i)
+    return rows, cols, vocab, word_counts
+
+def _tfidf(rows: List[int], cols: List[int], n_sentences: int, n_terms: int):
+    """Sparse (row, col, weight) triples with sublinear TF and smoothed sentence-level IDF"""
+    import numpy as np
+
+    keys = np.asarray(rows, dtype=np.int64) * n_terms + np.asarray(cols, dtype=np.int64)
+    unique, tf = np.unique(keys, return_counts=True)
+    r = unique // n_terms
+    c = unique % n_terms
+    df = np.bincount(c, minlength=n_terms)
+    idf = np.log((1.0 + n_sentences) / (1.0 + df)) + 1.0
+    w = (1.0 + np.log(tf)) * idf[c]
+    return r, c, w, idf
+
+def _textrank(r, c, w, candidates):
+    """PageRank over the cosine-similarity graph of the candidate sentences"""
+    import numpy as np
+
+    index = np.full(r.max() + 1, -1, dtype=np.int64)
+    index[candidates] = np.arange(len(candidates))
+    mask = index[r] >= 0
+    # Only the terms the candidates use become columns
+    terms, columns = np.unique(c[mask], return_inverse=True)
+    matrix = np.zeros((len(candidates), len(terms)), dtype=np.float32)
+    matrix[index[r[mask]], columns] = w[mask]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.maximum(norms, 1e-9)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0)
+
+    n = len(candidates)
+    scores = np.full(n, 1.0 / n, dtype=np.float32)
+    for _ in range(TEXTRANK_ITERATIONS):
+        updated = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+class ExtractiveSummarizer:
+    """
+    Offline summarizer used when no LLM is available.
+    Sentences become TF-IDF vectors (NumPy, built from one tokenization
+    pass). Every sentence is scored against the document centroid in
+    O(tokens); the best candidates are then ranked TextRank-style on their
+    similarity graph, and the top sentences are returned in meeting order.
+    """
+
+    def summarize(self, transcript_text: str, max_length: int = 500) -> Dict:
+        import numpy as np
+
+        start = time.perf_counter()
+        total_words = len(transcript_text.split())
+        sentences = split_sentences(transcript_text)
+        rows, cols, vocab, word_counts = _tokenize(sentences)
+        if not rows:
+            words = transcript_text.split()
+            summary = " ".join(words[:max_length]) + ("..." if len(words) > max_length else "")
+            return {"summary": summary, "action_items": [], "keywords": [], "word_count": total_words, "duration_seconds": None}
+
+        n_sentences = len(sentences)
+        n_terms = len(vocab)
+        r, c, w, idf = _tfidf(rows, cols, n_sentences, n_terms)
+
+        # Centroid relevance for every sentence
+        centroid = np.bincount(c, weights=w, minlength=n_terms)
+        sentence_norms = np.sqrt(np.bincount(r, weights=w * w, minlength=n_sentences))
+        relevance = np.bincount(r, weights=w * centroid[c], minlength=n_sentences)
+        relevance /= np.maximum(sentence_norms * np.linalg.norm(centroid), 1e-9)
+
+        candidates = np.argsort(-relevance)[:TEXTRANK_CANDIDATES]
+        candidates = candidates[relevance[candidates] > 0]
+        scores = np.zeros(n_sentences, dtype=np.float32)
+        if len(candidates) > 1:
+            scores[candidates] = _textrank(r, c, w, candidates)
+        else:
+            scores[candidates] = 1.0
+
+        # Highest-ranked sentences that fit the word budget, in meeting order
+        chosen: List[int] = []
+        used = 0
+        for i in np.argsort(-scores):
+            if scores[i] <= 0:
+                break
+            if used + word_counts[i] > max_length and chosen:
+                continue
+            chosen.append(int(i))
+            used += word_counts[i]
+            if used >= max_length:
+                break
+        summary = " ".join(sentences[i] for i in sorted(chosen))
+
+        action_candidates = [i for i, sentence in enumerate(sentences) if _action_re.search(sentence)]
+        action_candidates.sort(key=lambda i: -relevance[i])
+        action_items = [sentences[i] for i in sorted(action_candidates[:5])]
+
+        # Keywords: document-level TF-IDF, requiring at least two mentions
+        term_tf = np.bincount(c, minlength=n_terms)
+        term_scores = np.where(term_tf >= 2, term_tf * idf, 0.0)
+        terms = list(vocab)  # ids were assigned in insertion order
+        keywords = [terms[j] for j in np.argsort(-term_scores)[:10] if term_scores[j] > 0]
+
+        logger.info(
+            f"Extractive summary of {n_sentences} sentences / {total_words} words "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return {
+            "summary": summary,
+            "action_items": action_items,
+            "keywords": keywords,
+            "word_count": total_words,
+            "duration_seconds": None
+        }
+
+extractive_summarizer = ExtractiveSummarizer()
@@ -0,0 +1,210 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_
+from app.models.job import TranscriptionJob
+from app.services.events import job_events
+from app.services.metrics import MetricsService
+from app.config import settings
+from typing import Optional
+from uuid import UUID
+from datetime import datetime, timedelta
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JobService:
+    @staticmethod
+    def enqueue(db: Session, meeting_id: UUID, audio_file_id: UUID, file_path: str, commit: bool = True) -> TranscriptionJob:
+        """Queue an audio file for transcription"""
+        job = TranscriptionJob(
+            meeting_id=meeting_id,
+            audio_file_id=audio_file_id,
+            file_path=file_path,
+            status="queued",
+            max_attempts=settings.transcription_job_max_attempts,
+            run_after=datetime.utcnow()
+        )
+        db.add(job)
+        if commit:
+            db.commit()
+            db.refresh(job)
+        logger.info(f"Transcription job queued for meeting {meeting_id}")
+        return job
+
+    @staticmethod
+    def record_completed(
+        db: Session,
+        meeting_id: UUID,
+        audio_file_id: UUID,
+        file_path: str,
+        segments_saved: int,
+        duration: Optional[float],
+        commit: bool = True
+    ) -> TranscriptionJob:
+        """Record a job that was satisfied without decoding (transcription cache hit)"""
+        now = datetime.utcnow()
+        job = TranscriptionJob(
+            meeting_id=meeting_id,
+            audio_file_id=audio_file_id,
+            file_path=file_path,
+            status="completed",
+            progress=100.0,
+            max_attempts=settings.transcription_job_max_attempts,
+            run_after=now,
+            segments_saved=segments_saved,
+            decoded_until_seconds=duration or 0.0,
+            audio_duration_seconds=duration,
+            started_at=now,
+            finished_at=now
+        )
+        db.add(job)
+        if duration:
+            MetricsService.record(db, {"minutes_transcribed": duration / 60})
+        if commit:
+            db.commit()
+            db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: UUID) -> Optional[TranscriptionJob]:
+        """Get job by ID"""
+        return db.query(TranscriptionJob).filter(TranscriptionJob.id == job_id).first()
+
+    @staticmethod
+    def claim_next(db: Session, worker_id: str) -> Optional[TranscriptionJob]:
+        """
+        Claim the next runnable job.
+        Rows locked by other workers are skipped, and running jobs whose lease
+        expired (the worker died) are picked up again.
+        """
+        while True:
+            now = datetime.utcnow()
+            job = db.query(TranscriptionJob).filter(
+                or_(
+                    and_(TranscriptionJob.status == "queued", TranscriptionJob.run_after <= now),
+                    and_(TranscriptionJob.status == "running", TranscriptionJob.locked_until < now)
+                )
+            ).order_by(TranscriptionJob.run_after.asc()).with_for_update(skip_locked=True).first()
+
+            if not job:
+                db.commit()
+                return None
+
+            if job.attempts >= job.max_attempts:
+                # Lease expired on the final attempt
+                job.status = "failed"
+                job.error = job.error or "Worker lost while processing job"
+                job.locked_by = None
+                job.locked_until = None
+                job.finished_at = now
+                db.commit()
+                logger.error(f"Transcription job {job.id} failed after {job.attempts} attempts")
+                continue
+
+            if job.status == "running":
+                logger.warning(f"Reclaiming job {job.id} from {job.locked_by} after lease expiry")
+
+            job.status = "running"
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_until = now + timedelta(seconds=settings.transcription_job_lease_seconds)
+            job.started_at = now
+            job.error = None
+            db.commit()
+            db.refresh(job)
+            return job
+
+    @staticmethod
+    def heartbeat(db: Session, job_id: UUID, worker_id: str, progress: float) -> bool:
+        """Extend the lease and record progress; False if the lease was lost"""
+        updated = db.query(TranscriptionJob).filter(
+            TranscriptionJob.id == job_id,
+            TranscriptionJob.locked_by == worker_id,
+            TranscriptionJob.status == "running"
+        ).update({
+            TranscriptionJob.progress: round(progress, 2),
+            TranscriptionJob.locked_until: datetime.utcnow() + timedelta(seconds=settings.transcription_job_lease_seconds)
+        }, synchronize_session=False)
+        db.commit()
+        return updated == 1
+
+    @staticmethod
+    def extend_lease(db: Session, job_id: UUID, worker_id: str) -> bool:
+        """Push the lease forward without touching progress; False if the lease was lost"""
+        updated = db.query(TranscriptionJob).filter(
+            TranscriptionJob.id == job_id,
+            TranscriptionJob.locked_by == worker_id,
+            TranscriptionJob.status == "running"
+        ).update({
+            TranscriptionJob.locked_until: datetime.utcnow() + timedelta(seconds=settings.transcription_job_lease_seconds)
+        }, synchronize_session=False)
+        db.commit()
+        return updated == 1
+
+    @staticmethod
+    def checkpoint(db: Session, job_id: UUID, worker_id: str, segments_saved: int, decoded_until: float, progress: float) -> bool:
+        """
+        Commit a batch of work: pending transcript rows, job progress and a lease
+        extension land in one transaction, followed by an event for SSE listeners.
+        Returns False (and rolls back) if the lease was lost.
+        """
+        updated = db.query(TranscriptionJob).filter(
+            TranscriptionJob.id == job_id,
+            TranscriptionJob.locked_by == worker_id,
+            TranscriptionJob.status == "running"
+        ).update({
+            TranscriptionJob.segments_saved: segments_saved,
+            TranscriptionJob.decoded_until_seconds: decoded_until,
+            TranscriptionJob.progress: round(progress, 2),
+            TranscriptionJob.locked_until: datetime.utcnow() + timedelta(seconds=settings.transcription_job_lease_seconds)
+        }, synchronize_session=False)
+        if updated != 1:
+            db.rollback()
+            return False
+        job_events.notify(db, job_id)
+        db.commit()
+        return True
+
+    @staticmethod
+    def complete(db: Session, job: TranscriptionJob, segments_saved: int, duration: Optional[float]) -> TranscriptionJob:
+        """Mark job completed; commits any pending work in the same transaction"""
+        job.status = "completed"
+        job.progress = 100.0
+        job.segments_saved = segments_saved
+        job.audio_duration_seconds = duration
+        job.locked_by = None
+        job.locked_until = None
+        job.finished_at = datetime.utcnow()
+        if duration:
+            MetricsService.record(db, {"minutes_transcribed": duration / 60})
+        job_events.notify(db, job.id)
+        db.commit()
+        logger.info(f"Transcription job {job.id} completed ({segments_saved} segments)")
+        return job
+
+    @staticmethod
+    def fail(db: Session, job_id: UUID, worker_id: str, error: str) -> Optional[TranscriptionJob]:
+        """Schedule a retry with backoff, or fail permanently once attempts run out"""
+        job = db.query(TranscriptionJob).filter(
+            TranscriptionJob.id == job_id,
+            TranscriptionJob.locked_by == worker_id
+        ).with_for_update().first()
+        if not job:
+            db.commit()
+            return None
+
+        job.error = error[:2000]
+        job.locked_by = None
+        job.locked_until = None
+        if job.attempts < job.max_attempts:
+            delay = settings.transcription_job_retry_seconds * (2 ** (job.attempts - 1))
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+            logger.warning(f"Transcription job {job.id} attempt {job.attempts} failed, retrying in ~{delay}s: {error}")
+        else:
+            job.status = "failed"
+            job.finished_at = datetime.utcnow()
+            logger.error(f"Transcription job {job.id} failed permanently: {error}")
+        job_events.notify(db, job.id)
+        db.commit()
+        return job
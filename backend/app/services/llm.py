@@ -0,0 +1,252 @@
+from app.config import settings
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import os
+import random
+import time
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+LOCAL_PROVIDER = "local"
+
+class LLMError(Exception):
+    """A provider request failed after all retries"""
+
+    def __init__(self, message: str, provider: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+
+class LLMProvider:
+    """An OpenAI-compatible chat completions endpoint"""
+
+    def __init__(self, name: str, base_url: str, api_key: str, model: str):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+
+class LLMResult:
+    def __init__(self, text: str, provider: str, model: str, usage: Dict, latency: float):
+        self.text = text
+        self.provider = provider
+        self.model = model
+        self.usage = usage
+        self.latency = latency
+
+def configured_providers() -> List[LLMProvider]:
+    """Providers with an API key, in preference order"""
+    providers = []
+    if settings.openai_api_key:
+        providers.append(LLMProvider("openai", settings.openai_base_url, settings.openai_api_key, settings.openai_model))
+    if settings.groq_api_key:
+        providers.append(LLMProvider("groq", settings.groq_base_url, settings.groq_api_key, settings.groq_model))
+    if settings.local_llm_model_path:
+        # Served in-process by app.services.local_llm
+        model = os.path.basename(os.path.normpath(settings.local_llm_model_path))
+        providers.append(LLMProvider(LOCAL_PROVIDER, "", "", model))
+    return providers
+
+class LLMGateway:
+    """
+    Shared async client for chat completions.
+    One pooled keep-alive httpx client and one concurrency semaphore per
+    provider, for whole and streamed completions; transient failures
+    (timeouts, 429, 5xx) are retried with jittered exponential backoff,
+    honoring Retry-After.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def providers(self) -> List[LLMProvider]:
+        return configured_providers()
+
+    def _client(self, provider: LLMProvider) -> httpx.AsyncClient:
+        client = self._clients.get(provider.name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=provider.base_url,
+                headers={"Authorization": f"Bearer {provider.api_key}"},
+                timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_connections
+                )
+            )
+            self._clients[provider.name] = client
+        return client
+
+    def _semaphore(self, provider: LLMProvider) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(provider.name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+            self._semaphores[provider.name] = semaphore
+        return semaphore
+
+    @staticmethod
+    def _backoff(attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), 30.0)
+            except ValueError:
+                pass
+        return settings.llm_retry_base_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def chat(
+        self,
+        messages: List[Dict],
+        provider: Optional[LLMProvider] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        json_mode: bool = False,
+        max_retries: Optional[int] = None
+    ) -> LLMResult:
+        """
+        Run one chat completion on `provider` (default: the first configured one),
+        retrying transient failures up to `max_retries` times (default LLM_MAX_RETRIES)
+        """
+        if provider is None:
+            providers = self.providers()
+            if not providers:
+                raise ValueError("No AI service configured")
+            provider = providers[0]
+
+        payload = {
+            "model": provider.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+
+        if max_retries is None:
+            max_retries = settings.llm_max_retries
+        client = self._client(provider)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            response = None
+            try:
+                async with self._semaphore(provider):
+                    response = await client.post("/chat/completions", json=payload)
+                if response.status_code < 400:
+                    data = response.json()
+                    return LLMResult(
+                        text=data["choices"][0]["message"]["content"] or "",
+                        provider=provider.name,
+                        model=data.get("model", provider.model),
+                        usage=data.get("usage") or {},
+                        latency=time.perf_counter() - start
+                    )
+                if response.status_code not in RETRY_STATUS_CODES:
+                    raise LLMError(
+                        f"{provider.name} returned {response.status_code}: {response.text[:500]}",
+                        provider.name,
+                        response.status_code
+                    )
+                error = f"{provider.name} returned {response.status_code}"
+            except httpx.TransportError as e:
+                # Connect/read timeouts and dropped connections
+                error = f"{provider.name} request failed: {e!r}"
+
+            if attempt >= max_retries:
+                raise LLMError(error, provider.name, response.status_code if response is not None else None)
+            delay = self._backoff(attempt, response)
+            attempt += 1
+            logger.warning(f"{error}; retry {attempt}/{max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        provider: Optional[LLMProvider] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        max_retries: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Run one chat completion with `stream: true`, yielding text deltas as they arrive.
+        Failures before the first delta are retried like `chat`; once text has been
+        yielded a failure raises LLMError, since the caller has already used it.
+        """
+        if provider is None:
+            providers = self.providers()
+            if not providers:
+                raise ValueError("No AI service configured")
+            provider = providers[0]
+
+        payload = {
+            "model": provider.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True
+        }
+
+        if max_retries is None:
+            max_retries = settings.llm_max_retries
+        client = self._client(provider)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            status_code = None
+            retry_response = None
+            started = False
+            try:
+                async with self._semaphore(provider):
+                    async with client.stream("POST", "/chat/completions", json=payload) as response:
+                        status_code = response.status_code
+                        if status_code >= 400:
+                            body = (await response.aread()).decode(errors="replace")
+                            if status_code not in RETRY_STATUS_CODES:
+                                raise LLMError(
+                                    f"{provider.name} returned {status_code}: {body[:500]}",
+                                    provider.name,
+                                    status_code
+                                )
+                            retry_response = response
+                            error = f"{provider.name} returned {status_code}"
+                        else:
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    break
+                                choices = json.loads(data).get("choices") or []
+                                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                                if delta:
+                                    if not started:
+                                        started = True
+                                        logger.debug(
+                                            f"{provider.name} first token after {time.perf_counter() - start:.2f}s"
+                                        )
+                                    yield delta
+                            return
+            except httpx.TransportError as e:
+                # Retrying after text reached the caller would repeat it
+                if started:
+                    raise LLMError(f"{provider.name} stream interrupted: {e!r}", provider.name)
+                error = f"{provider.name} request failed: {e!r}"
+
+            if attempt >= max_retries:
+                raise LLMError(error, provider.name, status_code)
+            delay = self._backoff(attempt, retry_response)
+            attempt += 1
+            logger.warning(f"{error}; retry {attempt}/{max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+llm_gateway = LLMGateway()
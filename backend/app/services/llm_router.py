@@ -0,0 +1,300 @@
+from app.config import settings
+from app.services.llm import LOCAL_PROVIDER, LLMGateway, LLMProvider, LLMResult, configured_providers, llm_gateway
+from app.services.local_llm import local_llm
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Set
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# "name/model" of each provider whose answer was used, inside track_served()
+_served: ContextVar[Optional[Set[str]]] = ContextVar("llm_served", default=None)
+
+@contextmanager
+def track_served() -> Iterator[Set[str]]:
+    """
+    Collect the providers that answer router calls made inside the block,
+    including calls in tasks it starts (e.g. map stages run with gather).
+    """
+    served: Set[str] = set()
+    outer = _served.get()
+    _served.set(served)
+    try:
+        yield served
+    finally:
+        # Not reset(token): a streaming generator may be closed from another context
+        _served.set(outer)
+
+def _note_served(provider: LLMProvider) -> None:
+    served = _served.get()
+    if served is not None:
+        served.add(f"{provider.name}/{provider.model}")
+
+class ProviderHealth:
+    """
+    Rolling latency and outcome window for one provider, plus its circuit.
+    The circuit opens when the error rate over the window reaches
+    LLM_CIRCUIT_ERROR_RATE; after LLM_CIRCUIT_COOLDOWN_SECONDS one probe
+    request is let through, and its outcome closes or reopens the circuit.
+    A closed provider that has only failed (no latency to rank it by) is
+    probed the same way once the cooldown has passed since its last failure,
+    so one early error doesn't rank it last for good.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: deque = deque(maxlen=settings.llm_circuit_window)
+        self.outcomes: deque = deque(maxlen=settings.llm_circuit_window)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.failed_at = 0.0
+        self.probing = False
+        self.requests = 0
+        self.failures = 0
+        self.hedges = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def available(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= settings.llm_circuit_cooldown_seconds:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            return not self.probing
+        return self.state == CLOSED
+
+    def probe_due(self) -> bool:
+        """Closed, unmeasured since failing, and cooled down: worth one request to measure it"""
+        return (
+            self.state == CLOSED
+            and not self.latencies
+            and bool(self.outcomes)
+            and not self.probing
+            and time.monotonic() - self.failed_at >= settings.llm_circuit_cooldown_seconds
+        )
+
+    def score(self) -> Optional[float]:
+        """Expected cost of a request: median latency weighted by error rate (None if never tried)"""
+        median = self.percentile(0.5)
+        if median is None:
+            return float("inf") if self.outcomes else None
+        return median * (1 + 2 * self.error_rate())
+
+    def begin(self) -> None:
+        self.requests += 1
+        if self.state == HALF_OPEN or self.probe_due():
+            self.probing = True
+
+    def abandon(self, elapsed: Optional[float] = None) -> None:
+        """
+        The request was cancelled. A hedge that lost still shows the provider
+        took at least `elapsed`, which keeps it from ranking as unmeasured.
+        """
+        if elapsed is not None:
+            self.latencies.append(elapsed)
+        self.probing = False
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        if self.state != CLOSED:
+            logger.info(f"LLM provider {self.name} recovered, closing circuit")
+            self.state = CLOSED
+            self.outcomes.clear()
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.failed_at = time.monotonic()
+        self.outcomes.append(False)
+        self.probing = False
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED
+            and len(self.outcomes) >= settings.llm_circuit_min_requests
+            and self.error_rate() >= settings.llm_circuit_error_rate
+        ):
+            logger.warning(f"Opening circuit for LLM provider {self.name} (error rate {self.error_rate():.0%})")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "error_rate": round(self.error_rate(), 3),
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None
+        }
+
+class LLMRouter:
+    """
+    Picks a provider per request from rolling latency and error rates.
+    Providers with an open circuit are skipped; a failed request fails over
+    to the next provider instead of retrying the same one, and with
+    LLM_HEDGE_ENABLED a second provider is started when the first has not
+    answered within its own p95 latency. The first answer wins.
+    """
+
+    def __init__(self, gateway: LLMGateway = llm_gateway):
+        self._gateway = gateway
+        self._health: Dict[str, ProviderHealth] = {}
+
+    def health(self, provider: LLMProvider) -> ProviderHealth:
+        health = self._health.get(provider.name)
+        if health is None:
+            health = ProviderHealth(provider.name)
+            self._health[provider.name] = health
+        return health
+
+    def ranked(self) -> List[LLMProvider]:
+        """Providers to try, best first (configured order for untried providers and ties)"""
+        providers = configured_providers()
+        available = [p for p in providers if self.health(p).available()]
+        if not available and providers:
+            # Every circuit is open: try the one that opened first rather than none
+            available = [min(providers, key=lambda p: self.health(p).opened_at)]
+        def rank(provider: LLMProvider):
+            health = self.health(provider)
+            # A provider that only ever failed goes last until it is due a probe, then first
+            if health.probe_due():
+                return (-1, 0.0)
+            score = health.score()
+            # Untried providers go behind measured ones
+            if score is None:
+                return (1, 0.0)
+            return (0 if score < float("inf") else 2, score)
+
+        return sorted(available, key=rank)
+
+    def backend(self, provider: LLMProvider):
+        """The client that serves `provider`: the in-process model or the HTTP gateway"""
+        return local_llm if provider.name == LOCAL_PROVIDER else self._gateway
+
+    def _hedge_delay(self, provider: LLMProvider) -> float:
+        health = self.health(provider)
+        if len(health.latencies) < settings.llm_circuit_min_requests:
+            return settings.llm_hedge_default_delay_seconds
+        return max(settings.llm_hedge_min_delay_seconds, health.percentile(0.95))
+
+    async def _attempt(self, provider: LLMProvider, call: Callable[[], Awaitable[LLMResult]]) -> LLMResult:
+        health = self.health(provider)
+        health.begin()
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            health.abandon(time.perf_counter() - start)
+            raise
+        except Exception:
+            health.record_failure()
+            raise
+        health.record_success(time.perf_counter() - start)
+        _note_served(provider)
+        return result
+
+    async def chat(self, messages: List[Dict], **kwargs) -> LLMResult:
+        """Run one chat completion on the best available provider (see LLMGateway.chat for kwargs)"""
+        queue = self.ranked()
+        if not queue:
+            raise ValueError("No AI service configured")
+
+        tasks: Dict[asyncio.Task, LLMProvider] = {}
+
+        def launch() -> None:
+            provider = queue.pop(0)
+            # Retry in place only when there is nowhere left to fail over to
+            retries = 0 if queue else None
+            call = lambda: self.backend(provider).chat(messages, provider=provider, max_retries=retries, **kwargs)
+            tasks[asyncio.create_task(self._attempt(provider, call))] = provider
+
+        launch()
+        error: Optional[Exception] = None
+        try:
+            while tasks:
+                timeout = None
+                if settings.llm_hedge_enabled and queue and len(tasks) == 1:
+                    timeout = self._hedge_delay(next(iter(tasks.values())))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    slow = next(iter(tasks.values()))
+                    self.health(slow).hedges += 1
+                    logger.info(f"LLM provider {slow.name} slower than {timeout:.2f}s, hedging with {queue[0].name}")
+                    launch()
+                    continue
+                for task in done:
+                    provider = tasks.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        error = e
+                        logger.warning(f"LLM provider {provider.name} failed: {e}")
+                if not tasks and queue:
+                    launch()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream_chat(self, messages: List[Dict], **kwargs) -> AsyncIterator[str]:
+        """
+        Stream one chat completion, failing over while no text has been yielded.
+        Streams are not hedged: text already sent cannot be taken back.
+        """
+        candidates = self.ranked()
+        if not candidates:
+            raise ValueError("No AI service configured")
+
+        for i, provider in enumerate(candidates):
+            last = i == len(candidates) - 1
+            health = self.health(provider)
+            health.begin()
+            start = time.perf_counter()
+            started = False
+            try:
+                async for delta in self.backend(provider).stream_chat(
+                    messages, provider=provider, max_retries=None if last else 0, **kwargs
+                ):
+                    if not started:
+                        started = True
+                        _note_served(provider)
+                    yield delta
+            except Exception as e:
+                health.record_failure()
+                if started or last:
+                    raise
+                logger.warning(f"LLM provider {provider.name} failed before streaming, failing over: {e}")
+                continue
+            except BaseException:
+                # The consumer went away (or was cancelled) mid-stream
+                health.abandon()
+                raise
+            health.record_success(time.perf_counter() - start)
+            return
+
+    def stats(self) -> Dict:
+        return {
+            "hedging": settings.llm_hedge_enabled,
+            "providers": {p.name: self.health(p).stats() for p in configured_providers()}
+        }
+
+llm_router = LLMRouter()
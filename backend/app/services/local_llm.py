@@ -0,0 +1,210 @@
+from app.config import settings
+from app.services.llm import LOCAL_PROVIDER, LLMError, LLMProvider, LLMResult
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+END_TOKENS = ["<|im_end|>", "<|endoftext|>"]
+
+class LocalLLM:
+    """
+    Summaries on CPU from a small quantized model run by CTranslate2
+    (installed with faster-whisper). LOCAL_LLM_MODEL_PATH is a converted
+    model directory with its tokenizer.json, e.g. from
+    `ct2-transformers-converter --model Qwen/Qwen2.5-1.5B-Instruct --quantization int8`.
+    The model is loaded once per process and shared; decoding is greedy.
+    Generations run on a dedicated pool of LOCAL_LLM_WORKERS threads behind
+    a semaphore of the same size, so they queue here rather than filling
+    the default executor that file and database work shares.
+    Same chat/stream_chat interface as LLMGateway, so the router can use it
+    as one more provider.
+    """
+
+    def __init__(self):
+        self._model = None
+        self._tokenizer = None
+        self._load_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(settings.local_llm_workers)
+        return self._slots
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.local_llm_workers, thread_name_prefix="local-llm"
+            )
+        return self._executor
+
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        """Return (model, tokenizer), loading them on first use"""
+        if self._model is not None:
+            return self._model, self._tokenizer
+
+        with self._lock:
+            if self._model is None:
+                import ctranslate2
+                from tokenizers import Tokenizer
+
+                path = settings.local_llm_model_path
+                if not path:
+                    raise ValueError("LOCAL_LLM_MODEL_PATH is not set")
+                start = time.perf_counter()
+                seq2seq = settings.local_llm_architecture == "seq2seq"
+                model_class = ctranslate2.Translator if seq2seq else ctranslate2.Generator
+                model = model_class(
+                    path,
+                    device="cpu",
+                    compute_type=settings.local_llm_compute_type,
+                    intra_threads=settings.local_llm_threads,
+                    inter_threads=settings.local_llm_workers
+                )
+                self._tokenizer = Tokenizer.from_file(os.path.join(path, "tokenizer.json"))
+                self._model = model
+                self._load_seconds = time.perf_counter() - start
+                logger.info(f"Local LLM {path} ({settings.local_llm_compute_type}) loaded in {self._load_seconds:.2f}s")
+        return self._model, self._tokenizer
+
+    @staticmethod
+    def _prompt(messages: List[Dict]) -> str:
+        if settings.local_llm_architecture == "seq2seq" or settings.local_llm_prompt_format == "plain":
+            return "\n\n".join(m["content"] for m in messages)
+        # ChatML, used by Qwen, SmolLM and most small instruct models
+        turns = "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+        return turns + "<|im_start|>assistant\n"
+
+    def _input_tokens(self, tokenizer, messages: List[Dict]) -> List[str]:
+        tokens = tokenizer.encode(self._prompt(messages)).tokens
+        limit = settings.local_llm_max_input_tokens
+        if len(tokens) > limit:
+            # Keep the instructions at both ends of the prompt; lower SUMMARY_CHUNK_TOKENS to avoid this
+            logger.warning(f"Local LLM prompt of {len(tokens)} tokens cut to {limit}")
+            tokens = tokens[:limit // 2] + tokens[-(limit - limit // 2):]
+        return tokens
+
+    def _generate(self, messages: List[Dict], max_tokens: int) -> List[int]:
+        model, tokenizer = self.load()
+        tokens = self._input_tokens(tokenizer, messages)
+        if settings.local_llm_architecture == "seq2seq":
+            result = model.translate_batch([tokens], max_decoding_length=max_tokens, beam_size=1)
+            return [tokenizer.token_to_id(t) for t in result[0].hypotheses[0]]
+        result = model.generate_batch(
+            [tokens], max_length=max_tokens, include_prompt_in_result=False, end_token=END_TOKENS
+        )
+        return result[0].sequences_ids[0]
+
+    @staticmethod
+    def _as_json(text: str) -> str:
+        # Small models often answer in prose; keep the summary contract for callers asking for JSON
+        start = text.find("{")
+        if start != -1 and text.rfind("}") > start:
+            return text
+        return json.dumps({"summary": text.strip(), "action_items": [], "keywords": []})
+
+    async def chat(
+        self,
+        messages: List[Dict],
+        provider: Optional[LLMProvider] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        json_mode: bool = False,
+        max_retries: Optional[int] = None
+    ) -> LLMResult:
+        """Run one completion in a worker thread; `temperature` and `max_retries` do not apply"""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._semaphore():
+                ids = await loop.run_in_executor(self._pool(), self._generate, messages, max_tokens)
+        except Exception as e:
+            raise LLMError(f"local model failed: {e!r}", LOCAL_PROVIDER)
+        text = self._tokenizer.decode(ids)
+        return LLMResult(
+            text=self._as_json(text) if json_mode else text,
+            provider=LOCAL_PROVIDER,
+            model=provider.model if provider else LOCAL_PROVIDER,
+            usage={"completion_tokens": len(ids)},
+            latency=time.perf_counter() - start
+        )
+
+    def _generate_tokens(
+        self,
+        messages: List[Dict],
+        max_tokens: int,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        stop: threading.Event
+    ) -> None:
+        """Decode in a worker thread, handing each token id to the event loop; None marks the end"""
+        try:
+            model, tokenizer = self.load()
+            tokens = self._input_tokens(tokenizer, messages)
+            if settings.local_llm_architecture == "seq2seq":
+                steps = model.generate_tokens(tokens, max_decoding_length=max_tokens)
+            else:
+                steps = model.generate_tokens(tokens, max_length=max_tokens, end_token=END_TOKENS)
+            for step in steps:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, step.token_id)
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        provider: Optional[LLMProvider] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.7,
+        max_retries: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Yield text as tokens are decoded"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        async with self._semaphore():
+            worker = loop.run_in_executor(
+                self._pool(), self._generate_tokens, messages, max_tokens, loop, queue, stop
+            )
+            ids: List[int] = []
+            sent = ""
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise LLMError(f"local model failed: {item!r}", LOCAL_PROVIDER)
+                    ids.append(item)
+                    # Decode the whole sequence so multi-token characters come out whole
+                    text = self._tokenizer.decode(ids)
+                    if len(text) > len(sent) and not text.endswith("�"):
+                        yield text[len(sent):]
+                        sent = text
+            finally:
+                stop.set()
+                await worker
+
+    def stats(self) -> Dict:
+        return {
+            "model_path": settings.local_llm_model_path,
+            "loaded": self.is_loaded(),
+            "load_seconds": round(self._load_seconds, 3) if self._load_seconds is not None else None
+        }
+
+local_llm = LocalLLM()
@@ -0,0 +1,406 @@
+from app.config import settings
+from app.services.whisper import model_registry, segment_to_dict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import multiprocessing
+import os
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+MIN_SILENCE_SECONDS = 0.3
+MAX_EDGE_OVERLAP_WORDS = 8
+
+_word_re = re.compile(r"[\w']+")
+
+def probe_duration(audio_path: str) -> Optional[float]:
+    """Read the container duration without decoding the audio"""
+    try:
+        import av
+
+        with av.open(audio_path) as container:
+            if container.duration:
+                return container.duration / av.time_base
+    except Exception as e:
+        logger.warning(f"Unable to probe duration of {audio_path}: {e}")
+    return None
+
+def _frame_rms(audio, frame_length: int):
+    """RMS energy per frame, computed in blocks to avoid copying the whole recording"""
+    import numpy as np
+
+    n_frames = len(audio) // frame_length
+    rms = np.empty(n_frames, dtype=np.float32)
+    block = 20000
+    for i in range(0, n_frames, block):
+        frames = audio[i * frame_length:min(n_frames, i + block) * frame_length].reshape(-1, frame_length)
+        rms[i:i + len(frames)] = np.sqrt(np.mean(np.square(frames), axis=1))
+    return rms
+
+def _longest_run(mask, min_length: int) -> Optional[Tuple[int, int]]:
+    """(start, end) of the longest run of True values, if at least min_length long"""
+    import numpy as np
+
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not len(starts):
+        return None
+    i = int(np.argmax(ends - starts))
+    if ends[i] - starts[i] < min_length:
+        return None
+    return int(starts[i]), int(ends[i])
+
+def _iter_decoded(audio_path: str) -> Iterator:
+    """Decode to 16kHz mono float32 a block at a time (what decode_audio returns, without holding it all)"""
+    import av
+    import numpy as np
+
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    with av.open(audio_path, metadata_errors="ignore") as container:
+        frames = container.decode(audio=0)
+        for frame in frames:
+            for resampled in resampler.resample(frame):
+                yield resampled.to_ndarray().reshape(-1).astype(np.float32) / 32768.0
+        for resampled in resampler.resample(None):
+            yield resampled.to_ndarray().reshape(-1).astype(np.float32) / 32768.0
+
+def scan_energy(audio_path: str, frame_length: int):
+    """
+    First pass over a file: per-frame RMS and the total sample count.
+    Keeps one frame of samples between blocks, so memory is independent of length.
+    """
+    import numpy as np
+
+    rms_blocks = []
+    carry = np.empty(0, dtype=np.float32)
+    total = 0
+    for block in _iter_decoded(audio_path):
+        total += len(block)
+        block = np.concatenate((carry, block))
+        usable = len(block) - len(block) % frame_length
+        if usable:
+            rms_blocks.append(_frame_rms(block[:usable], frame_length))
+        carry = block[usable:]
+    rms = np.concatenate(rms_blocks) if rms_blocks else np.empty(0, dtype=np.float32)
+    return rms, total
+
+def iter_chunk_audio(audio_path: str, chunks: List[Tuple[int, int]]) -> Iterator:
+    """
+    Second pass: decode the file again and yield a standalone array for each
+    (start, end) sample range, in order. Samples before the next chunk's start
+    are dropped as soon as a chunk is cut, so about one chunk is buffered.
+    """
+    import numpy as np
+
+    blocks = _iter_decoded(audio_path)
+    pending: List = []
+    buffered = 0
+    buffer_start = 0
+    for i, (start, end) in enumerate(chunks):
+        while buffer_start + buffered < end:
+            block = next(blocks, None)
+            if block is None:
+                break
+            pending.append(block)
+            buffered += len(block)
+        buffer = np.concatenate(pending) if pending else np.empty(0, dtype=np.float32)
+        yield buffer[max(0, start - buffer_start):end - buffer_start].copy()
+        # Overlapping chunks start before the previous one ends
+        next_start = chunks[i + 1][0] if i + 1 < len(chunks) else buffer_start + len(buffer)
+        drop = min(len(buffer), max(0, next_start - buffer_start))
+        pending = [buffer[drop:]]
+        buffered = len(buffer) - drop
+        buffer_start += drop
+
+def find_chunks(
+    audio,
+    sample_rate: int,
+    chunk_seconds: float,
+    search_seconds: float,
+    overlap_seconds: float
+) -> List[Tuple[int, int]]:
+    """
+    Split audio into (start, end) sample ranges of roughly chunk_seconds.
+    Each cut lands in the middle of the longest silence near the target;
+    when there is none, chunks overlap and the stitcher removes duplicates.
+    """
+    frame_length = int(FRAME_SECONDS * sample_rate)
+    return find_chunks_from_energy(
+        _frame_rms(audio, frame_length), len(audio), sample_rate, chunk_seconds, search_seconds, overlap_seconds
+    )
+
+def find_chunks_from_energy(
+    rms,
+    total: int,
+    sample_rate: int,
+    chunk_seconds: float,
+    search_seconds: float,
+    overlap_seconds: float
+) -> List[Tuple[int, int]]:
+    """find_chunks for a recording of `total` samples given its per-frame RMS"""
+    import numpy as np
+
+    chunk = int(chunk_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    overlap = int(overlap_seconds * sample_rate)
+    if total <= chunk + search:
+        return [(0, total)]
+
+    frame_length = int(FRAME_SECONDS * sample_rate)
+    quiet = rms <= max(float(np.percentile(rms, 10)) * 2.0, 1e-4)
+    min_frames = int(MIN_SILENCE_SECONDS / FRAME_SECONDS)
+
+    chunks = []
+    start = 0
+    while total - start > chunk + search:
+        target = start + chunk
+        lo = (target - search) // frame_length
+        hi = (target + search) // frame_length
+        run = _longest_run(quiet[lo:hi], min_frames)
+        if run:
+            cut = (lo + (run[0] + run[1]) // 2) * frame_length
+            chunks.append((start, cut))
+            start = cut
+        else:
+            chunks.append((start, min(total, target + overlap)))
+            start = target - overlap
+    chunks.append((start, total))
+    return chunks
+
+def _words(text: str) -> List[str]:
+    return [w.lower() for w in _word_re.findall(text)]
+
+def _strip_repeated_prefix(previous_text: str, text: str) -> str:
+    """Drop the leading words of `text` that repeat the tail of `previous_text`"""
+    prev_words = _words(previous_text)
+    tokens = text.split()
+    next_words = [_words(t) for t in tokens]
+    flat = [w for ws in next_words for w in ws]
+    limit = min(MAX_EDGE_OVERLAP_WORDS, len(prev_words), len(flat))
+    for k in range(limit, 0, -1):
+        if prev_words[-k:] == flat[:k]:
+            # Map k normalized words back onto whitespace tokens
+            consumed = 0
+            for i, ws in enumerate(next_words):
+                consumed += len(ws)
+                if consumed >= k:
+                    return " ".join(tokens[i + 1:])
+    return text
+
+def _shift(seg: Dict, offset: float) -> Dict:
+    shifted = {**seg, "start": seg["start"] + offset, "end": seg["end"] + offset}
+    if seg.get("words"):
+        shifted["words"] = [{**w, "start": w["start"] + offset, "end": w["end"] + offset} for w in seg["words"]]
+    return shifted
+
+def _with_words(seg: Dict, words: List[Dict]) -> Optional[Dict]:
+    if not words:
+        return None
+    text = "".join(w["word"] for w in words)
+    return {**seg, "start": words[0]["start"], "end": words[-1]["end"], "text": text, "words": words}
+
+def _before(seg: Dict, boundary: float) -> Optional[Dict]:
+    """The part of a segment spoken before `boundary` (whole if it has no word times)"""
+    if seg["end"] <= boundary or not seg.get("words"):
+        return seg
+    return _with_words(seg, [w for w in seg["words"] if w["start"] < boundary])
+
+def _after(seg: Dict, boundary: float) -> Optional[Dict]:
+    """The part of a segment spoken from `boundary` on (whole if it has no word times)"""
+    if seg["start"] >= boundary or not seg.get("words"):
+        return seg
+    return _with_words(seg, [w for w in seg["words"] if w["start"] >= boundary])
+
+def _public(seg: Dict) -> Dict:
+    return {key: value for key, value in seg.items() if key != "words"}
+
+class SegmentStitcher:
+    """
+    Merges per-chunk segments into one timeline, one chunk at a time.
+    The newest chunk's segments are held back until the next chunk arrives,
+    since an overlapping successor may replace its tail. Segments that cross
+    the middle of an overlap are cut there by their word timestamps; without
+    them, the repeated words at the edge are found by text instead.
+    """
+
+    def __init__(self):
+        self._held: List[Dict] = []
+        self._last_text: Optional[str] = None
+        self._prev_end: Optional[float] = None
+
+    def add_chunk(self, chunk_start: float, chunk_end: float, segments: List[Dict]) -> List[Dict]:
+        """Add a chunk (segment times relative to it); returns segments that are now final"""
+        shifted = [_shift(seg, chunk_start) for seg in segments]
+        held = self._held
+        # Cuts without a silence overlap the previous chunk; silence cuts don't
+        overlapped = self._prev_end is not None and self._prev_end > chunk_start
+        if overlapped:
+            # Each side keeps the words spoken on its half
+            boundary = (chunk_start + self._prev_end) / 2
+            held = [part for part in (_before(seg, boundary) for seg in held if seg["start"] < boundary) if part]
+            shifted = [part for part in (_after(seg, boundary) for seg in shifted if seg["end"] > boundary) if part]
+
+        # Only overlapped audio can be transcribed twice; words repeated across
+        # a silence cut ("yes. / yes, ...") were spoken twice
+        previous_text = held[-1]["text"] if held else self._last_text
+        if overlapped and previous_text is not None and shifted:
+            text = _strip_repeated_prefix(previous_text, shifted[0]["text"])
+            if text.strip():
+                shifted[0] = {**shifted[0], "text": " " + text.strip()}
+            else:
+                shifted = shifted[1:]
+
+        if held:
+            self._last_text = held[-1]["text"]
+        self._held = shifted
+        self._prev_end = chunk_end
+        return [_public(seg) for seg in held]
+
+    def finish(self) -> List[Dict]:
+        held, self._held = self._held, []
+        return [_public(seg) for seg in held]
+
+def stitch_segments(chunk_results: List[Tuple[float, float, List[Dict]]]) -> List[Dict]:
+    """
+    Merge per-chunk segments into one timeline.
+    chunk_results holds (chunk_start_seconds, chunk_end_seconds, segments) in order,
+    with segment times relative to their chunk.
+    """
+    stitcher = SegmentStitcher()
+    merged: List[Dict] = []
+    for chunk_start, chunk_end, segments in chunk_results:
+        merged.extend(stitcher.add_chunk(chunk_start, chunk_end, segments))
+    merged.extend(stitcher.finish())
+    return merged
+
+def _init_chunk_worker(cpu_threads: int) -> None:
+    """Runs once in each pool process: size CTranslate2 threads and load the model"""
+    settings.whisper_cpu_threads = cpu_threads
+    settings.whisper_num_workers = 1
+    model_registry.get()
+
+def _transcribe_chunk(audio, language: str) -> List[Dict]:
+    model = model_registry.get()
+    # Word times let the stitcher cut segments that cross an overlap
+    segments, _ = model.transcribe(audio, language=language, word_timestamps=True)
+    return [
+        {
+            **segment_to_dict(segment),
+            "words": [{"start": w.start, "end": w.end, "word": w.word} for w in segment.words or []]
+        }
+        for segment in segments
+    ]
+
+class LongAudioTranscriber:
+    """Transcribes long recordings as silence-delimited chunks in a process pool"""
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def worker_count() -> int:
+        return settings.long_audio_workers or os.cpu_count() or 1
+
+    def _get_pool(self) -> Tuple[ProcessPoolExecutor, bool]:
+        with self._lock:
+            if self._pool is not None:
+                return self._pool, False
+            workers = self.worker_count()
+            cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+            # spawn: forking a process that runs worker threads is not safe
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(cpu_threads,)
+            )
+            logger.info(f"Started long-audio pool with {workers} process(es), {cpu_threads} thread(s) each")
+            return self._pool, True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def iter_segments(
+        self,
+        audio_path: str,
+        resume_from: float = 0.0,
+        progress_callback: Optional[Callable[[float, float], None]] = None
+    ) -> Tuple[float, Iterator[Dict]]:
+        """
+        Same contract as AIService.iter_transcription.
+        The file is decoded twice as a stream: once to find silences, then again
+        to cut chunks, which go to the pool through a window of workers + 1
+        in flight. Segments are yielded in order as each chunk finishes, and
+        peak memory stays a few chunks however long the recording is.
+        """
+        start = time.perf_counter()
+        frame_length = int(FRAME_SECONDS * SAMPLE_RATE)
+        rms, total = scan_energy(audio_path, frame_length)
+        duration = total / SAMPLE_RATE
+        chunks = find_chunks_from_energy(
+            rms,
+            total,
+            SAMPLE_RATE,
+            settings.long_audio_chunk_seconds,
+            settings.long_audio_search_seconds,
+            settings.long_audio_overlap_seconds
+        )
+        del rms
+        # Chunks already stored by an earlier attempt are not decoded again;
+        # the last one is kept so the stitcher can dedupe against its tail
+        first = 0
+        while first < len(chunks) - 1 and chunks[first + 1][1] / SAMPLE_RATE <= resume_from:
+            first += 1
+
+        pool, cold = self._get_pool()
+        window = self.worker_count() + 1
+
+        def generate() -> Iterator[Dict]:
+            stitcher = SegmentStitcher()
+            in_flight = deque()
+            pieces = iter_chunk_audio(audio_path, chunks)
+            try:
+                for index, piece in enumerate(pieces):
+                    if index < first:
+                        continue
+                    in_flight.append((chunks[index], pool.submit(_transcribe_chunk, piece, "en")))
+                    del piece
+                    if len(in_flight) < window:
+                        continue
+                    yield from collect(stitcher, *in_flight.popleft())
+                while in_flight:
+                    yield from collect(stitcher, *in_flight.popleft())
+                for segment in stitcher.finish():
+                    if segment["start"] >= resume_from:
+                        yield segment
+            finally:
+                for _, future in in_flight:
+                    future.cancel()
+            logger.info(
+                f"Transcribed {duration:.1f}s of audio in {time.perf_counter() - start:.2f}s "
+                f"({len(chunks) - first} chunks, {self.worker_count()} workers, {'cold' if cold else 'warm'} pool)"
+            )
+
+        def collect(stitcher: SegmentStitcher, chunk: Tuple[int, int], future) -> Iterator[Dict]:
+            s, e = chunk
+            ready = stitcher.add_chunk(s / SAMPLE_RATE, e / SAMPLE_RATE, future.result())
+            for segment in ready:
+                if segment["start"] >= resume_from:
+                    yield segment
+            if progress_callback:
+                progress_callback(min(e / SAMPLE_RATE, duration), duration)
+
+        return duration, generate()
+
+long_audio_transcriber = LongAudioTranscriber()
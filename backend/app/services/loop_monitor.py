@@ -0,0 +1,166 @@
+from app.config import settings
+from collections import deque
+from datetime import datetime
+from types import CodeType, FrameType
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import logging
+
+logger = logging.getLogger(__name__)
+
+STACK_DEPTH = 25
+
+class LoopLagMonitor:
+    """
+    Measures event-loop scheduling delay and attributes stalls to handlers.
+    A task on the loop sleeps LOOP_MONITOR_INTERVAL_SECONDS at a time and
+    records how late it wakes up. A watchdog thread notices when those
+    wake-ups stop; once the loop has been blocked for
+    LOOP_MONITOR_STALL_SECONDS it samples the loop thread's stack, and the
+    route handler found on that stack (or the innermost app function) is
+    charged with the stall.
+    """
+
+    def __init__(self):
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._routes: Dict[CodeType, str] = {}
+        self._beat = time.monotonic()
+        self._pending: Optional[Tuple[str, List[str]]] = None
+        self._lags: deque = deque(maxlen=2000)
+        self.samples = 0
+        self.max_lag = 0.0
+        self.stalls: Dict[str, Dict] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, app=None) -> None:
+        """Start sampling the running loop; `app` routes are used to name handlers"""
+        if app is not None:
+            for route in app.routes:
+                endpoint = getattr(route, "endpoint", None)
+                code = getattr(endpoint, "__code__", None)
+                if code is not None:
+                    methods = ",".join(sorted(getattr(route, "methods", None) or ["WS"]))
+                    self._routes[code] = f"{methods} {route.path}"
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+        logger.info("Event loop lag monitor started")
+
+    def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        self._task = None
+
+    async def _tick(self) -> None:
+        interval = settings.loop_monitor_interval_seconds
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            self._beat = now
+            self._record(max(0.0, now - expected))
+
+    def _record(self, lag: float) -> None:
+        self.samples += 1
+        self._lags.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if lag < settings.loop_monitor_stall_seconds:
+            return
+        # The watchdog misses only stalls that end between two of its checks
+        handler, stack = pending or ("unattributed", [])
+        stats = self.stalls.setdefault(handler, {"stalls": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        stats["stalls"] += 1
+        stats["total_seconds"] += lag
+        stats["max_seconds"] = max(stats["max_seconds"], lag)
+        if stack:
+            stats["last_stack"] = stack
+        stats["last_at"] = datetime.utcnow()
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms in {handler}")
+
+    def _watch(self) -> None:
+        """Watchdog thread: sample the loop thread's stack while it is blocked"""
+        interval = settings.loop_monitor_interval_seconds
+        threshold = settings.loop_monitor_stall_seconds
+        while not self._stop.wait(min(interval, threshold) / 2):
+            blocked = time.monotonic() - self._beat - interval
+            if blocked < threshold or self._pending is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            sample = (self._attribute(frame), self._format(frame))
+            with self._lock:
+                # Keep the first sample of a stall; the tick that ends it consumes it
+                if time.monotonic() - self._beat - interval >= threshold:
+                    self._pending = sample
+
+    def _attribute(self, frame: FrameType) -> str:
+        """The route handler on the stack, else the innermost function in the app package"""
+        innermost_app = None
+        while frame is not None:
+            route = self._routes.get(frame.f_code)
+            if route is not None:
+                return route
+            module = frame.f_globals.get("__name__", "")
+            if innermost_app is None and module.startswith("app.") and module != __name__:
+                innermost_app = f"{module}.{frame.f_code.co_name}"
+            frame = frame.f_back
+        return innermost_app or "unattributed"
+
+    @staticmethod
+    def _format(frame: FrameType) -> List[str]:
+        return [
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame)[-STACK_DEPTH:]
+        ]
+
+    @staticmethod
+    def _percentile(ordered: List[float], q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+    def stats(self) -> Dict:
+        ordered = sorted(self._lags)
+        handlers = sorted(self.stalls.items(), key=lambda item: -item[1]["total_seconds"])
+        return {
+            "running": self.running,
+            "interval_ms": settings.loop_monitor_interval_seconds * 1000,
+            "stall_threshold_ms": settings.loop_monitor_stall_seconds * 1000,
+            "samples": self.samples,
+            "lag_ms": {
+                "p50": round(self._percentile(ordered, 0.5) * 1000, 2),
+                "p99": round(self._percentile(ordered, 0.99) * 1000, 2),
+                "max": round(self.max_lag * 1000, 2)
+            },
+            "stalls": sum(stats["stalls"] for _, stats in handlers),
+            "handlers": [
+                {
+                    "handler": handler,
+                    "stalls": stats["stalls"],
+                    "total_ms": round(stats["total_seconds"] * 1000, 1),
+                    "max_ms": round(stats["max_seconds"] * 1000, 1),
+                    "last_at": stats["last_at"],
+                    "last_stack": stats.get("last_stack", [])
+                }
+                for handler, stats in handlers
+            ]
+        }
+
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,156 @@
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+import os
+import aiofiles
+import logging
+
+logger = logging.getLogger(__name__)
+
+ZEROCOPY_EXTENSION = "http.response.zerocopy"
+
+class RangeNotSatisfiableError(Exception):
+    """Range header does not overlap the file"""
+
+def file_etag(stat_result: os.stat_result, content_sha256: Optional[str] = None) -> str:
+    """Strong validator: the content hash when known, else inode, size and mtime"""
+    if content_sha256:
+        return f'"{content_sha256}"'
+    return f'"{stat_result.st_ino:x}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak and candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def _parse_http_date(value: str) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def is_not_modified(headers: Headers, etag: str, mtime: float) -> bool:
+    """RFC 9110 If-None-Match / If-Modified-Since evaluation for GET and HEAD"""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag, weak=True)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and int(mtime) <= since
+    return False
+
+def parse_range(headers: Headers, size: int, etag: str, mtime: float) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single byte range, or None to send the whole file.
+    Multiple ranges, malformed headers and stale If-Range validators all fall
+    back to the full body, which RFC 9110 allows.
+    """
+    header = headers.get("range")
+    if not header or not header.startswith("bytes="):
+        return None
+    if_range = headers.get("if-range")
+    if if_range:
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            if not _etag_matches(if_range, etag, weak=False):
+                return None
+        elif _parse_http_date(if_range) != int(mtime):
+            return None
+
+    spec = header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+    first, _, last = spec.partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiableError()
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start > end:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError()
+    return start, min(end, size - 1)
+
+class RangeFileResponse(Response):
+    """
+    Sends a file or one byte range of it.
+    Uses the ASGI zero-copy extension (sendfile) when the server offers it,
+    and otherwise streams the range in fixed-size async reads.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        etag: str,
+        media_type: Optional[str] = None,
+        byte_range: Optional[Tuple[int, int]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        send_body: bool = True
+    ):
+        self.path = path
+        self.send_body = send_body
+        size = stat_result.st_size
+        self.start, end = byte_range if byte_range else (0, size - 1)
+        self.length = end - self.start + 1 if size else 0
+        super().__init__(
+            status_code=206 if byte_range else 200,
+            headers={
+                **(headers or {}),
+                "accept-ranges": "bytes",
+                "etag": etag,
+                "last-modified": formatdate(stat_result.st_mtime, usegmt=True)
+            },
+            media_type=media_type
+        )
+        self.headers["content-length"] = str(self.length)
+        if byte_range:
+            self.headers["content-range"] = f"bytes {self.start}-{end}/{size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or not self.length:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": f,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False
+                })
+            return
+
+        remaining = self.length
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(self.start)
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # File shrank underneath us; close the stream cleanly
+            logger.warning(f"Short read serving {self.path}: {remaining} bytes missing")
+            await send({"type": "http.response.body", "body": b""})
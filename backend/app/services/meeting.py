@@ -1,16 +1,36 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import Update, func, insert, select, text, tuple_, update
 from app.models.meeting import Meeting
 from app.models.transcript import Participant, Transcript
 from app.models.summary import Summary
+from app.models.user import User
 from app.schemas.meeting import MeetingCreate, MeetingUpdate
-from typing import List, Optional
+from app.services.term_index import TermIndexService
+from app.services.metrics import MetricsService
+from typing import Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta
+import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+RECONCILE_BATCH_SIZE = 500
+INSERT_BATCH_SIZE = 1000
+
+def bump_counters(meeting_id: UUID, **deltas: int) -> Update:
+    """UPDATE adding to a meeting's counters; run it in the transaction that writes the counted rows"""
+    return update(Meeting).where(Meeting.id == meeting_id).values(
+        {name: getattr(Meeting, name) + delta for name, delta in deltas.items()}
+    ).execution_options(synchronize_session=False)
+
+def mark_summarized(meeting_id: UUID) -> Update:
+    return update(Meeting).where(Meeting.id == meeting_id, Meeting.has_summary.is_(False)).values(
+        has_summary=True
+    ).execution_options(synchronize_session=False)
+
 class MeetingService:
     @staticmethod
     def create_meeting(db: Session, host_id: UUID, meeting_data: MeetingCreate) -> Meeting:
@@ -23,6 +43,7 @@ class MeetingService:
             status="scheduled"
         )
         db.add(meeting)
+        MetricsService.record(db, {"meetings": 1})
         db.commit()
         db.refresh(meeting)
         logger.info(f"Meeting created: {meeting.id}")
@@ -33,6 +54,20 @@ class MeetingService:
         """Get meeting by ID"""
         return db.query(Meeting).filter(Meeting.id == meeting_id).first()
     
+    @staticmethod
+    def user_can_access(db: Session, meeting: Meeting, user_id: UUID) -> bool:
+        """Host, anyone who joined, or an admin"""
+        if str(meeting.host_id) == str(user_id):
+            return True
+        joined = db.query(Participant.id).filter(
+            Participant.meeting_id == meeting.id,
+            Participant.user_id == user_id
+        ).first()
+        if joined:
+            return True
+        user = db.query(User).filter(User.id == user_id).first()
+        return bool(user and user.is_admin)
+    
     @staticmethod
     def get_user_meetings(db: Session, user_id: UUID, limit: int = 50) -> List[Meeting]:
         """Get all meetings for a user"""
@@ -72,6 +107,8 @@ class MeetingService:
             user_id=user_id
         )
         db.add(participant)
+        db.execute(bump_counters(meeting_id, participants_count=1))
+        MetricsService.record(db, {"participants": 1})
         db.commit()
         db.refresh(participant)
         logger.info(f"User {user_id} joined meeting {meeting_id}")
@@ -105,6 +142,8 @@ class MeetingService:
         if not meeting:
             raise ValueError("Meeting not found")
         
+        if meeting.status != "completed":
+            MetricsService.record(db, {"meetings_completed": 1})
         meeting.status = "completed"
         meeting.ended_at = datetime.utcnow()
         
@@ -140,19 +179,103 @@ class MeetingService:
         ).order_by(Transcript.created_at.asc()).all()
     
     @staticmethod
-    def add_transcript(db: Session, meeting_id: UUID, speaker_name: str, text: str, timestamp: int = 0) -> Transcript:
+    def get_transcripts_after(
+        db: Session,
+        meeting_id: UUID,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        since: Optional[datetime] = None,
+        limit: int = 500
+    ) -> List[Transcript]:
+        """Get transcripts in insertion order, after a (created_at, id) cursor"""
+        query = db.query(Transcript).filter(Transcript.meeting_id == meeting_id)
+        if since is not None:
+            query = query.filter(Transcript.created_at >= since)
+        if after is not None:
+            query = query.filter(tuple_(Transcript.created_at, Transcript.id) > tuple_(*after))
+        return query.order_by(Transcript.created_at.asc(), Transcript.id.asc()).limit(limit).all()
+    
+    @staticmethod
+    def get_transcripts_after_seq(db: Session, meeting_id: UUID, after: Optional[int] = None, limit: int = 500) -> List[Transcript]:
+        """Get transcripts in commit order, after a seq"""
+        query = db.query(Transcript).filter(Transcript.meeting_id == meeting_id, Transcript.seq.is_not(None))
+        if after is not None:
+            query = query.filter(Transcript.seq > after)
+        return query.order_by(Transcript.seq.asc()).limit(limit).all()
+    
+    @staticmethod
+    def claim_seq(db: Session, meeting_id: UUID, count: int) -> int:
+        """
+        Count `count` new transcripts on the meeting row and reserve as many
+        seqs for them; returns the first. The row lock is held until commit,
+        so a writer that claims later also commits later: a reader that sees
+        a seq has already seen every smaller one.
+        """
+        last = db.execute(
+            bump_counters(meeting_id, transcript_count=count, transcript_seq=count).returning(Meeting.transcript_seq)
+        ).scalar_one()
+        return last - count + 1
+    
+    @staticmethod
+    def add_transcript(db: Session, meeting_id: UUID, speaker_name: str, text: str, timestamp: int = 0, commit: bool = True) -> Transcript:
         """Add transcript segment"""
+        # Term index lock before the meeting row lock, the order delete_meeting takes them in
+        TermIndexService.index_texts(db, meeting_id, [text])
         transcript = Transcript(
             meeting_id=meeting_id,
             speaker_name=speaker_name,
             transcript_text=text,
-            timestamp_seconds=timestamp
+            timestamp_seconds=timestamp,
+            seq=MeetingService.claim_seq(db, meeting_id, 1)
         )
         db.add(transcript)
-        db.commit()
-        db.refresh(transcript)
+        if commit:
+            db.commit()
+            db.refresh(transcript)
         return transcript
     
+    @staticmethod
+    def add_transcripts_bulk(
+        db: Session,
+        meeting_id: UUID,
+        segments: Iterable[Dict],
+        speaker_name: str = "Speaker",
+        commit: bool = True
+    ) -> int:
+        """
+        Insert many transcript segments with one multi-row INSERT per
+        INSERT_BATCH_SIZE rows, optionally in its own transaction. Seqs for all
+        of them are claimed at once, so the meeting row is locked once per call.
+        Returns the row count.
+        Segments are {"text", "start", "end", "confidence", "speaker"?} dicts.
+        """
+        now = datetime.utcnow()
+        rows = []
+        for i, segment in enumerate(segments):
+            start = segment.get("start") or 0.0
+            rows.append({
+                "id": uuid.uuid4(),
+                "meeting_id": meeting_id,
+                "speaker_name": segment.get("speaker") or speaker_name,
+                "transcript_text": segment.get("text", "").strip(),
+                "timestamp_seconds": int(start),
+                "start_seconds": start,
+                "end_seconds": segment.get("end"),
+                "confidence": segment.get("confidence") or 0.0,
+                # Distinct timestamps keep (created_at, id) cursors in segment order
+                "created_at": now + timedelta(microseconds=i)
+            })
+        if rows:
+            # Term index lock before the meeting row lock, the order delete_meeting takes them in
+            TermIndexService.index_texts(db, meeting_id, (row["transcript_text"] for row in rows))
+            first = MeetingService.claim_seq(db, meeting_id, len(rows))
+            for i, row in enumerate(rows):
+                row["seq"] = first + i
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                db.execute(insert(Transcript).values(rows[start:start + INSERT_BATCH_SIZE]))
+        if commit:
+            db.commit()
+        return len(rows)
+    
     @staticmethod
     def delete_meeting(db: Session, meeting_id: UUID) -> bool:
         """Delete meeting"""
@@ -160,7 +283,247 @@ class MeetingService:
         if not meeting:
             raise ValueError("Meeting not found")
         
+        TermIndexService.remove_meeting(db, meeting_id)
+        MetricsService.record(db, {
+            "meetings": -1,
+            "meetings_completed": -1 if meeting.status == "completed" else 0,
+            "participants": -meeting.participants_count,
+            "summaries": -1 if meeting.has_summary else 0
+        }, buckets=False)
         db.delete(meeting)
         db.commit()
         logger.info(f"Meeting {meeting_id} deleted")
         return True
+    
+    @staticmethod
+    def reconcile_counters(db: Session, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+        """
+        Recount participants, transcripts, audio files and summaries for every
+        meeting and fix counters that drifted (or predate them), and give
+        transcripts stored before seqs existed one after the meeting's last.
+        Each batch of meetings is locked first so writers that commit meanwhile
+        are counted once. Returns the number of meetings corrected.
+        """
+        corrected = 0
+        backfilled = 0
+        after = None
+        while True:
+            query = select(Meeting.id).order_by(Meeting.id).limit(batch_size).with_for_update()
+            if after is not None:
+                query = query.where(Meeting.id > after)
+            meeting_ids = db.execute(query).scalars().all()
+            if not meeting_ids:
+                break
+            corrected += db.execute(text("""
+                UPDATE meetings m SET
+                    participants_count = c.participants_count,
+                    transcript_count = c.transcript_count,
+                    audio_file_count = c.audio_file_count,
+                    has_summary = c.has_summary
+                FROM (
+                    SELECT id,
+                        (SELECT count(*) FROM participants p WHERE p.meeting_id = meetings.id) AS participants_count,
+                        (SELECT count(*) FROM transcripts t WHERE t.meeting_id = meetings.id) AS transcript_count,
+                        (SELECT count(*) FROM audio_files a WHERE a.meeting_id = meetings.id) AS audio_file_count,
+                        EXISTS (SELECT 1 FROM summaries s WHERE s.meeting_id = meetings.id) AS has_summary
+                    FROM meetings WHERE id = ANY(CAST(:meeting_ids AS uuid[]))
+                ) c
+                WHERE m.id = c.id
+                  AND (m.participants_count, m.transcript_count, m.audio_file_count, m.has_summary)
+                      IS DISTINCT FROM (c.participants_count, c.transcript_count, c.audio_file_count, c.has_summary)
+            """), {"meeting_ids": [str(meeting_id) for meeting_id in meeting_ids]}).rowcount
+            # Numbered in (created_at, id) order; the CTE's UPDATE and the outer
+            # one both read transcript_seq from before the statement
+            backfilled += db.execute(text("""
+                WITH numbered AS (
+                    SELECT id, meeting_id,
+                        row_number() OVER (PARTITION BY meeting_id ORDER BY created_at, id) AS n
+                    FROM transcripts
+                    WHERE meeting_id = ANY(CAST(:meeting_ids AS uuid[])) AND seq IS NULL
+                ), assigned AS (
+                    UPDATE transcripts t SET seq = m.transcript_seq + numbered.n
+                    FROM numbered JOIN meetings m ON m.id = numbered.meeting_id
+                    WHERE t.id = numbered.id
+                    RETURNING t.meeting_id
+                )
+                UPDATE meetings m SET transcript_seq = m.transcript_seq + a.assigned
+                FROM (SELECT meeting_id, count(*) AS assigned FROM assigned GROUP BY meeting_id) a
+                WHERE m.id = a.meeting_id
+            """), {"meeting_ids": [str(meeting_id) for meeting_id in meeting_ids]}).rowcount
+            db.commit()
+            after = meeting_ids[-1]
+        logger.info(f"Reconciled counters, {corrected} meetings corrected, {backfilled} given transcript seqs")
+        return corrected
+
+class AsyncMeetingService:
+    """MeetingService for AsyncSession request handlers (relationships are never lazy-loaded)"""
+
+    @staticmethod
+    async def create_meeting(db: AsyncSession, host_id: UUID, meeting_data: MeetingCreate) -> Meeting:
+        """Create new meeting"""
+        meeting = Meeting(
+            host_id=host_id,
+            meeting_title=meeting_data.meeting_title,
+            description=meeting_data.description,
+            max_participants=meeting_data.max_participants,
+            status="scheduled"
+        )
+        db.add(meeting)
+        await MetricsService.record_async(db, {"meetings": 1})
+        await db.commit()
+        await db.refresh(meeting)
+        logger.info(f"Meeting created: {meeting.id}")
+        return meeting
+    
+    @staticmethod
+    async def get_meeting(db: AsyncSession, meeting_id: UUID) -> Optional[Meeting]:
+        """Get meeting by ID"""
+        return await db.get(Meeting, meeting_id)
+    
+    @staticmethod
+    async def get_meeting_detail(db: AsyncSession, meeting_id: UUID) -> Optional[Meeting]:
+        """Meeting row with its counters; audio files are only queried when it has some"""
+        meeting = await db.get(Meeting, meeting_id)
+        if meeting is None:
+            return None
+        if meeting.audio_file_count:
+            await db.refresh(meeting, ["audio_files"])
+        else:
+            set_committed_value(meeting, "audio_files", [])
+        return meeting
+    
+    @staticmethod
+    async def user_can_access(db: AsyncSession, meeting: Meeting, user_id: UUID) -> bool:
+        """Host, anyone who joined, or an admin"""
+        if str(meeting.host_id) == str(user_id):
+            return True
+        joined = await db.scalar(
+            select(Participant.id).where(Participant.meeting_id == meeting.id, Participant.user_id == user_id).limit(1)
+        )
+        if joined:
+            return True
+        return bool(await db.scalar(select(User.is_admin).where(User.id == user_id)))
+    
+    @staticmethod
+    async def get_user_meetings(db: AsyncSession, user_id: UUID, limit: int = 50) -> List[Meeting]:
+        """Get all meetings for a user"""
+        result = await db.scalars(
+            select(Meeting).where(Meeting.host_id == user_id).order_by(Meeting.created_at.desc()).limit(limit)
+        )
+        return list(result)
+    
+    @staticmethod
+    async def join_meeting(db: AsyncSession, meeting_id: UUID, user_id: UUID) -> Participant:
+        """Add participant to meeting"""
+        meeting = await db.get(Meeting, meeting_id)
+        if not meeting:
+            raise ValueError("Meeting not found")
+        
+        # Check participant limit
+        participant_count = await db.scalar(
+            select(func.count(Participant.id)).where(
+                Participant.meeting_id == meeting_id,
+                Participant.left_at.is_(None)
+            )
+        )
+        if participant_count >= meeting.max_participants:
+            raise ValueError("Meeting is full")
+        
+        # Check if already joined
+        existing = await db.scalar(
+            select(Participant).where(
+                Participant.meeting_id == meeting_id,
+                Participant.user_id == user_id,
+                Participant.left_at.is_(None)
+            ).limit(1)
+        )
+        if existing:
+            return existing
+        
+        participant = Participant(meeting_id=meeting_id, user_id=user_id)
+        db.add(participant)
+        await db.execute(bump_counters(meeting_id, participants_count=1))
+        await MetricsService.record_async(db, {"participants": 1})
+        await db.commit()
+        await db.refresh(participant)
+        logger.info(f"User {user_id} joined meeting {meeting_id}")
+        return participant
+    
+    @staticmethod
+    async def leave_meeting(db: AsyncSession, meeting_id: UUID, user_id: UUID) -> Participant:
+        """Remove participant from meeting"""
+        participant = await db.scalar(
+            select(Participant).where(
+                Participant.meeting_id == meeting_id,
+                Participant.user_id == user_id,
+                Participant.left_at.is_(None)
+            ).limit(1)
+        )
+        if not participant:
+            raise ValueError("Participant not found")
+        
+        participant.left_at = datetime.utcnow()
+        participant.duration_seconds = int(
+            (participant.left_at - participant.joined_at).total_seconds()
+        )
+        await db.commit()
+        await db.refresh(participant)
+        logger.info(f"User {user_id} left meeting {meeting_id}")
+        return participant
+    
+    @staticmethod
+    async def end_meeting(db: AsyncSession, meeting_id: UUID) -> Meeting:
+        """End meeting"""
+        meeting = await db.get(Meeting, meeting_id)
+        if not meeting:
+            raise ValueError("Meeting not found")
+        
+        if meeting.status != "completed":
+            await MetricsService.record_async(db, {"meetings_completed": 1})
+        meeting.status = "completed"
+        meeting.ended_at = datetime.utcnow()
+        
+        # Mark all active participants as left
+        active_participants = await db.scalars(
+            select(Participant).where(
+                Participant.meeting_id == meeting_id,
+                Participant.left_at.is_(None)
+            )
+        )
+        for participant in active_participants:
+            participant.left_at = datetime.utcnow()
+            participant.duration_seconds = int(
+                (participant.left_at - participant.joined_at).total_seconds()
+            )
+        
+        await db.commit()
+        await db.refresh(meeting)
+        logger.info(f"Meeting {meeting_id} ended")
+        return meeting
+    
+    @staticmethod
+    async def get_meeting_participants(db: AsyncSession, meeting_id: UUID) -> List[Participant]:
+        """Get all participants in a meeting"""
+        return list(await db.scalars(select(Participant).where(Participant.meeting_id == meeting_id)))
+    
+    @staticmethod
+    async def get_meeting_transcripts(db: AsyncSession, meeting_id: UUID) -> List[Transcript]:
+        """Get all transcripts for a meeting"""
+        return list(await db.scalars(
+            select(Transcript).where(Transcript.meeting_id == meeting_id).order_by(Transcript.created_at.asc())
+        ))
+    
+    @staticmethod
+    async def delete_meeting(db: AsyncSession, meeting_id: UUID) -> bool:
+        """Delete meeting"""
+        return await db.run_sync(MeetingService.delete_meeting, meeting_id)
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        MeetingService.reconcile_counters(session)
+    finally:
+        session.close()
@@ -0,0 +1,200 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.metrics import MetricCounter, MetricBucket
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+
+METRIC_SHARDS = 8
+MAX_SERIES_BUCKETS = 1000
+
+GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1)
+}
+
+# Where each metric comes from when the rollups are rebuilt: rows of (at, amount)
+METRIC_SOURCES = {
+    "users": "SELECT created_at AS at, 1 AS amount FROM users",
+    "meetings": "SELECT created_at AS at, 1 AS amount FROM meetings",
+    "meetings_completed": "SELECT ended_at AS at, 1 AS amount FROM meetings WHERE status = 'completed'",
+    "participants": "SELECT joined_at AS at, 1 AS amount FROM participants",
+    "summaries": "SELECT generated_at AS at, 1 AS amount FROM summaries",
+    "minutes_transcribed": """
+        SELECT finished_at AS at, audio_duration_seconds / 60.0 AS amount FROM transcription_jobs
+        WHERE status = 'completed' AND audio_duration_seconds IS NOT NULL
+    """
+}
+
+# Tables METRIC_SOURCES read, locked against writers while rebuilding
+SOURCE_TABLES = ["users", "meetings", "participants", "summaries", "transcription_jobs"]
+
+# Metrics only record() can produce: no table keeps their history, so
+# rebuild() leaves their rows alone. summaries_generated counts every
+# generation, while summaries keeps only the latest one per meeting.
+RECORDED_METRICS = ["summaries_generated"]
+
+def as_utc(at: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, like the timestamps stored by the app"""
+    if at is not None and at.tzinfo is not None:
+        return at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    start = at.replace(minute=0, second=0, microsecond=0)
+    return start.replace(hour=0) if granularity == "day" else start
+
+class MetricsService:
+    """
+    Dashboard metrics kept as rollups instead of counted on read.
+    Writers call record() in the transaction that changes the counted rows:
+    it adds to the metric's running total and to its current hour and day
+    buckets. Totals shrink when rows are deleted (buckets=False); buckets
+    only record what was added, so history is not rewritten.
+    """
+
+    @staticmethod
+    def _statements(amounts: Dict[str, float], buckets: bool) -> List:
+        # Sorted so transactions recording several metrics lock rows in the same order
+        amounts = {metric: amount for metric, amount in sorted(amounts.items()) if amount}
+        if not amounts:
+            return []
+        shard = random.randrange(METRIC_SHARDS)
+        counters = pg_insert(MetricCounter).values([
+            {"metric": metric, "shard": shard, "value": amount} for metric, amount in amounts.items()
+        ])
+        statements = [counters.on_conflict_do_update(
+            index_elements=[MetricCounter.metric, MetricCounter.shard],
+            set_={"value": MetricCounter.value + counters.excluded.value}
+        )]
+        if buckets:
+            now = datetime.utcnow()
+            rows = pg_insert(MetricBucket).values([
+                {
+                    "metric": metric,
+                    "granularity": granularity,
+                    "bucket_start": bucket_start(now, granularity),
+                    "shard": shard,
+                    "value": amount
+                }
+                for metric, amount in amounts.items()
+                for granularity in GRANULARITIES
+            ])
+            statements.append(rows.on_conflict_do_update(
+                index_elements=[MetricBucket.metric, MetricBucket.granularity, MetricBucket.bucket_start, MetricBucket.shard],
+                set_={"value": MetricBucket.value + rows.excluded.value}
+            ))
+        return statements
+
+    @staticmethod
+    def record(db: Session, amounts: Dict[str, float], buckets: bool = True) -> None:
+        """Add to metrics in the caller's transaction"""
+        for statement in MetricsService._statements(amounts, buckets):
+            db.execute(statement)
+
+    @staticmethod
+    async def record_async(db: AsyncSession, amounts: Dict[str, float], buckets: bool = True) -> None:
+        """Add to metrics in the caller's transaction"""
+        for statement in MetricsService._statements(amounts, buckets):
+            await db.execute(statement)
+
+    @staticmethod
+    def totals(db: Session) -> Dict[str, float]:
+        """Running total per metric (metrics never recorded are absent)"""
+        rows = db.execute(
+            select(MetricCounter.metric, func.sum(MetricCounter.value)).group_by(MetricCounter.metric)
+        )
+        return {metric: value for metric, value in rows}
+
+    @staticmethod
+    def series(
+        db: Session,
+        granularity: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        metrics: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Per-bucket amounts for [since, until), zeros included. Defaults to the
+        last 48 hours or 30 days. Raises ValueError for unknown granularities
+        or ranges longer than MAX_SERIES_BUCKETS buckets.
+        """
+        step = GRANULARITIES.get(granularity)
+        if step is None:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        until = as_utc(until) or datetime.utcnow()
+        since = as_utc(since) or until - step * (48 if granularity == "hour" else 30)
+        start = bucket_start(since, granularity)
+        if until <= start:
+            raise ValueError("since must be before until")
+        if (until - start) / step > MAX_SERIES_BUCKETS:
+            raise ValueError(f"range covers more than {MAX_SERIES_BUCKETS} {granularity} buckets")
+        metrics = metrics or list(METRIC_SOURCES) + RECORDED_METRICS
+
+        rows = db.execute(
+            select(MetricBucket.metric, MetricBucket.bucket_start, func.sum(MetricBucket.value))
+            .where(
+                MetricBucket.metric.in_(metrics),
+                MetricBucket.granularity == granularity,
+                MetricBucket.bucket_start >= start,
+                MetricBucket.bucket_start < until
+            )
+            .group_by(MetricBucket.metric, MetricBucket.bucket_start)
+        )
+        values = {(metric, bucket): value for metric, bucket, value in rows}
+
+        starts = []
+        bucket = start
+        while bucket < until:
+            starts.append(bucket)
+            bucket += step
+        return {
+            metric: [{"bucket": bucket, "value": values.get((metric, bucket), 0)} for bucket in starts]
+            for metric in metrics
+        }
+
+    @staticmethod
+    def rebuild(db: Session) -> None:
+        """
+        Recompute all rollups from the source tables, e.g. to fill them for
+        data recorded before they existed. The source tables are locked in
+        SHARE mode and the rollups after them (the order writers take them
+        in), so writes to either wait and nothing committed meanwhile is lost
+        or counted twice. Buckets come out of rows that still exist (deleted
+        meetings drop out of history). RECORDED_METRICS can't be recomputed
+        and are kept as they are.
+        """
+        rebuilt = {"metrics": list(METRIC_SOURCES)}
+        db.execute(text(f"LOCK TABLE {', '.join(SOURCE_TABLES)} IN SHARE MODE"))
+        db.execute(text("LOCK TABLE metric_counters, metric_buckets IN EXCLUSIVE MODE"))
+        db.execute(text("DELETE FROM metric_counters WHERE metric = ANY(:metrics)"), rebuilt)
+        db.execute(text("DELETE FROM metric_buckets WHERE metric = ANY(:metrics)"), rebuilt)
+        for metric, source in METRIC_SOURCES.items():
+            db.execute(text(f"""
+                INSERT INTO metric_counters (metric, shard, value)
+                SELECT :metric, 0, COALESCE(SUM(amount), 0) FROM ({source}) s
+            """), {"metric": metric})
+            for granularity in GRANULARITIES:
+                db.execute(text(f"""
+                    INSERT INTO metric_buckets (metric, granularity, bucket_start, shard, value)
+                    SELECT :metric, :granularity, date_trunc(:granularity, at), 0, SUM(amount)
+                    FROM ({source}) s WHERE at IS NOT NULL
+                    GROUP BY 3
+                """), {"metric": metric, "granularity": granularity})
+        db.commit()
+        logger.info(f"Rebuilt metrics rollups for {len(METRIC_SOURCES)} metrics")
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        MetricsService.rebuild(session)
+    finally:
+        session.close()
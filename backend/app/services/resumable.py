@@ -0,0 +1,129 @@
+from sqlalchemy.orm import Session
+from app.models.upload import UploadSession
+from app.schemas.audio import UploadSessionCreate, UploadSessionResponse
+from app.config import settings
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime, timedelta
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+def merge_range(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    """Add [start, end) to a sorted list of disjoint ranges, coalescing neighbours"""
+    merged = []
+    for r_start, r_end in sorted(ranges + [[start, end]]):
+        if merged and r_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], r_end)
+        else:
+            merged.append([r_start, r_end])
+    return merged
+
+def contiguous_offset(ranges: List[List[int]]) -> int:
+    """Bytes received without gaps from the start of the file"""
+    return ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+
+class ResumableUploadService:
+    @staticmethod
+    def part_path(session_id: UUID) -> str:
+        return os.path.join(settings.upload_dir, ".resumable", f"{session_id}.part")
+
+    @staticmethod
+    def create_session(db: Session, user_id: UUID, data: UploadSessionCreate) -> UploadSession:
+        """Create a session and preallocate its file so parts can land in any order"""
+        ResumableUploadService.purge_expired(db)
+        session = UploadSession(
+            meeting_id=data.meeting_id,
+            user_id=user_id,
+            filename=data.filename,
+            content_type=data.content_type,
+            total_size=data.total_size,
+            received_bytes=0,
+            received_ranges="[]",
+            status="open",
+            expires_at=datetime.utcnow() + timedelta(hours=settings.resumable_upload_expiry_hours)
+        )
+        db.add(session)
+        db.flush()
+        path = ResumableUploadService.part_path(session.id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.truncate(data.total_size)
+        db.commit()
+        db.refresh(session)
+        logger.info(f"Upload session {session.id} created for meeting {data.meeting_id} ({data.total_size} bytes)")
+        return session
+
+    @staticmethod
+    def get_session(db: Session, session_id: UUID, lock: bool = False) -> Optional[UploadSession]:
+        query = db.query(UploadSession).filter(UploadSession.id == session_id)
+        if lock:
+            query = query.with_for_update()
+        return query.first()
+
+    @staticmethod
+    def is_expired(session: UploadSession) -> bool:
+        """Open past its expiry: purge_expired may remove it (and its file) at any moment"""
+        return session.status == "open" and session.expires_at < datetime.utcnow()
+
+    @staticmethod
+    def record_part(db: Session, session_id: UUID, start: int, end: int) -> Optional[UploadSession]:
+        """Merge a received byte range; the row lock serializes parallel parts. None if the session was purged."""
+        session = ResumableUploadService.get_session(db, session_id, lock=True)
+        if session is None:
+            return None
+        ranges = merge_range(json.loads(session.received_ranges), start, end)
+        session.received_ranges = json.dumps(ranges)
+        session.received_bytes = sum(r_end - r_start for r_start, r_end in ranges)
+        db.commit()
+        db.refresh(session)
+        return session
+
+    @staticmethod
+    def is_complete(session: UploadSession) -> bool:
+        return json.loads(session.received_ranges) == [[0, session.total_size]]
+
+    @staticmethod
+    def to_response(session: UploadSession) -> UploadSessionResponse:
+        ranges = json.loads(session.received_ranges)
+        return UploadSessionResponse(
+            id=session.id,
+            meeting_id=session.meeting_id,
+            filename=session.filename,
+            total_size=session.total_size,
+            received_bytes=session.received_bytes,
+            received_ranges=ranges,
+            offset=contiguous_offset(ranges),
+            status=session.status,
+            audio_file_id=session.audio_file_id,
+            expires_at=session.expires_at
+        )
+
+    @staticmethod
+    def delete_session(db: Session, session: UploadSession) -> None:
+        try:
+            os.remove(ResumableUploadService.part_path(session.id))
+        except FileNotFoundError:
+            pass
+        db.delete(session)
+        db.commit()
+
+    @staticmethod
+    def purge_expired(db: Session) -> int:
+        """Drop open sessions past their expiry along with their partial files"""
+        expired = db.query(UploadSession).filter(
+            UploadSession.status == "open",
+            UploadSession.expires_at < datetime.utcnow()
+        ).all()
+        for session in expired:
+            try:
+                os.remove(ResumableUploadService.part_path(session.id))
+            except FileNotFoundError:
+                pass
+            db.delete(session)
+        if expired:
+            db.commit()
+            logger.info(f"Purged {len(expired)} expired upload session(s)")
+        return len(expired)
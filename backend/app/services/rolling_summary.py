@@ -0,0 +1,166 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from app.database import SessionLocal
+from app.models.summary import RollingSummary
+from app.services.meeting import MeetingService
+from app.services.summarizer import hierarchical_summarizer
+from app.services.singleflight import SingleFlight
+from app.config import settings
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+rolling_flights = SingleFlight()
+
+class RollingSummaryService:
+    """
+    Live meeting summaries maintained incrementally.
+    Each refresh reads only the transcripts after the stored seq watermark
+    and folds them into the current summary, so the cost of an update
+    follows the new text rather than the whole meeting. Seqs are handed out
+    in commit order (MeetingService.claim_seq), so a transaction that
+    commits late can't land behind the watermark and be skipped.
+    """
+
+    @staticmethod
+    def get_state(db: Session, meeting_id: UUID) -> Optional[RollingSummary]:
+        """Get the rolling summary for a meeting"""
+        return db.query(RollingSummary).filter(RollingSummary.meeting_id == meeting_id).first()
+
+    @staticmethod
+    def _get_or_create(db: Session, meeting_id: UUID) -> RollingSummary:
+        db.execute(
+            insert(RollingSummary)
+            .values(meeting_id=meeting_id, summary_text="", action_items=[], keywords=[], segments_folded=0)
+            .on_conflict_do_nothing(index_elements=["meeting_id"])
+        )
+        db.commit()
+        return RollingSummaryService.get_state(db, meeting_id)
+
+    @staticmethod
+    def has_pending(db: Session, meeting_id: UUID, state: Optional[RollingSummary]) -> bool:
+        """Whether transcripts exist past the watermark"""
+        after = state.watermark_seq if state else None
+        return bool(MeetingService.get_transcripts_after_seq(db, meeting_id, after=after, limit=1))
+
+    @staticmethod
+    def get_state_and_pending(db: Session, meeting_id: UUID) -> Tuple[Optional[RollingSummary], bool]:
+        """The rolling summary and whether transcripts exist past its watermark (for AsyncSession.run_sync)"""
+        state = RollingSummaryService.get_state(db, meeting_id)
+        return state, RollingSummaryService.has_pending(db, meeting_id, state)
+
+    @staticmethod
+    def to_response(meeting_id: UUID, state: Optional[RollingSummary], refreshing: bool = False) -> Dict:
+        return {
+            "meeting_id": meeting_id,
+            "summary_text": state.summary_text if state else "",
+            "action_items": (state.action_items or []) if state else [],
+            "keywords": (state.keywords or []) if state else [],
+            "segments_folded": (state.segments_folded or 0) if state else 0,
+            "watermark_created_at": state.watermark_created_at if state else None,
+            "updated_at": state.updated_at if state else None,
+            "refreshing": refreshing
+        }
+
+    @staticmethod
+    def _read_batch(db: Session, meeting_id: UUID, state: RollingSummary) -> Tuple[Optional[int], Dict, List]:
+        """The watermark, the summary so far and the next transcripts to fold, as plain values"""
+        db.refresh(state)
+        watermark = state.watermark_seq
+        current = {
+            "summary": state.summary_text,
+            "action_items": state.action_items or [],
+            "keywords": state.keywords or []
+        }
+        rows = MeetingService.get_transcripts_after_seq(
+            db, meeting_id, after=state.watermark_seq, limit=settings.rolling_summary_batch_segments
+        )
+        batch = [(row.seq, row.created_at, row.transcript_text) for row in rows]
+        # Don't hold the read transaction open across the LLM call
+        db.commit()
+        return watermark, current, batch
+
+    @staticmethod
+    def _advance(db: Session, state: RollingSummary, watermark: Optional[int], result: Dict, batch: List) -> bool:
+        """
+        Store a folded summary if the watermark is still where it was read;
+        a concurrent refresh that got there first wins. Leaves state loaded.
+        """
+        last_seq, last_created_at, _ = batch[-1]
+        updated = db.query(RollingSummary).filter(
+            RollingSummary.id == state.id,
+            RollingSummary.watermark_seq.is_not_distinct_from(watermark)
+        ).update({
+            RollingSummary.summary_text: result["summary"],
+            RollingSummary.action_items: result["action_items"],
+            RollingSummary.keywords: result["keywords"],
+            RollingSummary.watermark_seq: last_seq,
+            RollingSummary.watermark_created_at: last_created_at,
+            RollingSummary.segments_folded: RollingSummary.segments_folded + len(batch)
+        }, synchronize_session=False)
+        db.commit()
+        db.refresh(state)
+        return bool(updated)
+
+    @staticmethod
+    async def refresh(db: Session, meeting_id: UUID, max_length: Optional[int] = None) -> RollingSummary:
+        """
+        Fold every transcript after the watermark into the summary. The
+        session is only used from worker threads, one step at a time, so the
+        queries don't block the event loop.
+        """
+        max_length = max_length or settings.rolling_summary_max_words
+        state = await asyncio.to_thread(RollingSummaryService._get_or_create, db, meeting_id)
+        while True:
+            watermark, current, batch = await asyncio.to_thread(RollingSummaryService._read_batch, db, meeting_id, state)
+            if not batch:
+                # Reload what _read_batch's commit expired, off the event loop
+                await asyncio.to_thread(db.refresh, state)
+                return state
+
+            result = await hierarchical_summarizer.fold(current, [text for _, _, text in batch], max_length)
+
+            updated = await asyncio.to_thread(RollingSummaryService._advance, db, state, watermark, result, batch)
+            if updated:
+                logger.info(f"Rolling summary for meeting {meeting_id} folded {len(batch)} new segments")
+            else:
+                logger.info(f"Rolling summary for meeting {meeting_id} was advanced concurrently")
+            if len(batch) < settings.rolling_summary_batch_segments:
+                return state
+
+    @staticmethod
+    def is_refreshing(meeting_id: UUID) -> bool:
+        return rolling_flights.in_flight(str(meeting_id))
+
+    @staticmethod
+    async def _refresh_in_own_session(meeting_id: UUID) -> RollingSummary:
+        db = SessionLocal()
+        try:
+            return await RollingSummaryService.refresh(db, meeting_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def refresh_shared(meeting_id: UUID) -> RollingSummary:
+        """Refresh, joining a refresh of the same meeting already running in this process"""
+        return await rolling_flights.do(
+            str(meeting_id), lambda: RollingSummaryService._refresh_in_own_session(meeting_id)
+        )
+
+    @staticmethod
+    def schedule_refresh(meeting_id: UUID) -> bool:
+        """Refresh in the background unless one is already running here; True if scheduled"""
+        if RollingSummaryService.is_refreshing(meeting_id):
+            return False
+        def log_failure(task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Rolling summary refresh failed for meeting {meeting_id}: {task.exception()}")
+
+        task = rolling_flights.start(
+            str(meeting_id), lambda: RollingSummaryService._refresh_in_own_session(meeting_id)
+        )
+        task.add_done_callback(log_failure)
+        return True
@@ -0,0 +1,113 @@
+from sqlalchemy import exc, text
+from app.database import lock_engine
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, TypeVar
+import asyncio
+import hashlib
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ADVISORY_LOCK_POLL_SECONDS = 0.25
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key within one process:
+    the first caller starts the work, later callers await the same result.
+    The work runs as its own task, so a caller that disconnects does not
+    cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    def start(self, key: str, fn: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """Start `fn` for `key` unless it is already running; returns the shared task"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+
+            def forget(done: asyncio.Task) -> None:
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+                if not done.cancelled() and done.exception() is not None:
+                    # Retrieved here so unawaited background failures are not reported twice
+                    logger.debug(f"Single-flight call {key} failed: {done.exception()!r}")
+
+            task.add_done_callback(forget)
+        return task
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.start(key, fn))
+
+def _lock_id(key: str) -> int:
+    """64-bit advisory lock id for a string key"""
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big", signed=True)
+
+def _try_lock(conn, lock_id: int) -> bool:
+    acquired = conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}).scalar()
+    conn.commit()
+    return acquired
+
+def _unlock(conn, lock_id: int) -> None:
+    conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+    conn.commit()
+
+@asynccontextmanager
+async def advisory_lock(key: str, timeout: float):
+    """
+    Hold a Postgres session-level advisory lock for `key` across processes.
+    The lock lives on a dedicated connection from lock_engine's small pool,
+    because the caller's session commits (and may switch connections) while
+    holding it. Time spent waiting for a free connection counts towards the
+    timeout. Waiting polls pg_try_advisory_lock, and every statement runs in
+    a worker thread, so the event loop is never blocked on the lock or the
+    database.
+    Raises TimeoutError if the lock is not acquired within `timeout` seconds.
+    """
+    lock_id = _lock_id(key)
+    started = time.monotonic()
+    try:
+        conn = await asyncio.to_thread(lock_engine.connect)
+    except exc.TimeoutError:
+        raise TimeoutError(f"No connection free to wait for lock {key}")
+    acquired = False
+    # Set while a lock attempt is in flight: if it's cancelled, the thread
+    # may still take the lock after we stop waiting for it
+    in_doubt = False
+    try:
+        deadline = started + timeout
+        while True:
+            in_doubt = True
+            acquired = await asyncio.to_thread(_try_lock, conn, lock_id)
+            in_doubt = False
+            if acquired:
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for lock {key}")
+            await asyncio.sleep(ADVISORY_LOCK_POLL_SECONDS)
+        yield
+    finally:
+        try:
+            if acquired:
+                try:
+                    await asyncio.to_thread(_unlock, conn, lock_id)
+                except BaseException:
+                    in_doubt = True
+                    raise
+        except Exception as e:
+            logger.error(f"Failed to release lock {key}: {e}")
+        finally:
+            # Never return a connection that may still hold the lock to the pool
+            if in_doubt:
+                conn.invalidate()
+                conn.close()
+            else:
+                await asyncio.to_thread(conn.close)
@@ -0,0 +1,133 @@
+from app.config import settings
+from app.services.whisper import model_registry, segment_to_dict
+from typing import Dict, List, Optional, Tuple
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+OPUS_SAMPLE_RATE = 48000
+OPUS_MAX_FRAME_SIZE = 5760  # 120ms at 48kHz
+SUPPORTED_FORMATS = ("pcm16", "f32", "opus")
+PROMPT_CONTEXT_CHARS = 200  # committed text kept for the prompt, well inside Whisper's 224-token budget
+
+class FrameDecoder:
+    """
+    Turns WebSocket binary frames into 16kHz mono float32 samples.
+    pcm16/f32 frames must already be 16kHz mono; opus frames are single
+    48kHz mono packets and need the optional `opuslib` package.
+    """
+
+    def __init__(self, audio_format: str):
+        if audio_format not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported audio format: {audio_format}")
+        self.audio_format = audio_format
+        self._opus = None
+        if audio_format == "opus":
+            try:
+                import opuslib
+            except ImportError:
+                raise ValueError("Opus streaming requires the opuslib package")
+            self._opus = opuslib.Decoder(OPUS_SAMPLE_RATE, 1)
+
+    def decode(self, data: bytes):
+        import numpy as np
+
+        if self.audio_format == "f32":
+            return np.frombuffer(data, dtype="<f4").astype(np.float32)
+        if self.audio_format == "pcm16":
+            return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+        pcm = np.frombuffer(self._opus.decode(data, OPUS_MAX_FRAME_SIZE), dtype="<i2").astype(np.float32) / 32768.0
+        # 48kHz -> 16kHz; averaging each triple doubles as a crude low-pass filter
+        usable = len(pcm) - len(pcm) % 3
+        return pcm[:usable].reshape(-1, 3).mean(axis=1)
+
+class StreamingTranscriber:
+    """
+    Incremental Whisper decoding over a sliding window of live audio.
+    Each decode re-transcribes the uncommitted window; segments that end more
+    than `streaming_stability_seconds` before the newest audio are final and
+    are cut from the window, the rest is reported as a partial hypothesis.
+    feed() runs on the event loop, decode() in a worker thread.
+    """
+
+    def __init__(self):
+        import numpy as np
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._offset = 0.0  # stream time of _buffer[0], in seconds
+        self._pending = 0  # samples received since the last decode
+        self._context = ""  # tail of the committed text, fed back as the decoding prompt
+        self._lock = threading.Lock()
+
+    def feed(self, samples) -> None:
+        import numpy as np
+
+        with self._lock:
+            self._buffer = np.concatenate((self._buffer, samples))
+            self._pending += len(samples)
+
+    @property
+    def ready(self) -> bool:
+        return self._pending >= settings.streaming_step_seconds * SAMPLE_RATE
+
+    def _trim(self, until: float) -> None:
+        """Drop buffered audio before stream time `until`"""
+        with self._lock:
+            cut = max(0, int((until - self._offset) * SAMPLE_RATE))
+            self._buffer = self._buffer[cut:]
+            self._offset += cut / SAMPLE_RATE
+
+    def decode(self, final: bool = False) -> Tuple[List[Dict], Optional[Dict]]:
+        """Returns (final segments, partial hypothesis or None)"""
+        with self._lock:
+            audio = self._buffer
+            offset = self._offset
+            self._pending = 0
+        window = len(audio) / SAMPLE_RATE
+        if window < 0.5:
+            return [], None
+
+        model = model_registry.get(settings.streaming_model_size)
+        segments, _ = model.transcribe(
+            audio,
+            language="en",
+            beam_size=1,
+            vad_filter=True,
+            condition_on_previous_text=False,
+            initial_prompt=self._context or None
+        )
+        segments = [segment_to_dict(segment, offset=offset) for segment in segments]
+        window_end = offset + window
+
+        if final:
+            committed = len(segments)
+        else:
+            horizon = window_end - settings.streaming_stability_seconds
+            committed = 0
+            while committed < len(segments) - 1 and segments[committed]["end"] <= horizon:
+                committed += 1
+            if window >= settings.streaming_max_window_seconds:
+                # Keep the window bounded even if the speaker never pauses
+                committed = max(committed, len(segments) - 1, 1 if segments else 0)
+
+        finals = segments[:committed]
+        rest = segments[committed:]
+        if finals:
+            self._trim(finals[-1]["end"])
+            text = " ".join(seg["text"].strip() for seg in finals)
+            self._context = f"{self._context} {text}"[-PROMPT_CONTEXT_CHARS:].lstrip()
+        elif not segments and window > 2 * settings.streaming_stability_seconds:
+            # Nothing but silence; keep only the tail a word may be starting in
+            self._trim(window_end - settings.streaming_stability_seconds)
+
+        partial = None
+        if rest:
+            partial = {
+                "text": " ".join(seg["text"].strip() for seg in rest),
+                "start": rest[0]["start"],
+                "end": rest[-1]["end"]
+            }
+        return finals, partial
@@ -0,0 +1,346 @@
+from app.config import settings
+from app.services.llm_router import llm_router
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_sentence_re = re.compile(r"(?<=[.!?])\s+")
+
+JSON_INSTRUCTION = "Provide response in JSON format with keys: summary, action_items, keywords"
+STREAM_MARKER = "===DETAILS==="
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE token count (~4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+def split_sentences(text: str) -> List[str]:
+    """Segment boundaries for transcripts that arrive as one string"""
+    return [s for s in _sentence_re.split(text.strip()) if s]
+
+def _split_to_budget(segment: str, budget: int) -> List[str]:
+    """Cut one oversized segment at word boundaries into pieces of at most `budget` tokens"""
+    max_chars = budget * 4 - 1  # longest text estimate_tokens still counts as `budget`
+    pieces: List[str] = []
+    current: List[str] = []
+    length = 0
+    for word in segment.split():
+        # A single word longer than the budget is cut by characters
+        while len(word) > max_chars:
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        extra = len(word) + (1 if current else 0)
+        if current and length + extra > max_chars:
+            pieces.append(" ".join(current))
+            current, length, extra = [], 0, len(word)
+        current.append(word)
+        length += extra
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+def chunk_segments(segments: List[str], budget: int) -> List[str]:
+    """
+    Pack consecutive segments into chunks of at most `budget` tokens,
+    splitting only where a single segment is larger than the budget.
+    """
+    budget = max(1, budget)
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for segment in segments:
+        pieces = [segment]
+        if estimate_tokens(segment) > budget:
+            pieces = _split_to_budget(segment, budget)
+        for piece in pieces:
+            cost = estimate_tokens(piece)
+            if current and used + cost > budget:
+                chunks.append(" ".join(current))
+                current, used = [], 0
+            current.append(piece)
+            used += cost
+    if current:
+        chunks.append(" ".join(current))
+    # Joining pieces never costs more than their summed estimates; guard the invariant
+    oversized = [estimate_tokens(chunk) for chunk in chunks if estimate_tokens(chunk) > budget]
+    if oversized:
+        raise ValueError(f"Chunks over the {budget}-token budget: {oversized}")
+    return chunks
+
+def _as_strings(items) -> List[str]:
+    if not isinstance(items, list):
+        return []
+    return [item if isinstance(item, str) else json.dumps(item) for item in items if item]
+
+def _dedupe(items: List[str]) -> List[str]:
+    seen = set()
+    unique = []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(item.strip())
+    return unique
+
+def parse_summary_response(response_text: str) -> Dict:
+    """Parse the model's JSON answer, tolerating code fences around it"""
+    start = response_text.find("{")
+    end = response_text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError(f"No JSON object in response: {response_text[:200]}")
+    result = json.loads(response_text[start:end + 1])
+    return {
+        "summary": str(result.get("summary", "")),
+        "action_items": _as_strings(result.get("action_items", [])),
+        "keywords": _as_strings(result.get("keywords", []))
+    }
+
+def parse_streamed_summary(response_text: str) -> Dict:
+    """Parse a streamed answer: summary prose, the marker line, then a JSON object"""
+    summary, marker, details = response_text.partition(STREAM_MARKER)
+    if not marker:
+        # The model answered in plain JSON anyway
+        return parse_summary_response(response_text)
+    try:
+        result = parse_summary_response(details)
+    except ValueError:
+        result = {"action_items": [], "keywords": []}
+    result["summary"] = summary.strip()
+    return result
+
+def streaming_prompt(prompt: str) -> str:
+    """Ask for the summary as plain text first, so it can be shown while it is written"""
+    return prompt.replace(JSON_INSTRUCTION, f"""Write the summary as plain text first. Then write a line containing only
+{STREAM_MARKER} followed by a JSON object with keys: action_items, keywords""")
+
+class SummaryStream:
+    """
+    Splits a streamed answer into displayable summary text and the trailing
+    details. Text that could be the start of the marker is held back until
+    the next delta decides it.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._sent = 0
+        self._done = False
+
+    def feed(self, delta: str) -> str:
+        """Add a delta; returns the summary text that can be shown now"""
+        self.text += delta
+        if self._done:
+            return ""
+        end = self.text.find(STREAM_MARKER, self._sent)
+        if end != -1:
+            self._done = True
+        else:
+            end = len(self.text)
+            # Hold back any suffix that is a prefix of the marker
+            for keep in range(min(len(STREAM_MARKER) - 1, end - self._sent), 0, -1):
+                if STREAM_MARKER.startswith(self.text[end - keep:]):
+                    end -= keep
+                    break
+        out = self.text[self._sent:end]
+        self._sent = end
+        return out
+
+    def flush(self) -> str:
+        """Summary text still held back when the answer ended without the marker"""
+        if self._done:
+            return ""
+        out = self.text[self._sent:]
+        self._sent = len(self.text)
+        return out
+
+    def result(self) -> Dict:
+        return parse_streamed_summary(self.text)
+
+def summary_prompt(transcript_text: str, max_length: int) -> str:
+    return f"""Analyze this meeting transcript and provide:
+1. A concise summary (max {max_length} words)
+2. Key action items (as a list)
+3. Important keywords (as a list)
+
+Transcript:
+{transcript_text}
+
+{JSON_INSTRUCTION}"""
+
+def map_prompt(chunk: str, index: int, total: int, max_length: int) -> str:
+    return f"""This is part {index} of {total} of a meeting transcript. Provide:
+1. A summary of this part (max {max_length} words), keeping decisions, owners and numbers
+2. Action items mentioned in this part (as a list)
+3. Important keywords from this part (as a list)
+
+Transcript part:
+{chunk}
+
+{JSON_INSTRUCTION}"""
+
+def reduce_prompt(partials: List[Dict], max_length: int, final: bool) -> str:
+    sections = "\n\n".join(
+        f"Part {i}:\n{p['summary']}\nAction items: {json.dumps(p['action_items'])}\nKeywords: {json.dumps(p['keywords'])}"
+        for i, p in enumerate(partials, 1)
+    )
+    scope = "the whole meeting" if final else "these consecutive parts of a meeting"
+    return f"""Below are summaries of consecutive parts of a meeting, in order.
+Combine them into one account of {scope}:
+1. A concise summary (max {max_length} words)
+2. Key action items (as a list, merging duplicates)
+3. Important keywords (as a list, merging duplicates)
+
+{sections}
+
+{JSON_INSTRUCTION}"""
+
+def fold_prompt(current: Dict, new_text: str, max_length: int) -> str:
+    return f"""You maintain a running summary of a meeting that is still in progress.
+Update it with the newly transcribed part below. Keep earlier points unless
+the new part changes them, and return:
+1. The updated summary of the meeting so far (max {max_length} words)
+2. All action items so far (as a list)
+3. Important keywords so far (as a list)
+
+Current summary:
+{current.get("summary") or "(nothing yet)"}
+Action items: {json.dumps(current.get("action_items") or [])}
+Keywords: {json.dumps(current.get("keywords") or [])}
+
+New part of the transcript:
+{new_text}
+
+{JSON_INSTRUCTION}"""
+
+class HierarchicalSummarizer:
+    """
+    Map-reduce summarization for transcripts larger than one prompt.
+    The transcript is packed into token-budgeted chunks along segment
+    boundaries, chunks are summarized concurrently, and partial summaries
+    are reduced level by level until one remains. Latency grows with the
+    depth of that tree (log of the transcript length), not its length.
+    """
+
+    def __init__(self, complete: Optional[Callable] = None, stream: Optional[Callable] = None):
+        self._complete = complete or self._complete_with_router
+        self._stream = stream or self._stream_with_router
+
+    @staticmethod
+    async def _complete_with_router(prompt: str) -> Dict:
+        result = await llm_router.chat(
+            [{"role": "user", "content": prompt}],
+            max_tokens=settings.summary_output_tokens,
+            json_mode=True
+        )
+        logger.debug(f"LLM call on {result.provider}/{result.model}: {result.latency:.2f}s, usage {result.usage}")
+        return parse_summary_response(result.text)
+
+    @staticmethod
+    def _stream_with_router(prompt: str) -> AsyncIterator[str]:
+        return llm_router.stream_chat(
+            [{"role": "user", "content": prompt}],
+            max_tokens=settings.summary_output_tokens
+        )
+
+    async def _reduce_to_final(self, segments: List[str], max_length: int) -> Tuple[str, List[Dict], int]:
+        """
+        Run the map stage and every reduce level but the last.
+        Returns (final prompt, partial summaries it combines, number of chunks).
+        """
+        budget = settings.summary_chunk_tokens
+        chunks = chunk_segments(segments, budget)
+        if len(chunks) <= 1:
+            return summary_prompt(" ".join(segments), max_length), [], 1
+
+        # Partial summaries get a share of the word budget, with a floor so detail survives
+        part_length = max(80, min(max_length, budget // 8))
+        partials = await asyncio.gather(*(
+            self._complete(map_prompt(chunk, i, len(chunks), part_length))
+            for i, chunk in enumerate(chunks, 1)
+        ))
+        while True:
+            groups = self._group(partials, budget)
+            if len(groups) == 1:
+                return reduce_prompt(partials, max_length, final=True), partials, len(chunks)
+            partials = await asyncio.gather(*(
+                self._complete(reduce_prompt(group, part_length, final=False)) for group in groups
+            ))
+
+    @staticmethod
+    def _merge_partials(result: Dict, partials: List[Dict]) -> Dict:
+        # The final reduce may drop items when it is squeezed for space; keep the union
+        result["action_items"] = _dedupe(result["action_items"] + [a for p in partials for a in p["action_items"]])
+        result["keywords"] = _dedupe(result["keywords"] + [k for p in partials for k in p["keywords"]])[:20]
+        return result
+
+    async def summarize(self, segments: List[str], max_length: int = 500) -> Dict:
+        """Summarize transcript segments (in order) into {"summary", "action_items", "keywords"}"""
+        start = time.perf_counter()
+        prompt, partials, chunks = await self._reduce_to_final(segments, max_length)
+        result = await self._complete(prompt)
+        if partials:
+            result = self._merge_partials(result, partials)
+        logger.info(f"Summarized {chunks} chunks ({time.perf_counter() - start:.2f}s)")
+        return result
+
+    async def summarize_stream(self, segments: List[str], max_length: int = 500) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Like `summarize`, but the final call is streamed.
+        Yields ("summary", text) as summary text arrives, then ("result", dict).
+        """
+        start = time.perf_counter()
+        prompt, partials, chunks = await self._reduce_to_final(segments, max_length)
+        stream = SummaryStream()
+        first_token = None
+        async for delta in self._stream(streaming_prompt(prompt)):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            text = stream.feed(delta)
+            if text:
+                yield "summary", text
+        text = stream.flush()
+        if text:
+            yield "summary", text
+        result = stream.result()
+        if partials:
+            result = self._merge_partials(result, partials)
+        logger.info(
+            f"Streamed summary of {chunks} chunks, first token after {first_token or 0:.2f}s "
+            f"({time.perf_counter() - start:.2f}s)"
+        )
+        yield "result", result
+
+    async def fold(self, current: Dict, segments: List[str], max_length: int = 500) -> Dict:
+        """
+        Fold new transcript segments into an existing summary.
+        New text that does not fit one prompt is map-reduced first, so each
+        update costs one call plus the size of the new text, never the history.
+        """
+        new_text = " ".join(segments)
+        if estimate_tokens(new_text) > settings.summary_chunk_tokens:
+            delta = await self.summarize(segments, max_length)
+            new_text = delta["summary"]
+            if delta["action_items"]:
+                new_text += "\nAction items mentioned: " + "; ".join(delta["action_items"])
+        result = await self._complete(fold_prompt(current, new_text, max_length))
+        result["keywords"] = result["keywords"][:20]
+        return result
+
+    @staticmethod
+    def _group(partials: List[Dict], budget: int) -> List[List[Dict]]:
+        """Pack partial summaries into reduce groups of at most `budget` tokens (at least two per group)"""
+        groups: List[List[Dict]] = [[]]
+        used = 0
+        for partial in partials:
+            cost = estimate_tokens(json.dumps(partial))
+            if len(groups[-1]) >= 2 and used + cost > budget:
+                groups.append([])
+                used = 0
+            groups[-1].append(partial)
+            used += cost
+        return groups
+
+hierarchical_summarizer = HierarchicalSummarizer()
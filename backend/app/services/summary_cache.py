@@ -0,0 +1,116 @@
+from app.config import settings
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "echobrief:summary:"
+
+class SummaryCache:
+    """
+    Summaries keyed by transcript content and generation parameters.
+    A TTL-bounded LRU lives in each process; when REDIS_URL is set, entries
+    are also shared through Redis so other processes skip the LLM call too.
+    Redis errors only cost the shared hit, never the request.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, redis_url: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+
+    @staticmethod
+    def key_for(transcript_text: str, max_length: int, model: str) -> str:
+        """Cache key: transcript bytes plus every parameter that changes the summary"""
+        parts = [
+            hashlib.sha256(transcript_text.encode("utf-8")).hexdigest(),
+            str(max_length),
+            model,
+            str(settings.summary_chunk_tokens)
+        ]
+        return hashlib.sha256(":".join(parts).encode()).hexdigest()
+
+    def _get_redis(self):
+        if self._redis is None and self.redis_url:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(self.redis_url, socket_timeout=1.0)
+        return self._redis
+
+    def _get_local(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict]:
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return dict(value)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                raw = await client.get(REDIS_KEY_PREFIX + key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._set_local(key, value)
+                    self.shared_hits += 1
+                    return dict(value)
+            except Exception as e:
+                logger.warning(f"Summary cache read from Redis failed: {e}")
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Dict) -> None:
+        self._set_local(key, value)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.set(REDIS_KEY_PREFIX + key, json.dumps(value), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Summary cache write to Redis failed: {e}")
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "shared": bool(self.redis_url)
+        }
+
+summary_cache = SummaryCache(settings.summary_cache_max_entries, settings.summary_cache_ttl_seconds, settings.redis_url)
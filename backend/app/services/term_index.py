@@ -0,0 +1,119 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.services.extractive import count_terms
+from typing import Iterable, List
+from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TermIndexService:
+    """
+    Corpus-wide document frequencies for keyword extraction.
+    Each stored batch of transcript text adds its term counts to
+    meeting_terms; terms new to the meeting bump their document frequency,
+    and a meeting's first batch bumps the corpus size. Keywords are then a
+    TF-IDF lookup over one meeting's terms, without rescanning the corpus.
+    """
+
+    @staticmethod
+    def index_texts(db: Session, meeting_id: UUID, texts: Iterable[str]) -> int:
+        """Add transcript text to the index in the caller's transaction; returns distinct terms seen"""
+        counts = count_terms(texts)
+        if not counts:
+            return 0
+        terms = sorted(counts)
+        meeting = str(meeting_id)
+
+        # Batches of one meeting are applied one at a time so "new to this meeting" is exact
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"terms:{meeting}"})
+        first_batch = not db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM meeting_terms WHERE meeting_id = CAST(:meeting_id AS uuid))"),
+            {"meeting_id": meeting}
+        ).scalar()
+
+        # Sorted upserts take row locks in a consistent order across concurrent writers
+        inserted = db.execute(text("""
+            INSERT INTO meeting_terms (meeting_id, term, tf)
+            SELECT CAST(:meeting_id AS uuid), t.term, t.tf
+            FROM unnest(CAST(:terms AS text[]), CAST(:counts AS int[])) AS t(term, tf)
+            ORDER BY t.term
+            ON CONFLICT (meeting_id, term) DO UPDATE SET tf = meeting_terms.tf + EXCLUDED.tf
+            RETURNING term, (xmax = 0) AS inserted
+        """), {"meeting_id": meeting, "terms": terms, "counts": [counts[t] for t in terms]}).fetchall()
+
+        new_terms = sorted(row.term for row in inserted if row.inserted)
+        if new_terms:
+            db.execute(text("""
+                INSERT INTO term_document_frequency (term, df)
+                SELECT t.term, 1 FROM unnest(CAST(:terms AS text[])) AS t(term)
+                ORDER BY t.term
+                ON CONFLICT (term) DO UPDATE SET df = term_document_frequency.df + 1
+            """), {"terms": new_terms})
+        if first_batch:
+            db.execute(text("""
+                INSERT INTO term_index_stats (id, documents) VALUES (1, 1)
+                ON CONFLICT (id) DO UPDATE SET documents = term_index_stats.documents + 1
+            """))
+        return len(terms)
+
+    @staticmethod
+    def remove_meeting(db: Session, meeting_id: UUID) -> None:
+        """Take a meeting's terms out of the document frequencies (before it is deleted)"""
+        meeting = str(meeting_id)
+        terms = [row.term for row in db.execute(text("""
+            SELECT d.term FROM term_document_frequency d
+            JOIN meeting_terms m ON m.term = d.term
+            WHERE m.meeting_id = CAST(:meeting_id AS uuid)
+            ORDER BY d.term
+            FOR UPDATE OF d
+        """), {"meeting_id": meeting})]
+        if not terms:
+            return
+        db.execute(text("""
+            UPDATE term_document_frequency SET df = df - 1
+            WHERE term = ANY(CAST(:terms AS text[]))
+        """), {"terms": terms})
+        db.execute(text("UPDATE term_index_stats SET documents = GREATEST(documents - 1, 0) WHERE id = 1"))
+        db.execute(text("DELETE FROM meeting_terms WHERE meeting_id = CAST(:meeting_id AS uuid)"), {"meeting_id": meeting})
+
+    @staticmethod
+    def keywords(db: Session, meeting_id: UUID, limit: int = 10) -> List[str]:
+        """Top TF-IDF terms of a meeting against the whole corpus"""
+        rows = db.execute(text("""
+            SELECT m.term
+            FROM meeting_terms m
+            JOIN term_document_frequency d ON d.term = m.term
+            CROSS JOIN term_index_stats s
+            WHERE m.meeting_id = CAST(:meeting_id AS uuid) AND s.id = 1
+            ORDER BY (1 + ln(m.tf)) * (ln((s.documents + 1.0) / (d.df + 1.0)) + 1) DESC, m.term
+            LIMIT :limit
+        """), {"meeting_id": str(meeting_id), "limit": limit})
+        return [row.term for row in rows]
+
+    @staticmethod
+    def backfill(db: Session) -> int:
+        """Index meetings that have transcripts but no terms yet; returns meetings indexed"""
+        meeting_ids = [row.meeting_id for row in db.execute(text("""
+            SELECT DISTINCT t.meeting_id FROM transcripts t
+            WHERE NOT EXISTS (SELECT 1 FROM meeting_terms m WHERE m.meeting_id = t.meeting_id)
+        """))]
+        for meeting_id in meeting_ids:
+            texts = db.execute(
+                text("SELECT transcript_text FROM transcripts WHERE meeting_id = :meeting_id"),
+                {"meeting_id": meeting_id}
+            ).scalars()
+            TermIndexService.index_texts(db, meeting_id, texts)
+            db.commit()
+        logger.info(f"Indexed terms for {len(meeting_ids)} meetings")
+        return len(meeting_ids)
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        TermIndexService.backfill(session)
+    finally:
+        session.close()
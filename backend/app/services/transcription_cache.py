@@ -0,0 +1,159 @@
+from app.config import settings
+from typing import Dict, Iterator, Optional, Tuple
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CacheWriter:
+    """Streams segments into a temp file; commit() publishes the entry atomically"""
+
+    def __init__(self, cache: "TranscriptionCache", key: str):
+        self._cache = cache
+        self._key = key
+        self._path = cache.path_for(key)
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=os.path.dirname(self._path), suffix=".tmp")
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        self._segments = 0
+
+    def write(self, segment: Dict) -> None:
+        self._file.write(json.dumps(segment) + "\n")
+        self._segments += 1
+
+    def commit(self, duration: Optional[float]) -> None:
+        # Trailer line carries the metadata so segments never have to be buffered
+        self._file.write(json.dumps({"_duration": duration, "_segments": self._segments}) + "\n")
+        self._file.close()
+        os.replace(self._tmp_path, self._path)
+        self._cache._on_stored(self._path)
+
+    def abort(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+class TranscriptionCache:
+    """
+    On-disk transcription results keyed by audio content and decoding settings.
+    One JSON-lines file per entry; least recently used entries (by mtime,
+    refreshed on every hit) are evicted once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(audio_sha256: str) -> str:
+        """Cache key: audio bytes plus every setting that changes the decoded text"""
+        parts = [
+            audio_sha256,
+            settings.whisper_model_size,
+            settings.whisper_device,
+            settings.whisper_compute_type,
+            "en"
+        ]
+        return hashlib.sha256(":".join(parts).encode()).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.jsonl")
+
+    def get(self, key: str, count: bool = True) -> Optional[Tuple[float, Iterator[Dict]]]:
+        """
+        (duration, segment iterator) on a hit, None on a miss. Lookups that
+        repeat one already counted for the same upload pass count=False.
+        """
+        path = self.path_for(key)
+        duration = self._read_duration(path)
+        if duration is False:
+            if count:
+                with self._lock:
+                    self.misses += 1
+            return None
+        if count:
+            with self._lock:
+                self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return duration, self._iter_segments(path)
+
+    @staticmethod
+    def _read_duration(path: str):
+        """Duration from the trailer line, or False if the entry is missing"""
+        try:
+            with open(path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 256))
+                trailer = json.loads(f.read().splitlines()[-1])
+            return trailer.get("_duration")
+        except (OSError, ValueError, IndexError):
+            return False
+
+    @staticmethod
+    def _iter_segments(path: str) -> Iterator[Dict]:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                segment = json.loads(line)
+                if "_duration" not in segment:
+                    yield segment
+
+    def writer(self, key: str) -> CacheWriter:
+        return CacheWriter(self, key)
+
+    def _on_stored(self, path: str) -> None:
+        try:
+            self._evict()
+        except OSError as e:
+            logger.warning(f"Transcription cache eviction failed: {e}")
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".jsonl"):
+                    stat = entry.stat()
+                    yield stat.st_mtime, stat.st_size, entry.path
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        entries = list(self._entries()) if os.path.isdir(self.directory) else []
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes
+        }
+
+transcription_cache = TranscriptionCache(settings.transcription_cache_dir, settings.transcription_cache_max_bytes)
@@ -0,0 +1,219 @@
+from fastapi import Request
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import os
+import uuid
+import aiofiles
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNIFF_BYTES = 64
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries and part headers around the file
+
+class UploadTooLargeError(Exception):
+    """Upload exceeded the configured size limit"""
+
+class UnsupportedAudioError(Exception):
+    """Upload does not look like an audio or video file"""
+
+class InvalidUploadError(Exception):
+    """Upload request is malformed (bad multipart body, missing file, empty body)"""
+
+def sniff_audio_format(head: bytes) -> Optional[str]:
+    """Detect common audio containers from their first bytes"""
+    if head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "audio/mpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "audio/wav"
+    if head.startswith(b"OggS"):
+        return "audio/ogg"
+    if head.startswith(b"fLaC"):
+        return "audio/flac"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "audio/webm"
+    if head[4:8] == b"ftyp":
+        return "audio/mp4"
+    return None
+
+def safe_filename(filename: Optional[str]) -> str:
+    name = os.path.basename((filename or "").replace("\\", "/")).strip()
+    return name or "audio"
+
+class StreamingUploadWriter:
+    """
+    Writes an upload to a temp file chunk by chunk with async I/O,
+    hashing, counting and sniffing the bytes as they pass through.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.filename = "audio"
+        self.declared_type: Optional[str] = None
+        self.temp_path = os.path.join(directory, f".upload-{uuid.uuid4().hex}.part")
+        self._hash = hashlib.sha256()
+        self._head = b""
+        self._file = None
+
+    async def open(self) -> "StreamingUploadWriter":
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = await aiofiles.open(self.temp_path, "wb")
+        return self
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeError()
+        if len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_format()
+        self._hash.update(data)
+        await self._file.write(data)
+
+    def _check_format(self) -> None:
+        declared = (self.declared_type or "").lower()
+        if sniff_audio_format(self._head) is None and not declared.startswith(("audio/", "video/")):
+            raise UnsupportedAudioError()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def content_type(self) -> str:
+        return sniff_audio_format(self._head) or self.declared_type or "audio"
+
+    async def finish(self, final_path: str) -> None:
+        """Close and move the upload into place"""
+        if self.size and len(self._head) < SNIFF_BYTES:
+            self._check_format()
+        await self._file.close()
+        os.replace(self.temp_path, final_path)
+
+    async def abort(self) -> None:
+        if self._file is not None:
+            await self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+async def _receive_multipart(request: Request, boundary: bytes, writer: StreamingUploadWriter) -> None:
+    """Feed the request body through a streaming multipart parser, keeping only the `file` part"""
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+    headers: Dict[bytes, bytes] = {}
+    state = {"field": b"", "value": b"", "in_file": False, "found": False}
+    pending: List[bytes] = []
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data, start, end):
+        state["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        headers[state["field"].lower()] = state["value"]
+        state["field"] = state["value"] = b""
+
+    def on_headers_finished():
+        _, params = parse_options_header(headers.get(b"content-disposition", b""))
+        if params.get(b"name") == b"file" and not state["found"]:
+            state["in_file"] = state["found"] = True
+            writer.filename = safe_filename(params.get(b"filename", b"").decode("utf-8", "replace"))
+            part_type = headers.get(b"content-type")
+            writer.declared_type = part_type.decode("latin-1") if part_type else None
+
+    def on_part_data(data, start, end):
+        if state["in_file"]:
+            pending.append(bytes(data[start:end]))
+
+    def on_part_end():
+        state["in_file"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            # Parser callbacks are synchronous; do the async writes between chunks
+            for data in pending:
+                await writer.write(data)
+            pending.clear()
+        parser.finalize()
+    except MultipartParseError as e:
+        raise InvalidUploadError(f"Malformed multipart body: {e}")
+
+    if not state["found"]:
+        raise InvalidUploadError("Missing 'file' field")
+
+async def receive_upload(request: Request, max_bytes: int, directory: str) -> StreamingUploadWriter:
+    """
+    Stream a multipart (field `file`) or raw audio request body to a temp file
+    in `directory`. Memory use is one network chunk regardless of file size.
+    Call finish() or abort() on the returned writer.
+    """
+    from multipart.multipart import parse_options_header
+
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes + MULTIPART_OVERHEAD:
+        raise UploadTooLargeError()
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    writer = await StreamingUploadWriter(directory, max_bytes).open()
+    try:
+        if content_type == b"multipart/form-data":
+            if not params.get(b"boundary"):
+                raise InvalidUploadError("Missing multipart boundary")
+            await _receive_multipart(request, params[b"boundary"], writer)
+        else:
+            writer.filename = safe_filename(request.query_params.get("filename"))
+            writer.declared_type = content_type.decode("latin-1") or None
+            async for chunk in request.stream():
+                await writer.write(chunk)
+        if not writer.size:
+            raise InvalidUploadError("Empty upload")
+    except BaseException:
+        await writer.abort()
+        raise
+    return writer
+
+async def write_part(request: Request, path: str, offset: int, max_bytes: int) -> int:
+    """Stream a request body into an existing file at `offset`; returns bytes written"""
+    written = 0
+    async with aiofiles.open(path, "r+b") as f:
+        await f.seek(offset)
+        async for chunk in request.stream():
+            written += len(chunk)
+            if written > max_bytes:
+                raise UploadTooLargeError()
+            await f.write(chunk)
+    return written
+
+def hash_file(path: str) -> Tuple[str, bytes]:
+    """SHA-256 and leading bytes of a file, read in 1MB blocks"""
+    digest = hashlib.sha256()
+    head = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(1024 * 1024)
+            if not block:
+                break
+            if not head:
+                head = block[:SNIFF_BYTES]
+            digest.update(block)
+    return digest.hexdigest(), head
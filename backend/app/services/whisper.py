@@ -0,0 +1,94 @@
+from app.config import settings
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str, str]
+
+class WhisperModelRegistry:
+    """
+    Process-wide cache of faster-whisper models.
+    Each (size, device, compute_type) is loaded once and shared by every caller;
+    CTranslate2 models accept concurrent transcribe() calls up to `num_workers`.
+    """
+
+    def __init__(self):
+        self._models: Dict[ModelKey, object] = {}
+        self._load_seconds: Dict[ModelKey, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(size: Optional[str], device: Optional[str], compute_type: Optional[str]) -> ModelKey:
+        return (
+            size or settings.whisper_model_size,
+            device or settings.whisper_device,
+            compute_type or settings.whisper_compute_type,
+        )
+
+    def get(self, size: Optional[str] = None, device: Optional[str] = None, compute_type: Optional[str] = None):
+        """Return the shared model, loading it on first use"""
+        key = self._key(size, device, compute_type)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                from faster_whisper import WhisperModel
+
+                start = time.perf_counter()
+                model = WhisperModel(
+                    key[0],
+                    device=key[1],
+                    compute_type=key[2],
+                    cpu_threads=settings.whisper_cpu_threads,
+                    num_workers=settings.whisper_num_workers,
+                )
+                elapsed = time.perf_counter() - start
+                self._models[key] = model
+                self._load_seconds[key] = elapsed
+                logger.info(f"Whisper model {key[0]} ({key[1]}/{key[2]}) loaded in {elapsed:.2f}s")
+        return model
+
+    def configured_models(self) -> List[ModelKey]:
+        """Models this process is expected to serve"""
+        models = [self._key(None, None, None)]
+        streaming = self._key(settings.streaming_model_size, None, None)
+        if streaming not in models:
+            models.append(streaming)
+        return models
+
+    def preload(self) -> None:
+        """Load every configured model; called from the app lifespan"""
+        for size, device, compute_type in self.configured_models():
+            self.get(size, device, compute_type)
+
+    def is_loaded(self, size: Optional[str] = None, device: Optional[str] = None, compute_type: Optional[str] = None) -> bool:
+        return self._key(size, device, compute_type) in self._models
+
+    def stats(self) -> Dict:
+        return {
+            "loaded": [
+                {"model": k[0], "device": k[1], "compute_type": k[2], "load_seconds": round(v, 3)}
+                for k, v in self._load_seconds.items()
+            ]
+        }
+
+def segment_to_dict(segment, offset: float = 0.0) -> Dict:
+    """Convert a faster-whisper segment to the dict shape stored by the API"""
+    # faster-whisper segments may not expose `confidence`; fall back to avg_logprob
+    confidence = getattr(segment, "confidence", None)
+    if confidence is None:
+        confidence = getattr(segment, "avg_logprob", None)
+    return {
+        "start": segment.start + offset,
+        "end": segment.end + offset,
+        "text": segment.text,
+        "confidence": confidence
+    }
+
+model_registry = WhisperModelRegistry()
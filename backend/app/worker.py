@@ -0,0 +1,103 @@
+"""
+Transcription worker pool.
+
+Run alongside the API with `python -m app.worker`; each thread claims jobs
+from `transcription_jobs` with FOR UPDATE SKIP LOCKED, so any number of
+worker processes can share the queue.
+"""
+from app.database import SessionLocal
+from app.config import settings
+from app.services.audio import AudioService, LeaseLostError
+from app.services.jobs import JobService
+from app.services.long_audio import long_audio_transcriber
+from app.services.whisper import model_registry
+from typing import List
+import os
+import signal
+import socket
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionWorkerPool:
+    def __init__(self, size: int):
+        self.size = size
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for n in range(self.size):
+            thread = threading.Thread(
+                target=self._run,
+                args=(f"{prefix}:{n}",),
+                name=f"transcription-worker-{n}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.size} transcription worker(s)")
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop claiming new jobs; in-flight jobs finish or are reclaimed after their lease"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def wait(self) -> None:
+        for thread in self._threads:
+            while thread.is_alive():
+                thread.join(1.0)
+
+    def _run(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self._run_once(worker_id)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} loop error: {str(e)}", exc_info=True)
+                processed = False
+            if not processed:
+                self._stop.wait(settings.transcription_poll_interval)
+
+    @staticmethod
+    def _run_once(worker_id: str) -> bool:
+        db = SessionLocal()
+        try:
+            job = JobService.claim_next(db, worker_id)
+            if not job:
+                return False
+            logger.info(f"Worker {worker_id} processing job {job.id} (attempt {job.attempts})")
+            try:
+                AudioService.process_job(db, job, worker_id)
+            except LeaseLostError as e:
+                db.rollback()
+                logger.warning(str(e))
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Transcription job {job.id} error: {str(e)}", exc_info=True)
+                JobService.fail(db, job.id, worker_id, str(e))
+            return True
+        finally:
+            db.close()
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if settings.whisper_preload:
+        model_registry.preload()
+
+    pool = TranscriptionWorkerPool(settings.transcription_workers)
+
+    def handle_signal(signum, frame):
+        logger.info("Shutting down transcription workers...")
+        pool.stop(timeout=0)
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    pool.start()
+    pool.wait()
+    long_audio_transcriber.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Load-test read endpoints of a running API worker.
+
+    uvicorn app.main:app --workers 1 &
+    cd backend && python -m benchmarks.api_load --email you@example.com --password ... [--seconds 20] [--concurrency 64]
+
+Logs in once, creates a meeting, then keeps `concurrency` clients busy on
+GET /api/meetings/{id}, GET /api/meetings/{id}/transcripts and
+GET /api/auth/me for `seconds`. Reports requests per second and latency
+percentiles; compare runs at the same concurrency and p99 before and after
+a change (e.g. the sync vs. async database path).
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+def percentile(ordered, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        login = await client.post("/api/auth/login", json={"email": args.email, "password": args.password})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        meeting = await client.post("/api/meetings/create", json={"meeting_title": "Load test"})
+        meeting.raise_for_status()
+        meeting_id = meeting.json()["id"]
+
+        paths = [f"/api/meetings/{meeting_id}", f"/api/meetings/{meeting_id}/transcripts", "/api/auth/me"]
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + args.seconds
+
+        async def worker(offset: int) -> None:
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    print(f"requests: {len(ordered)} in {elapsed:.1f}s, errors: {errors}")
+    print(f"rps: {len(ordered) / elapsed:.1f}")
+    print(
+        f"latency ms: p50 {percentile(ordered, 0.5) * 1000:.1f}, "
+        f"p95 {percentile(ordered, 0.95) * 1000:.1f}, p99 {percentile(ordered, 0.99) * 1000:.1f}"
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main())
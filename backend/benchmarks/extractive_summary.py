@@ -0,0 +1,88 @@
+"""
+Benchmark the offline extractive summarizer on synthetic meeting transcripts.
+
+    cd backend && python -m benchmarks.extractive_summary [--hours 1 3 6] [--repeat 3]
+
+Transcripts are generated at ~150 spoken words per minute from a mix of
+topic sentences, filler and action items, so the summary can be checked
+for picking topical sentences over filler.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.extractive import ExtractiveSummarizer
+
+WORDS_PER_HOUR = 150 * 60
+
+TOPICS = {
+    "budget": ["budget", "forecast", "spend", "quarter", "finance", "headcount", "savings"],
+    "launch": ["launch", "release", "beta", "customers", "marketing", "rollout", "pricing"],
+    "infrastructure": ["database", "migration", "latency", "servers", "outage", "monitoring", "capacity"],
+    "hiring": ["hiring", "candidates", "interviews", "recruiting", "onboarding", "offers", "team"],
+}
+FILLER = [
+    "Yeah I think that makes sense to me.",
+    "Okay so let me just share my screen real quick.",
+    "Sorry you cut out for a second there.",
+    "Right right, I mean it is what it is.",
+    "Can everyone hear me okay now?",
+]
+ACTIONS = [
+    "Sarah will send the revised {a} plan by Friday.",
+    "We need to follow up with the {a} owners next week.",
+    "Action item: Dev will review the {a} numbers before the next sync.",
+]
+
+def make_transcript(hours: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    topic_names = list(TOPICS)
+    sentences = []
+    words = 0
+    while words < hours * WORDS_PER_HOUR:
+        roll = rng.random()
+        if roll < 0.3:
+            sentence = rng.choice(FILLER)
+        elif roll < 0.35:
+            topic = TOPICS[rng.choice(topic_names)]
+            sentence = rng.choice(ACTIONS).format(a=rng.choice(topic))
+        else:
+            topic = TOPICS[rng.choice(topic_names)]
+            terms = rng.sample(topic, 3)
+            sentence = (
+                f"On the {terms[0]} side we looked at how the {terms[1]} affects the "
+                f"{terms[2]} and agreed the {terms[0]} numbers need another pass."
+            )
+        sentences.append(sentence)
+        words += len(sentence.split())
+    return " ".join(sentences)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 3, 6])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-length", type=int, default=500)
+    args = parser.parse_args()
+
+    summarizer = ExtractiveSummarizer()
+    summarizer.summarize(make_transcript(0.1), args.max_length)  # warm up NumPy imports
+
+    print(f"{'hours':>6} {'words':>8} {'median ms':>10} {'max ms':>8} {'summary words':>14} {'filler picked':>14}")
+    for hours in args.hours:
+        transcript = make_transcript(hours)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = summarizer.summarize(transcript, args.max_length)
+            timings.append((time.perf_counter() - start) * 1000)
+        filler = sum(result["summary"].count(f) for f in FILLER)
+        print(
+            f"{hours:>6g} {len(transcript.split()):>8} {statistics.median(timings):>10.1f} "
+            f"{max(timings):>8.1f} {len(result['summary'].split()):>14} {filler:>14}"
+        )
+    print(f"\nkeywords: {', '.join(result['keywords'])}")
+    print(f"action items: {len(result['action_items'])}, e.g. {result['action_items'][:1]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark summary latency and throughput per configured provider.
+
+    cd backend && python -m benchmarks.summary_providers [--minutes 10 30] [--requests 4] [--concurrency 2]
+
+Runs the summarizer (map-reduce included) against each provider on its
+own, bypassing routing, using the synthetic transcripts of the extractive
+benchmark. The local provider appears when LOCAL_LLM_MODEL_PATH is set;
+its load time is reported separately from request latency.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.llm import LOCAL_PROVIDER, configured_providers, llm_gateway
+from app.services.llm_router import llm_router
+from app.services.local_llm import local_llm
+from app.services.summarizer import HierarchicalSummarizer, parse_summary_response, split_sentences
+from app.config import settings
+from benchmarks.extractive_summary import make_transcript
+
+def summarizer_for(provider):
+    """A summarizer pinned to one provider, and the list its completion token counts go to"""
+    backend = llm_router.backend(provider)
+    completion_tokens = []
+
+    async def complete(prompt: str):
+        result = await backend.chat(
+            [{"role": "user", "content": prompt}],
+            provider=provider,
+            max_tokens=settings.summary_output_tokens,
+            json_mode=True
+        )
+        completion_tokens.append(result.usage.get("completion_tokens", 0))
+        return parse_summary_response(result.text)
+
+    return HierarchicalSummarizer(complete=complete), completion_tokens
+
+async def run(provider, transcript: str, requests: int, concurrency: int, max_length: int):
+    summarizer, completion_tokens = summarizer_for(provider)
+    segments = split_sentences(transcript)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await summarizer.summarize(segments, max_length)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                failures += 1
+                print(f"  {provider.name} failed: {e}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - start
+    return latencies, failures, wall, sum(completion_tokens)
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 30])
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--max-length", type=int, default=300)
+    args = parser.parse_args()
+
+    providers = configured_providers()
+    if not providers:
+        raise SystemExit("No provider configured: set OPENAI_API_KEY, GROQ_API_KEY or LOCAL_LLM_MODEL_PATH")
+    if any(p.name == LOCAL_PROVIDER for p in providers):
+        start = time.perf_counter()
+        await asyncio.to_thread(local_llm.load)
+        print(f"local model loaded in {time.perf_counter() - start:.1f}s\n")
+
+    print(f"{'provider':>10} {'minutes':>8} {'ok':>4} {'failed':>7} {'median s':>9} {'p95 s':>7} {'summaries/min':>14} {'tokens/s':>9}")
+    try:
+        for minutes in args.minutes:
+            transcript = make_transcript(minutes / 60)
+            for provider in providers:
+                latencies, failures, wall, tokens = await run(
+                    provider, transcript, args.requests, args.concurrency, args.max_length
+                )
+                ordered = sorted(latencies) or [float("nan")]
+                p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+                print(
+                    f"{provider.name:>10} {minutes:>8g} {len(latencies):>4} {failures:>7} "
+                    f"{statistics.median(ordered):>9.2f} {p95:>7.2f} "
+                    f"{len(latencies) / wall * 60:>14.1f} {tokens / wall:>9.1f}"
+                )
+    finally:
+        await llm_gateway.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -20,6 +20,7 @@ CREATE TABLE users (
 
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_created_at ON users(created_at);
+CREATE INDEX idx_users_cursor ON users(created_at, id);
 
 -- Meetings table
 CREATE TABLE meetings (
@@ -32,12 +33,22 @@ CREATE TABLE meetings (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     started_at TIMESTAMP,
     ended_at TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Maintained with the rows they count; reconcile with python -m app.services.meeting
+    participants_count INT NOT NULL DEFAULT 0,
+    transcript_count INT NOT NULL DEFAULT 0,
+    audio_file_count INT NOT NULL DEFAULT 0,
+    has_summary BOOLEAN NOT NULL DEFAULT FALSE,
+    transcript_seq BIGINT NOT NULL DEFAULT 0 -- last transcripts.seq handed out; never reconciled
 );
 
 CREATE INDEX idx_meetings_host_id ON meetings(host_id);
 CREATE INDEX idx_meetings_status ON meetings(status);
 CREATE INDEX idx_meetings_created_at ON meetings(created_at);
+-- Keyset pages for admin listings, unfiltered and by status or host
+CREATE INDEX idx_meetings_cursor ON meetings(created_at, id);
+CREATE INDEX idx_meetings_status_cursor ON meetings(status, created_at, id);
+CREATE INDEX idx_meetings_host_cursor ON meetings(host_id, created_at, id);
 
 -- Participants table
 CREATE TABLE participants (
@@ -62,13 +73,18 @@ CREATE TABLE transcripts (
     speaker_name VARCHAR(255),
     transcript_text TEXT NOT NULL,
     timestamp_seconds INT,
+    start_seconds FLOAT, -- segment bounds within the recording
+    end_seconds FLOAT,
     confidence FLOAT DEFAULT 0.0,
+    seq BIGINT, -- per-meeting position in commit order, taken under the meeting row lock; backfill with python -m app.services.meeting
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE INDEX idx_transcripts_meeting_id ON transcripts(meeting_id);
 CREATE INDEX idx_transcripts_participant_id ON transcripts(participant_id);
 CREATE INDEX idx_transcripts_created_at ON transcripts(created_at);
+CREATE INDEX idx_transcripts_meeting_cursor ON transcripts(meeting_id, created_at, id);
+CREATE INDEX idx_transcripts_meeting_seq ON transcripts(meeting_id, seq);
 
 -- Summaries table
 CREATE TABLE summaries (
@@ -79,6 +95,8 @@ CREATE TABLE summaries (
     keywords TEXT[], -- Array of keywords
     duration_seconds INT,
     word_count INT,
+    content_hash VARCHAR(64), -- summary cache key (transcript hash + parameters)
+    model VARCHAR(255), -- provider/model of each LLM that answered
     generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -86,6 +104,60 @@ CREATE TABLE summaries (
 CREATE INDEX idx_summaries_meeting_id ON summaries(meeting_id);
 CREATE INDEX idx_summaries_created_at ON summaries(created_at);
 
+-- Rolling summaries (live meetings): only transcripts after the watermark are folded in
+CREATE TABLE rolling_summaries (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    meeting_id UUID NOT NULL UNIQUE REFERENCES meetings(id) ON DELETE CASCADE,
+    summary_text TEXT NOT NULL DEFAULT '',
+    action_items TEXT[],
+    keywords TEXT[],
+    watermark_seq BIGINT, -- seq of the last folded transcript
+    watermark_created_at TIMESTAMP,
+    segments_folded INT DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_rolling_summaries_meeting_id ON rolling_summaries(meeting_id);
+
+-- Keyword index: per-meeting term counts and corpus-wide document frequencies,
+-- updated incrementally as transcripts are stored
+CREATE TABLE meeting_terms (
+    meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+    term VARCHAR(64) NOT NULL,
+    tf INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (meeting_id, term)
+);
+
+CREATE TABLE term_document_frequency (
+    term VARCHAR(64) PRIMARY KEY,
+    df INT NOT NULL DEFAULT 0 -- meetings containing the term
+);
+
+CREATE TABLE term_index_stats (
+    id SMALLINT PRIMARY KEY DEFAULT 1,
+    documents BIGINT NOT NULL DEFAULT 0 -- meetings indexed
+);
+
+INSERT INTO term_index_stats (id, documents) VALUES (1, 0);
+
+-- Metrics rollups for the admin dashboard, updated in the transactions that write the counted rows
+CREATE TABLE metric_counters (
+    metric VARCHAR(64) NOT NULL,
+    shard SMALLINT NOT NULL DEFAULT 0, -- writers pick a shard at random; readers sum them
+    value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, shard)
+);
+
+CREATE TABLE metric_buckets (
+    metric VARCHAR(64) NOT NULL,
+    granularity VARCHAR(8) NOT NULL, -- hour, day
+    bucket_start TIMESTAMP NOT NULL,
+    shard SMALLINT NOT NULL DEFAULT 0,
+    value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, granularity, bucket_start, shard)
+);
+
 -- Audio files table
 CREATE TABLE audio_files (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -94,10 +166,61 @@ CREATE TABLE audio_files (
     file_size INT,
     duration_seconds INT,
     format VARCHAR(50),
+    content_sha256 VARCHAR(64), -- SHA-256 of the file bytes, keys the transcription cache
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE INDEX idx_audio_files_meeting_id ON audio_files(meeting_id);
+CREATE INDEX idx_audio_files_content_sha256 ON audio_files(content_sha256);
+
+-- Transcription jobs table (claimed by workers with FOR UPDATE SKIP LOCKED)
+CREATE TABLE transcription_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+    audio_file_id UUID NOT NULL REFERENCES audio_files(id) ON DELETE CASCADE,
+    file_path VARCHAR(500) NOT NULL,
+    status VARCHAR(50) NOT NULL DEFAULT 'queued', -- queued, running, completed, failed
+    progress FLOAT DEFAULT 0.0, -- percent of audio duration decoded
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(255),
+    locked_until TIMESTAMP,
+    audio_duration_seconds FLOAT,
+    segments_saved INT DEFAULT 0,
+    decoded_until_seconds FLOAT DEFAULT 0.0, -- end of the last stored segment; retries resume here
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_transcription_jobs_meeting_id ON transcription_jobs(meeting_id);
+CREATE INDEX idx_transcription_jobs_audio_file_id ON transcription_jobs(audio_file_id);
+CREATE INDEX idx_transcription_jobs_created_at ON transcription_jobs(created_at);
+CREATE INDEX idx_transcription_jobs_claim ON transcription_jobs(status, run_after);
+
+-- Resumable upload sessions
+CREATE TABLE upload_sessions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    meeting_id UUID NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    filename VARCHAR(255) NOT NULL,
+    content_type VARCHAR(100),
+    total_size BIGINT NOT NULL,
+    received_bytes BIGINT NOT NULL DEFAULT 0,
+    received_ranges TEXT NOT NULL DEFAULT '[]', -- JSON list of [start, end) byte ranges
+    status VARCHAR(50) NOT NULL DEFAULT 'open', -- open, completed
+    audio_file_id UUID REFERENCES audio_files(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX idx_upload_sessions_meeting_id ON upload_sessions(meeting_id);
+CREATE INDEX idx_upload_sessions_user_id ON upload_sessions(user_id);
+CREATE INDEX idx_upload_sessions_expires_at ON upload_sessions(expires_at);
 
 -- API Keys table (for future integrations)
 CREATE TABLE api_keys (
@@ -143,3 +266,12 @@ CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
 
 CREATE TRIGGER update_meetings_updated_at BEFORE UPDATE ON meetings
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_transcription_jobs_updated_at BEFORE UPDATE ON transcription_jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_upload_sessions_updated_at BEFORE UPDATE ON upload_sessions
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_rolling_summaries_updated_at BEFORE UPDATE ON rolling_summaries
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
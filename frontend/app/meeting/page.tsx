@@ -18,6 +18,7 @@ interface Transcript {
 interface AudioFile {
   id: string;
   file_path: string;
+  url: string;
   file_size?: number;
   duration_seconds?: number;
   format?: string;
@@ -190,7 +191,8 @@ export default function MeetingRoom() {
                       <audio
                         controls
                         className="w-full"
-                        src={`${process.env.NEXT_PUBLIC_API_URL}${file.file_path}`}
+                        src={`${process.env.NEXT_PUBLIC_API_URL}${file.url}?token=${encodeURIComponent(token || '')}`}
+                        preload="metadata"
                       />
                     </div>
                   ))}